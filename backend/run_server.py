@@ -83,6 +83,13 @@ def main() -> None:
 
     def on_exit(icon, item):
         icon.stop()
+        # os._exit skips the app shutdown hooks; flush buffered JSON writes first.
+        try:
+            from src.routes.shared import get_file_manager
+
+            get_file_manager().close()
+        except Exception:
+            pass
         os._exit(0)
 
     def on_toggle_autostart(icon, item):
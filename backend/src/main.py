@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 
 from .routes.dashboard import router as dashboard_router
+from .routes.export import router as export_router
 from .routes.problems import router as problems_router
 from .routes.reports import router as reports_router
 from .routes.settings import router as settings_router
@@ -27,6 +28,7 @@ app.include_router(dashboard_router)
 app.include_router(reports_router)
 app.include_router(settings_router)
 app.include_router(stats_router)
+app.include_router(export_router)
 
 
 @app.get("/health")
@@ -35,7 +37,7 @@ def health() -> dict:
 
 
 # Static file serving for solution images
-from .routes.shared import get_file_manager
+from .routes.shared import get_ai_client, get_file_manager, get_task_runner
 from .storage.file_manager import FileManager
 
 @app.get("/static/solution-images/{relative_path:path}")
@@ -47,3 +49,18 @@ def serve_solution_image(
     if not path or not path.exists():
         raise HTTPException(status_code=404, detail="Image not found")
     return FileResponse(path)
+
+
+@app.on_event("startup")
+async def resume_tasks() -> None:
+    await get_task_runner().resume()
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    await get_ai_client().aclose()
+
+
+@app.on_event("shutdown")
+def close_storage() -> None:
+    get_file_manager().close()
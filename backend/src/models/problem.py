@@ -118,14 +118,140 @@ class ProblemRecord(ProblemInput):
         return f"{self.source}:{self.id}"
 
 
+class ProblemSort(str, Enum):
+    updated_at = "updated_at"
+    solved_at = "solved_at"
+    difficulty = "difficulty"
+    title = "title"
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class ProblemView(str, Enum):
+    full = "full"
+    summary = "summary"
+
+
+class ProblemSummary(BaseModel):
+    """List-view projection of ``ProblemRecord``: no statement, code or translated body text."""
+
+    source: str
+    id: str
+    title: str
+    url: str = ""
+    tags: list[str] = Field(default_factory=list)
+    difficulty: int | None = None
+    status: ProblemStatus = ProblemStatus.unsolved
+    needs_solution: bool = True
+    solution_status: SolutionStatus = SolutionStatus.none
+    solution_updated_at: datetime | None = None
+    solved_at: datetime | None = None
+    translated_title: str = ""
+    translation_status: TranslationStatus = TranslationStatus.none
+    created_at: datetime
+    updated_at: datetime
+
+
+PROBLEM_SUMMARY_FIELDS = frozenset(ProblemSummary.model_fields)
+
+
+class ProblemSearchHit(ProblemSummary):
+    score: float
+    snippet_field: str = ""
+    snippet: str = ""
+
+
+class ProblemSearchResponse(BaseModel):
+    query: str
+    total: int
+    took_ms: float
+    items: list[ProblemSearchHit]
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ProblemFacetsResponse(BaseModel):
+    month: str | None = None
+    source: str | None = None
+    status: ProblemStatus | None = None
+    tag: str | None = None
+    difficulty: str | None = None
+    keyword: str | None = None
+    total: int
+    # facet name ("month", "source", "status", "tag", "difficulty") -> counts, largest first.
+    facets: dict[str, list[FacetCount]]
+
+
+class ProblemSuggestion(BaseModel):
+    source: str
+    id: str
+    title: str
+    translated_title: str = ""
+    status: ProblemStatus
+    difficulty: int | None = None
+    # Which value the prefix completed: "id", "title" or "translated_title".
+    match: str
+
+
+class ProblemSuggestResponse(BaseModel):
+    query: str
+    took_ms: float
+    items: list[ProblemSuggestion]
+
+
+def resolve_problem_fields(view: ProblemView | None, fields: str | None) -> frozenset[str] | None:
+    """Parse ``view=`` / ``fields=`` query params into a field set; ``None`` means the full record."""
+    if fields:
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(names - set(ProblemRecord.model_fields))
+        if unknown:
+            raise ValueError(f"Unknown problem fields: {', '.join(unknown)}")
+        return frozenset(names | {"source", "id"})
+    if view == ProblemView.summary:
+        return PROBLEM_SUMMARY_FIELDS
+    return None
+
+
 class ProblemImportRequest(BaseModel):
     problems: list[ProblemInput]
 
 
+class ProblemImportTimings(BaseModel):
+    lock_wait_ms: float = 0.0
+    validate_ms: float = 0.0
+    store_ms: float = 0.0
+    markdown_ms: float = 0.0
+    total_ms: float = 0.0
+
+
 class ProblemImportResponse(BaseModel):
     imported: int
     updated: int
     records: list[ProblemRecord]
+    timings: ProblemImportTimings | None = None
+
+
+class ProblemImportRejectedLine(BaseModel):
+    line: int
+    error: str
+
+
+class ProblemImportProgress(BaseModel):
+    chunk: int
+    first_line: int
+    last_line: int
+    imported: int = 0
+    updated: int = 0
+    rejected: list[ProblemImportRejectedLine] = Field(default_factory=list)
+    rejected_count: int = 0
+    done: bool = False
+    timings: ProblemImportTimings | None = None
 
 
 class ProblemStatusPatchRequest(BaseModel):
@@ -200,6 +326,12 @@ class ProblemListResponse(BaseModel):
     month: str | None = None
     source: str | None = None
     status: ProblemStatus | None = None
+    tag: str | None = None
+    difficulty: str | None = None
     keyword: str | None = None
+    sort: ProblemSort = ProblemSort.updated_at
+    order: SortOrder = SortOrder.desc
+    limit: int | None = None
     total: int
     items: list[ProblemRecord]
+    next_cursor: str | None = None
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, NonNegativeInt
+
+from .task import TaskType
 
 
 class AIProvider(str, Enum):
@@ -30,6 +32,11 @@ class MarkdownNamingMode(str, Enum):
     source_id = "source_id"
 
 
+class StorageEngine(str, Enum):
+    json = "json"
+    sqlite = "sqlite"
+
+
 class PromptTemplateResetTarget(str, Enum):
     solution = "solution"
     insight = "insight"
@@ -171,6 +178,18 @@ class AIProfile(BaseModel):
     model_options: list[str] = Field(default_factory=lambda: ["gpt-5.2"])
     temperature: float = 0.2
     timeout_seconds: int = 600
+    # Scheduling limits: no max_concurrency falls back to TASK_MAX_CONCURRENCY and
+    # 0 requests/tokens per minute means unlimited. With adaptive_concurrency the
+    # limit is tuned between 1 and max_concurrency (16 when unset).
+    max_concurrency: int | None = Field(default=None, ge=1)
+    requests_per_minute: int = Field(default=0, ge=0)
+    tokens_per_minute: int = Field(default=0, ge=0)
+    adaptive_concurrency: bool = False
+    # Connection pool of the profile's long-lived HTTP client; http2 needs the
+    # optional `h2` package and falls back to HTTP/1.1 without it.
+    http2: bool = False
+    pool_max_connections: int = Field(default=16, ge=1)
+    pool_max_keepalive: int = Field(default=16, ge=0)
 
 
 class AISettings(BaseModel):
@@ -198,6 +217,13 @@ class AISettingsUpdateRequest(BaseModel):
     model_options: list[str] = Field(default_factory=lambda: ["gpt-5.2"])
     temperature: float = 0.2
     timeout_seconds: int = 600
+    max_concurrency: int | None = Field(default=None, ge=1)
+    requests_per_minute: int = Field(default=0, ge=0)
+    tokens_per_minute: int = Field(default=0, ge=0)
+    adaptive_concurrency: bool = False
+    http2: bool = False
+    pool_max_connections: int = Field(default=16, ge=1)
+    pool_max_keepalive: int = Field(default=16, ge=0)
 
 
 class AIProfileCreateRequest(BaseModel):
@@ -209,6 +235,13 @@ class AIProfileCreateRequest(BaseModel):
     model_options: list[str] = Field(default_factory=lambda: ["gpt-5.2"])
     temperature: float = 0.2
     timeout_seconds: int = 600
+    max_concurrency: int | None = Field(default=None, ge=1)
+    requests_per_minute: int = Field(default=0, ge=0)
+    tokens_per_minute: int = Field(default=0, ge=0)
+    adaptive_concurrency: bool = False
+    http2: bool = False
+    pool_max_connections: int = Field(default=16, ge=1)
+    pool_max_keepalive: int = Field(default=16, ge=0)
     set_active: bool = True
 
 
@@ -221,6 +254,13 @@ class AIProfileUpdateRequest(BaseModel):
     model_options: list[str] = Field(default_factory=lambda: ["gpt-5.2"])
     temperature: float = 0.2
     timeout_seconds: int = 600
+    max_concurrency: int | None = Field(default=None, ge=1)
+    requests_per_minute: int = Field(default=0, ge=0)
+    tokens_per_minute: int = Field(default=0, ge=0)
+    adaptive_concurrency: bool = False
+    http2: bool = False
+    pool_max_connections: int = Field(default=16, ge=1)
+    pool_max_keepalive: int = Field(default=16, ge=0)
 
 
 class PromptSettings(BaseModel):
@@ -247,6 +287,13 @@ class PromptTemplateResetRequest(BaseModel):
     target: PromptTemplateResetTarget = PromptTemplateResetTarget.both
 
 
+class TaskRetentionPolicy(BaseModel):
+    # A finished task is archived once it is neither among the newest `keep_last`
+    # tasks of its type nor younger than `keep_days`.
+    keep_last: int = Field(default=200, ge=0)
+    keep_days: int = Field(default=30, ge=0)
+
+
 class UiSettings(BaseModel):
     default_ac_language: AcLanguage = AcLanguage.cpp
     storage_base_dir: str = ""
@@ -254,6 +301,14 @@ class UiSettings(BaseModel):
     autostart_silent: bool = True
     obsidian_mode_enabled: bool = False
     markdown_naming_mode: MarkdownNamingMode = MarkdownNamingMode.title
+    storage_engine: StorageEngine = StorageEngine.json
+    task_retention: TaskRetentionPolicy = Field(default_factory=TaskRetentionPolicy)
+    # Per task type overrides of `task_retention`.
+    task_retention_by_type: dict[TaskType, TaskRetentionPolicy] = Field(default_factory=dict)
+    # Wall-clock limit in seconds for running one task of a type; missing or 0 means none.
+    task_deadline_seconds: dict[TaskType, NonNegativeInt] = Field(
+        default_factory=lambda: {TaskType.solution: 900, TaskType.ai_tag: 180}
+    )
 
 
 class UiSettingsUpdateRequest(BaseModel):
@@ -263,6 +318,10 @@ class UiSettingsUpdateRequest(BaseModel):
     autostart_silent: bool | None = None
     obsidian_mode_enabled: bool | None = None
     markdown_naming_mode: MarkdownNamingMode | None = None
+    storage_engine: StorageEngine | None = None
+    task_retention: TaskRetentionPolicy | None = None
+    task_retention_by_type: dict[TaskType, TaskRetentionPolicy] | None = None
+    task_deadline_seconds: dict[TaskType, NonNegativeInt] | None = None
 
 
 class SettingsBundle(BaseModel):
@@ -15,6 +15,7 @@ class TaskStatus(str, Enum):
     running = "running"
     succeeded = "succeeded"
     failed = "failed"
+    cancelled = "cancelled"
 
 
 class TaskType(str, Enum):
@@ -24,6 +25,14 @@ class TaskType(str, Enum):
     phased_report = "phased_report"
 
 
+class TaskPriority(str, Enum):
+    # Served strictly in this order: someone is waiting on interactive tasks,
+    # batch tasks come from bulk actions, background tasks run when nothing else does.
+    interactive = "interactive"
+    batch = "batch"
+    background = "background"
+
+
 class SolutionTaskRecord(BaseModel):
     task_id: str
     task_type: TaskType = TaskType.solution
@@ -31,9 +40,19 @@ class SolutionTaskRecord(BaseModel):
     report_type: str | None = None
     report_target: str | None = None
     provider_name: str | None = None
+    # AI profile the task runs on, fixed when it is enqueued.
+    profile_id: str | None = None
+    # Digest of the prompt (and attached images) the task was enqueued with; an
+    # identical request for the same problem joins the in-flight task instead.
+    prompt_hash: str | None = None
     status: TaskStatus = TaskStatus.queued
+    priority: TaskPriority = TaskPriority.batch
     error_message: str | None = None
     output_path: str | None = None
+    # Runs started so far, including ones cut short by a backend restart.
+    attempts: int = 0
+    # Time spent waiting for a provider slot and for rate limits.
+    queue_wait_ms: int | None = None
     created_at: datetime = Field(default_factory=now_utc)
     started_at: datetime | None = None
     finished_at: datetime | None = None
@@ -41,8 +60,50 @@ class SolutionTaskRecord(BaseModel):
 
 class CreateTaskRequest(BaseModel):
     problem_keys: list[str] = Field(default_factory=list)
+    # Defaults to interactive for a single problem and batch otherwise.
+    priority: TaskPriority | None = None
+
+
+class TaskPriorityUpdateRequest(BaseModel):
+    priority: TaskPriority
 
 
 class CreateTaskResponse(BaseModel):
     task_ids: list[str]
 
+
+class CancelTasksRequest(BaseModel):
+    # Empty cancels every queued and running solution and AI tag task.
+    task_ids: list[str] = Field(default_factory=list)
+
+
+class CancelTasksResponse(BaseModel):
+    task_ids: list[str]
+
+
+class SchedulerDecision(BaseModel):
+    at: datetime
+    action: str
+    reason: str
+    from_limit: int
+    to_limit: int
+
+
+class ProviderSchedulerState(BaseModel):
+    profile_id: str
+    profile_name: str
+    adaptive: bool
+    limit: int
+    max_concurrency: int
+    active: int
+    queued: int
+    requests_per_minute: int
+    tokens_per_minute: int
+    tokens_available: int | None = None
+    ttft_ms: int | None = None
+    ttft_baseline_ms: int | None = None
+    decisions: list[SchedulerDecision] = Field(default_factory=list)
+
+
+class SchedulerStatusResponse(BaseModel):
+    profiles: list[ProviderSchedulerState]
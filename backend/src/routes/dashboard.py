@@ -3,9 +3,9 @@ from __future__ import annotations
 from collections import Counter
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
-from ..models.problem import ProblemStatus, SolutionStatus
+from ..models.problem import ProblemStatus, ProblemView, SolutionStatus, resolve_problem_fields
 from ..storage.file_manager import FileManager
 from .shared import get_file_manager
 
@@ -19,12 +19,18 @@ def _current_month() -> str:
 @router.get("/overview")
 def get_overview(
     month: str | None = None,
+    view: ProblemView = ProblemView.full,
+    fields: str | None = None,
     fm: FileManager = Depends(get_file_manager),
 ):
+    try:
+        projection = resolve_problem_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     target_month = month or _current_month()
     problems = fm.list_problems(target_month)
     pending = fm.list_pending_problems(target_month)
-    tasks = fm.list_tasks()[:50]
+    tasks = fm.list_tasks(limit=50)
     insight = fm.get_insight_status("weekly", _current_week())
     settings = fm.get_settings()
     active_profile = settings.ai.resolve_active_profile()
@@ -48,7 +54,11 @@ def get_overview(
             "running_tasks": running_task_count,
             "failed_tasks": failed_task_count,
         },
-        "pending": [p.model_dump(mode="json") for p in pending],
+        "pending": (
+            [p.model_dump(mode="json") for p in pending]
+            if projection is None
+            else fm.project_problems(pending, projection)
+        ),
         "tasks": [t.model_dump(mode="json") for t in tasks],
         "insight": insight.model_dump(mode="json"),
         "ai": {
@@ -59,6 +69,11 @@ def get_overview(
     }
 
 
+@router.get("/storage-stats")
+def get_storage_stats(fm: FileManager = Depends(get_file_manager)):
+    return fm.get_cache_stats()
+
+
 def _current_week() -> str:
     today = datetime.now(UTC).date()
     year, week, _ = today.isocalendar()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import tempfile
+from datetime import UTC, datetime
+from enum import Enum
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..services.archive_export import iter_export_ndjson, iter_export_zip
+from ..storage.file_manager import FileManager
+from .shared import get_file_manager
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+# Record snapshots larger than this are spooled to a temporary file.
+_EXPORT_SPOOL_MEMORY_BYTES = 4 * 1024 * 1024
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    zip = "zip"
+
+
+@router.get("")
+def export_archive(
+    format: ExportFormat = ExportFormat.ndjson,
+    fm: FileManager = Depends(get_file_manager),
+) -> StreamingResponse:
+    records = tempfile.SpooledTemporaryFile(max_size=_EXPORT_SPOOL_MEMORY_BYTES)
+    notes_blob = tempfile.SpooledTemporaryFile(max_size=_EXPORT_SPOOL_MEMORY_BYTES)
+    if format == ExportFormat.zip:
+        _, notes, images = fm.write_export_snapshot(records, notes_blob)
+        body = iter_export_zip(fm, records, notes_blob, notes, images)
+        media_type = "application/zip"
+    else:
+        fm.write_export_snapshot(records)
+        body = iter_export_ndjson(records)
+        media_type = "application/x-ndjson"
+    stamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+
+    def _cleanup() -> None:
+        records.close()
+        notes_blob.close()
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="acm-helper-{stamp}.{format.value}"'},
+        background=BackgroundTask(_cleanup),
+    )
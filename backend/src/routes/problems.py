@@ -1,29 +1,47 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+import tempfile
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, File, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 from ..models.problem import (
+    FacetCount,
     ProblemAcCodeUpdateRequest,
     ProblemDeleteResponse,
     ProblemDifficultyUpdateRequest,
+    ProblemFacetsResponse,
     ProblemInfoUpdateRequest,
     ProblemImportRequest,
     ProblemImportResponse,
     ProblemListResponse,
     ProblemReflectionUpdateRequest,
+    ProblemSearchHit,
+    ProblemSearchResponse,
+    ProblemSort,
     ProblemStatusPatchRequest,
+    ProblemSuggestResponse,
+    ProblemSuggestion,
     ProblemStatus,
     ProblemRecord,
     ProblemTranslateRequest,
+    ProblemView,
     ProblemAutoTagResponse,
     SolutionImageMeta,
+    SortOrder,
     TranslationStatus,
+    PROBLEM_SUMMARY_FIELDS,
+    resolve_problem_fields,
 )
 from ..models.task import CreateTaskResponse
+from ..services.problem_import import DEFAULT_IMPORT_CHUNK_SIZE, MAX_IMPORT_CHUNK_SIZE, iter_ndjson_import
 from ..services.tag_gen import TagGenerator
 from ..services.task_runner import TaskRunner
 from ..services.translator import ProblemTranslator
 from ..storage.file_manager import FileManager
+from ..storage.problem_cache import DEFAULT_SORT_ORDER
 from .shared import get_file_manager, get_problem_translator, get_tag_generator, get_task_runner
 
 router = APIRouter(prefix="/api/problems", tags=["problems"])
@@ -34,8 +52,126 @@ def import_problems(
     req: ProblemImportRequest,
     fm: FileManager = Depends(get_file_manager),
 ) -> ProblemImportResponse:
-    imported, updated, records = fm.upsert_problems(req.problems)
-    return ProblemImportResponse(imported=imported, updated=updated, records=records)
+    imported, updated, records, timings = fm.bulk_upsert_problems(req.problems)
+    return ProblemImportResponse(imported=imported, updated=updated, records=records, timings=timings)
+
+
+MAX_PROBLEM_PAGE_SIZE = 500
+
+# Request bodies larger than this are spooled to a temporary file.
+_IMPORT_SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+@router.post("/import/stream")
+async def import_problems_stream(
+    request: Request,
+    chunk_size: int = Query(DEFAULT_IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE),
+    fm: FileManager = Depends(get_file_manager),
+) -> StreamingResponse:
+    # The body is spooled before responding: once a streaming response starts, Starlette
+    # consumes further request messages while it listens for client disconnects.
+    spool = tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_MEMORY_BYTES)
+    async for block in request.stream():
+        spool.write(block)
+    spool.seek(0)
+
+    def progress_lines():
+        for progress in iter_ndjson_import(fm, spool, chunk_size):
+            yield progress.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        progress_lines(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(spool.close),
+    )
+
+
+@router.get("/search", response_model=ProblemSearchResponse)
+def search_problems(
+    q: str = Query(..., min_length=1),
+    month: str | None = None,
+    source: str | None = None,
+    status: ProblemStatus | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fm: FileManager = Depends(get_file_manager),
+) -> ProblemSearchResponse:
+    started = time.perf_counter()
+    total, hits = fm.search_problems(q, month=month, source=source, status=status, limit=limit)
+    items = [
+        ProblemSearchHit(
+            **fm.project_problems([record], PROBLEM_SUMMARY_FIELDS)[0],
+            score=score,
+            snippet_field=field,
+            snippet=snippet,
+        )
+        for record, score, field, snippet in hits
+    ]
+    return ProblemSearchResponse(
+        query=q,
+        total=total,
+        took_ms=round((time.perf_counter() - started) * 1000, 2),
+        items=items,
+    )
+
+
+@router.get("/facets", response_model=ProblemFacetsResponse)
+def get_problem_facets(
+    month: str | None = None,
+    source: str | None = None,
+    status: ProblemStatus | None = None,
+    tag: str | None = None,
+    difficulty: str | None = None,
+    keyword: str | None = None,
+    fm: FileManager = Depends(get_file_manager),
+) -> ProblemFacetsResponse:
+    total, counts = fm.problem_facets(
+        month=month, source=source, status=status, tag=tag, difficulty=difficulty, keyword=keyword
+    )
+    return ProblemFacetsResponse(
+        month=month,
+        source=source,
+        status=status,
+        tag=tag,
+        difficulty=difficulty,
+        keyword=keyword,
+        total=total,
+        facets={
+            facet: [
+                FacetCount(value=value, count=count)
+                for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0].lower()))
+            ]
+            for facet, values in counts.items()
+        },
+    )
+
+
+@router.get("/suggest", response_model=ProblemSuggestResponse)
+def suggest_problems(
+    q: str = Query(..., min_length=1),
+    source: str | None = None,
+    status: ProblemStatus | None = None,
+    limit: int = Query(10, ge=1, le=50),
+    fm: FileManager = Depends(get_file_manager),
+) -> ProblemSuggestResponse:
+    started = time.perf_counter()
+    suggestions = fm.suggest_problems(q, source=source, status=status, limit=limit)
+    items = [
+        ProblemSuggestion(
+            source=record.source,
+            id=record.id,
+            title=record.title,
+            translated_title=record.translated_title,
+            status=record.status,
+            difficulty=record.difficulty,
+            match=field,
+        )
+        for record, field in suggestions
+    ]
+    return ProblemSuggestResponse(
+        query=q,
+        took_ms=round((time.perf_counter() - started) * 1000, 2),
+        items=items,
+    )
 
 
 @router.get("/{source}/{problem_id}", response_model=ProblemRecord)
@@ -127,18 +263,54 @@ def list_problems(
     month: str | None = None,
     source: str | None = None,
     status: ProblemStatus | None = None,
+    tag: str | None = None,
+    difficulty: str | None = None,
     keyword: str | None = None,
+    view: ProblemView = ProblemView.full,
+    fields: str | None = None,
+    sort: ProblemSort = ProblemSort.updated_at,
+    order: SortOrder | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PROBLEM_PAGE_SIZE),
+    cursor: str | None = None,
     fm: FileManager = Depends(get_file_manager),
-) -> ProblemListResponse:
-    records = fm.list_problems_filtered(month=month, source=source, status=status, keyword=keyword)
-    return ProblemListResponse(
+):
+    order = order or DEFAULT_SORT_ORDER[sort]
+    try:
+        projection = resolve_problem_fields(view, fields)
+        records, total, next_cursor = fm.list_problems_page(
+            month=month,
+            source=source,
+            status=status,
+            tag=tag,
+            difficulty=difficulty,
+            keyword=keyword,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = ProblemListResponse(
         month=month,
         source=source,
         status=status,
+        tag=tag,
+        difficulty=difficulty,
         keyword=keyword,
-        total=len(records),
-        items=records,
+        sort=sort,
+        order=order,
+        limit=limit,
+        total=total,
+        items=[] if projection is not None else records,
+        next_cursor=next_cursor,
     )
+    if projection is not None:
+        # Returned as-is: validating against ProblemListResponse would refill the omitted fields.
+        payload = response.model_dump(mode="json")
+        payload["items"] = fm.project_problems(records, projection)
+        return JSONResponse(payload)
+    return response
 
 
 @router.delete("/{source}/{problem_id}", response_model=ProblemDeleteResponse)
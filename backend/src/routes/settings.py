@@ -149,6 +149,10 @@ def _sync_ui_autostart_state(fm: FileManager):
         autostart_silent=state.silent,
         obsidian_mode_enabled=settings.ui.obsidian_mode_enabled,
         markdown_naming_mode=settings.ui.markdown_naming_mode,
+        storage_engine=settings.ui.storage_engine,
+        task_retention=settings.ui.task_retention,
+        task_retention_by_type=settings.ui.task_retention_by_type,
+        task_deadline_seconds=settings.ui.task_deadline_seconds,
     )
     return fm.update_ui_settings(ui)
 
@@ -190,6 +194,13 @@ def update_ai_settings(
         model_options=options,
         temperature=req.temperature,
         timeout_seconds=req.timeout_seconds,
+        max_concurrency=req.max_concurrency,
+        requests_per_minute=req.requests_per_minute,
+        tokens_per_minute=req.tokens_per_minute,
+        adaptive_concurrency=req.adaptive_concurrency,
+        http2=req.http2,
+        pool_max_connections=req.pool_max_connections,
+        pool_max_keepalive=req.pool_max_keepalive,
     )
     settings = fm.update_ai_settings(profile)
     return settings.model_dump(mode="json")
@@ -212,6 +223,13 @@ def create_ai_profile(
         model_options=options,
         temperature=req.temperature,
         timeout_seconds=req.timeout_seconds,
+        max_concurrency=req.max_concurrency,
+        requests_per_minute=req.requests_per_minute,
+        tokens_per_minute=req.tokens_per_minute,
+        adaptive_concurrency=req.adaptive_concurrency,
+        http2=req.http2,
+        pool_max_connections=req.pool_max_connections,
+        pool_max_keepalive=req.pool_max_keepalive,
     )
     settings = fm.add_ai_profile(profile, set_active=req.set_active)
     return settings.model_dump(mode="json")
@@ -235,6 +253,13 @@ def update_ai_profile(
         model_options=options,
         temperature=req.temperature,
         timeout_seconds=req.timeout_seconds,
+        max_concurrency=req.max_concurrency,
+        requests_per_minute=req.requests_per_minute,
+        tokens_per_minute=req.tokens_per_minute,
+        adaptive_concurrency=req.adaptive_concurrency,
+        http2=req.http2,
+        pool_max_connections=req.pool_max_connections,
+        pool_max_keepalive=req.pool_max_keepalive,
     )
     try:
         settings = fm.update_ai_profile(profile_id, profile)
@@ -387,6 +412,16 @@ async def pick_storage_directory(
     return {"selected": selected, "path": path}
 
 
+@router.post("/storage/markdown-index/rebuild")
+def rebuild_markdown_index(fm: FileManager = Depends(get_file_manager)):
+    return fm.rebuild_markdown_index()
+
+
+@router.post("/storage/tasks/compact")
+def compact_tasks(fm: FileManager = Depends(get_file_manager)):
+    return fm.compact_tasks()
+
+
 @router.put("/ui")
 def update_ui_settings(
     req: UiSettingsUpdateRequest,
@@ -452,8 +487,19 @@ def update_ui_settings(
         markdown_naming_mode=(
             req.markdown_naming_mode if req.markdown_naming_mode is not None else current.ui.markdown_naming_mode
         ),
+        storage_engine=req.storage_engine if req.storage_engine is not None else current.ui.storage_engine,
+        task_retention=req.task_retention if req.task_retention is not None else current.ui.task_retention,
+        task_retention_by_type=(
+            req.task_retention_by_type if req.task_retention_by_type is not None else current.ui.task_retention_by_type
+        ),
+        task_deadline_seconds=(
+            req.task_deadline_seconds if req.task_deadline_seconds is not None else current.ui.task_deadline_seconds
+        ),
     )
-    settings = fm.update_ui_settings(ui)
+    try:
+        settings = fm.update_ui_settings(ui)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
     return settings.model_dump(mode="json")
 
 
@@ -11,6 +11,7 @@ from ..services.tag_gen import TagGenerator
 from ..services.task_runner import TaskRunner
 from ..services.translator import ProblemTranslator
 from ..storage.file_manager import FileManager
+from ..storage.record_store import write_json_dict
 
 
 def _get_app_dir() -> Path:
@@ -66,10 +67,7 @@ def _load_storage_base_dir() -> Path:
 def persist_storage_base_dir(path: Path) -> Path:
     normalized = resolve_storage_base_dir(str(path))
     payload = {"storage_base_dir": str(normalized)}
-    _STORAGE_CONFIG_FILE.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    write_json_dict(_STORAGE_CONFIG_FILE, payload)
     return normalized
 
 
@@ -86,7 +84,7 @@ _file_manager = FileManager(_BASE_DIR)
 _ai_client = AIClient()
 _solution_generator = SolutionGenerator(_ai_client)
 _tag_generator = TagGenerator(_ai_client)
-_task_runner = TaskRunner(_file_manager, _solution_generator, _tag_generator)
+_task_runner = TaskRunner(_file_manager, _solution_generator, _tag_generator, scheduler=_ai_client.scheduler)
 _problem_translator = ProblemTranslator(_ai_client)
 _insight_generator = InsightGenerator(_ai_client)
 
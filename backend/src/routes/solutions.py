@@ -1,10 +1,24 @@
 from __future__ import annotations
 
+import json
 from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException
-
-from ..models.task import CreateTaskRequest, CreateTaskResponse, SolutionTaskRecord
+from fastapi.responses import StreamingResponse
+
+from ..models.problem import ProblemView, resolve_problem_fields
+from ..models.task import (
+    CancelTasksRequest,
+    CancelTasksResponse,
+    CreateTaskRequest,
+    CreateTaskResponse,
+    ProviderSchedulerState,
+    SchedulerStatusResponse,
+    SolutionTaskRecord,
+    TaskPriority,
+    TaskPriorityUpdateRequest,
+    TaskType,
+)
 from ..services.task_runner import TaskRunner
 from ..storage.file_manager import FileManager
 from .shared import get_file_manager, get_task_runner
@@ -30,11 +44,14 @@ async def create_solution_tasks(
     if not keys:
         raise HTTPException(status_code=400, detail="No problem keys provided and no pending problems found")
 
+    priority = req.priority or (TaskPriority.interactive if len(keys) == 1 else TaskPriority.batch)
     task_ids: list[str] = []
     for key in keys:
         if fm.get_problem_by_key(key) is None:
             continue
-        task_ids.append(await task_runner.enqueue_solution_task(key))
+        task_id = await task_runner.enqueue_solution_task(key, priority)
+        if task_id not in task_ids:
+            task_ids.append(task_id)
 
     if not task_ids:
         raise HTTPException(status_code=404, detail="No valid problems found for task creation")
@@ -42,6 +59,22 @@ async def create_solution_tasks(
     return CreateTaskResponse(task_ids=task_ids)
 
 
+@router.get("/scheduler", response_model=SchedulerStatusResponse)
+async def get_scheduler_status(
+    fm: FileManager = Depends(get_file_manager),
+    task_runner: TaskRunner = Depends(get_task_runner),
+) -> SchedulerStatusResponse:
+    profiles = [
+        ProviderSchedulerState(
+            profile_id=profile.id,
+            profile_name=profile.name,
+            **task_runner.scheduler.limiter(profile).stats(),
+        )
+        for profile in fm.get_settings().ai.profiles
+    ]
+    return SchedulerStatusResponse(profiles=profiles)
+
+
 @router.get("/tasks/{task_id}", response_model=SolutionTaskRecord)
 def get_task_status(task_id: str, fm: FileManager = Depends(get_file_manager)) -> SolutionTaskRecord:
     task = fm.get_task(task_id)
@@ -50,12 +83,99 @@ def get_task_status(task_id: str, fm: FileManager = Depends(get_file_manager)) -
     return task
 
 
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/tasks/{task_id}/stream")
+async def stream_task(
+    task_id: str,
+    fm: FileManager = Depends(get_file_manager),
+    task_runner: TaskRunner = Depends(get_task_runner),
+) -> StreamingResponse:
+    task = fm.get_task(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task.task_type != TaskType.solution:
+        raise HTTPException(status_code=409, detail="Only solution tasks stream their output")
+    stream = task_runner.streams.get(task_id)
+
+    async def events():
+        if stream is None:
+            yield _sse("end", task.status.value)
+            return
+        async for event, data in stream.subscribe():
+            yield _sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/tasks/cancel", response_model=CancelTasksResponse)
+async def cancel_tasks(
+    req: CancelTasksRequest,
+    task_runner: TaskRunner = Depends(get_task_runner),
+) -> CancelTasksResponse:
+    return CancelTasksResponse(task_ids=task_runner.cancel_many(req.task_ids))
+
+
+@router.delete("/tasks/{task_id}", response_model=SolutionTaskRecord)
+async def cancel_task(task_id: str, task_runner: TaskRunner = Depends(get_task_runner)) -> SolutionTaskRecord:
+    try:
+        task = task_runner.cancel(task_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+def _reprioritize(task_runner: TaskRunner, task_id: str, priority: TaskPriority, *, bump: bool) -> SolutionTaskRecord:
+    try:
+        task = task_runner.reprioritize(task_id, priority, bump=bump)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.patch("/tasks/{task_id}", response_model=SolutionTaskRecord)
+async def update_task_priority(
+    task_id: str,
+    req: TaskPriorityUpdateRequest,
+    task_runner: TaskRunner = Depends(get_task_runner),
+) -> SolutionTaskRecord:
+    return _reprioritize(task_runner, task_id, req.priority, bump=False)
+
+
+@router.post("/tasks/{task_id}/bump", response_model=SolutionTaskRecord)
+async def bump_task(task_id: str, task_runner: TaskRunner = Depends(get_task_runner)) -> SolutionTaskRecord:
+    return _reprioritize(task_runner, task_id, TaskPriority.interactive, bump=True)
+
+
 @router.get("/pending")
-def list_pending(month: str | None = None, fm: FileManager = Depends(get_file_manager)):
+def list_pending(
+    month: str | None = None,
+    view: ProblemView = ProblemView.full,
+    fields: str | None = None,
+    fm: FileManager = Depends(get_file_manager),
+):
+    try:
+        projection = resolve_problem_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     records = fm.list_pending_problems(month)
     return {
         "month": month,
         "total": len(records),
-        "items": [r.model_dump(mode="json") for r in records],
+        "items": (
+            [r.model_dump(mode="json") for r in records]
+            if projection is None
+            else fm.project_problems(records, projection)
+        ),
     }
 
@@ -7,6 +7,7 @@ from datetime import UTC, date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from ..models.problem import ProblemStatus
 from ..models.stats import InsightGenerateRequest, InsightGenerateResponse, StatsPeriod
 from ..models.task import TaskStatus
 from ..services.prompt_renderer import render_template
@@ -100,25 +101,13 @@ def get_chart_series(
     weekly = build_stats_series(problems, period=StatsPeriod.week, from_date=start, to_date=end)
     monthly = build_stats_series(problems, period=StatsPeriod.month, from_date=start, to_date=end)
 
-    tag_counter: Counter[str] = Counter()
-    solved_count = 0
-    solved_with_tags_count = 0
-    for p in problems:
-        if getattr(p.status, "value", p.status) != "solved":
-            continue
-        solved_count += 1
-
-        cleaned_tags = [str(raw_tag).strip() for raw_tag in p.tags if str(raw_tag).strip()]
-        if cleaned_tags:
-            solved_with_tags_count += 1
-        for tag in cleaned_tags:
-            tag_counter[tag] += 1
+    solved_count, facets = fm.problem_facets(status=ProblemStatus.solved)
+    tag_counter = Counter(facets["tag"])
 
     logger.warning(
-        "[stats/charts] total=%s solved=%s solved_with_tags=%s unique_tags=%s top5=%s",
+        "[stats/charts] total=%s solved=%s unique_tags=%s top5=%s",
         len(problems),
         solved_count,
-        solved_with_tags_count,
         len(tag_counter),
         tag_counter.most_common(5),
     )
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from collections.abc import AsyncIterator, Callable
 from typing import Any
 
 import httpx
 
 from ..models.settings import AIProfile, AIProvider, AISettings
+from .http_pool import HTTPClientPool
+from .provider_scheduler import ProviderScheduler, RequestTiming, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +22,54 @@ _RETRYABLE_EXCEPTIONS = (
     httpx.ConnectTimeout,
 )
 
+# Receives ``(event, data)`` while an answer streams in; the only event is ``("delta", text)``.
+StreamCallback = Callable[[str, str], None]
+
+# Sent after the partial answer when a retry picks up a stream that was cut off.
+_CONTINUE_PROMPT = (
+    "Your previous reply was cut off. Continue exactly where it stopped: "
+    "do not repeat any of it and do not add a preamble."
+)
+
+# How long to wait for the rest of a stream after its stop event before giving up on reusing the
+# connection. A well-behaved provider has already sent the tail with the stop event; one that keeps
+# the socket open costs that connection instead of delaying the task.
+_DRAIN_SECONDS = 0.05
+
+
+class ProviderHTTPError(RuntimeError):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _overload_reason(exc: Exception) -> str | None:
+    """Why ``exc`` means the provider is overloaded (429, 5xx, timeout), or ``None``."""
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, ProviderHTTPError) and (exc.status_code == 429 or exc.status_code >= 500):
+        return f"HTTP {exc.status_code}"
+    return None
+
 
 class AIClient:
+    def __init__(self, scheduler: ProviderScheduler | None = None, http_pool: HTTPClientPool | None = None):
+        self.scheduler = scheduler if scheduler is not None else ProviderScheduler()
+        self.http_pool = http_pool if http_pool is not None else HTTPClientPool()
+
+    async def aclose(self) -> None:
+        await self.http_pool.aclose()
+
     async def generate_solution(
-        self, prompt: str, ai_settings: AISettings, images_base64: list[str] | None = None
+        self,
+        prompt: str,
+        ai_settings: AISettings,
+        images_base64: list[str] | None = None,
+        *,
+        on_event: StreamCallback | None = None,
+        prefix: str = "",
     ) -> str:
-        return await self._generate(prompt, ai_settings, images_base64)
+        return await self._generate(prompt, ai_settings, images_base64, on_event=on_event, prefix=prefix)
 
     async def generate_report(self, prompt: str, ai_settings: AISettings) -> str:
         return await self._generate(prompt, ai_settings)
@@ -31,6 +77,28 @@ class AIClient:
     async def generate_text(self, prompt: str, ai_settings: AISettings) -> str:
         return await self._generate(prompt, ai_settings)
 
+    async def stream_text(
+        self, prompt: str, ai_settings: AISettings, images_base64: list[str] | None = None
+    ) -> AsyncIterator[tuple[str, str]]:
+        """Generate like ``generate_text``, yielding ``(event, data)`` as the answer arrives.
+
+        Yields ``("delta", text)`` for every chunk and finally ``("done", answer)``;
+        provider errors are raised from the iterator.
+        """
+        events: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue()
+
+        def _push(event: str, data: str) -> None:
+            events.put_nowait((event, data))
+
+        job = asyncio.create_task(self._generate(prompt, ai_settings, images_base64, on_event=_push))
+        job.add_done_callback(lambda _job: events.put_nowait(None))
+        try:
+            while (item := await events.get()) is not None:
+                yield item
+            yield "done", job.result()
+        finally:
+            job.cancel()
+
     async def test_connection(self, ai_settings: AISettings) -> str:
         probe_prompt = "Reply with exactly: ok"
         result = await self._generate(probe_prompt, ai_settings)
@@ -39,37 +107,78 @@ class AIClient:
     _MAX_RETRIES = 2  # 最多重试 2 次（共 3 次尝试）
 
     async def _generate(
-        self, prompt: str, ai_settings: AISettings, images_base64: list[str] | None = None
+        self,
+        prompt: str,
+        ai_settings: AISettings,
+        images_base64: list[str] | None = None,
+        *,
+        on_event: StreamCallback | None = None,
+        prefix: str = "",
     ) -> str:
+        """Ask the active profile for an answer to ``prompt``.
+
+        ``prefix`` is the start of an answer an earlier run already received; the
+        model is asked to continue it and the result includes it. A retry after a
+        dropped stream continues the same way from everything received so far.
+        """
         profile = ai_settings.resolve_active_profile()
+        prompt_tokens = estimate_tokens(prompt, len(images_base64 or ()))
+        parts: list[str] = [prefix] if prefix else []
+
+        def _capture(event: str, data: str) -> None:
+            parts.append(data)
+            if on_event is not None:
+                on_event(event, data)
+
         last_exc: Exception | None = None
         for attempt in range(1 + self._MAX_RETRIES):
+            partial = "".join(parts)
+            # Every attempt is a request upstream, so each one spends the profile's budgets.
+            await self.scheduler.throttle(profile, prompt_tokens + estimate_tokens(partial))
+            timing = RequestTiming()
             try:
                 if profile.provider == AIProvider.openai_compatible:
-                    return await self._generate_via_openai_compatible(
-                        prompt, profile, images_base64
+                    content = await self._generate_via_openai_compatible(
+                        prompt, profile, images_base64, timing=timing, on_event=_capture, prefix=partial
                     )
-                if profile.provider == AIProvider.anthropic:
-                    return await self._generate_via_anthropic(
-                        prompt, profile, images_base64
+                elif profile.provider == AIProvider.anthropic:
+                    content = await self._generate_via_anthropic(
+                        prompt, profile, images_base64, timing=timing, on_event=_capture, prefix=partial
                     )
-                raise RuntimeError(f"Unsupported provider: {profile.provider}")
-            except _RETRYABLE_EXCEPTIONS as exc:
+                else:
+                    raise RuntimeError(f"Unsupported provider: {profile.provider}")
+            except Exception as exc:
+                self.scheduler.observe(profile, timing, failed=True, overload=_overload_reason(exc))
+                if not isinstance(exc, _RETRYABLE_EXCEPTIONS):
+                    raise
                 last_exc = exc
                 if attempt < self._MAX_RETRIES:
                     logger.warning(
-                        "AI request failed (attempt %d/%d): %s — retrying",
+                        "AI request failed (attempt %d/%d): %s — retrying from %d received characters",
                         attempt + 1,
                         1 + self._MAX_RETRIES,
                         exc,
+                        sum(len(part) for part in parts),
                     )
                     continue
+            else:
+                self.scheduler.observe(profile, timing)
+                self.scheduler.charge(profile, estimate_tokens(content))
+                # The collectors strip their own text, so rejoin the raw chunks around a continuation.
+                return "".join(parts).strip() if partial else content
         raise RuntimeError(
             f"AI request failed after {1 + self._MAX_RETRIES} attempts: {last_exc}"
         )
 
     async def _generate_via_openai_compatible(
-        self, prompt: str, profile: AIProfile, images_base64: list[str] | None = None
+        self,
+        prompt: str,
+        profile: AIProfile,
+        images_base64: list[str] | None = None,
+        *,
+        timing: RequestTiming | None = None,
+        on_event: StreamCallback | None = None,
+        prefix: str = "",
     ) -> str:
         if not profile.api_base or not profile.api_key:
             raise RuntimeError("AI api_base/api_key is not configured")
@@ -96,6 +205,9 @@ class AIClient:
                     }
                 )
             messages.append({"role": "user", "content": content})
+        if prefix:
+            messages.append({"role": "assistant", "content": prefix})
+            messages.append({"role": "user", "content": _CONTINUE_PROMPT})
 
         payload = {
             "model": profile.model,
@@ -105,12 +217,13 @@ class AIClient:
         }
 
         timeout = self._build_timeout(profile.timeout_seconds)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            async with client.stream("POST", url, headers=headers, json=payload) as resp:
+        async with self.http_pool.client(profile) as client:
+            async with client.stream("POST", url, headers=headers, json=payload, timeout=timeout) as resp:
                 await self._raise_for_status_with_body(resp, "openai-compatible")
-                content = await self._collect_openai_stream_text(resp)
+                content = await self._collect_openai_stream_text(resp, timing, on_event)
 
-        if not content:
+        # A stream cut off right after its last token leaves nothing to continue.
+        if not content and not prefix:
             raise RuntimeError("Empty content returned from model provider")
         return content
 
@@ -125,7 +238,14 @@ class AIClient:
         return base + "/v1/chat/completions"
 
     async def _generate_via_anthropic(
-        self, prompt: str, profile: AIProfile, images_base64: list[str] | None = None
+        self,
+        prompt: str,
+        profile: AIProfile,
+        images_base64: list[str] | None = None,
+        *,
+        timing: RequestTiming | None = None,
+        on_event: StreamCallback | None = None,
+        prefix: str = "",
     ) -> str:
         if not profile.api_base or not profile.api_key:
             raise RuntimeError("AI api_base/api_key is not configured")
@@ -153,6 +273,9 @@ class AIClient:
                     }
                 )
             messages = [{"role": "user", "content": content}]
+        if prefix.strip():
+            # Prefilled assistant turn: the reply continues it. The API rejects trailing whitespace there.
+            messages.append({"role": "assistant", "content": prefix.rstrip()})
 
         payload = {
             "model": profile.model,
@@ -163,12 +286,12 @@ class AIClient:
         }
 
         timeout = self._build_timeout(profile.timeout_seconds)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            async with client.stream("POST", url, headers=headers, json=payload) as resp:
+        async with self.http_pool.client(profile) as client:
+            async with client.stream("POST", url, headers=headers, json=payload, timeout=timeout) as resp:
                 await self._raise_for_status_with_body(resp, "anthropic")
-                content = await self._collect_anthropic_stream_text(resp)
+                content = await self._collect_anthropic_stream_text(resp, timing, on_event)
 
-        if not content:
+        if not content and not prefix:
             raise RuntimeError("Empty content returned from anthropic provider")
         return content
 
@@ -188,24 +311,54 @@ class AIClient:
             return
         body = (await resp.aread()).decode("utf-8", errors="replace").strip()
         detail = f" {body}" if body else ""
-        raise RuntimeError(f"{provider_name} provider error [{resp.status_code}].{detail}")
+        raise ProviderHTTPError(f"{provider_name} provider error [{resp.status_code}].{detail}", resp.status_code)
 
-    async def _collect_openai_stream_text(self, resp: httpx.Response) -> str:
+    async def _collect_openai_stream_text(
+        self, resp: httpx.Response, timing: RequestTiming | None = None, on_event: StreamCallback | None = None
+    ) -> str:
         text_parts: list[str] = []
-        async for _event_name, data in self._iter_sse_events(resp):
+        events = self._iter_sse_events(resp)
+        async for _event_name, data in events:
+            seen = len(text_parts)
             should_stop = self._consume_openai_sse_data(data, text_parts)
+            if on_event is not None:
+                for part in text_parts[seen:]:
+                    on_event("delta", part)
+            if timing is not None and text_parts:
+                timing.mark_first_token()
             if should_stop:
+                await self._drain_sse_events(events)
                 break
         return "".join(text_parts).strip()
 
-    async def _collect_anthropic_stream_text(self, resp: httpx.Response) -> str:
+    async def _collect_anthropic_stream_text(
+        self, resp: httpx.Response, timing: RequestTiming | None = None, on_event: StreamCallback | None = None
+    ) -> str:
         text_parts: list[str] = []
-        async for event_name, data in self._iter_sse_events(resp):
+        events = self._iter_sse_events(resp)
+        async for event_name, data in events:
+            seen = len(text_parts)
             should_stop = self._consume_anthropic_sse_data(event_name, data, text_parts)
+            if on_event is not None:
+                for part in text_parts[seen:]:
+                    on_event("delta", part)
+            if timing is not None and text_parts:
+                timing.mark_first_token()
             if should_stop:
+                await self._drain_sse_events(events)
                 break
         return "".join(text_parts).strip()
 
+    async def _drain_sse_events(self, events: AsyncIterator[tuple[str, str]]) -> None:
+        # A response left unread when the stream context exits closes its connection;
+        # read the tail after the stop event so the connection goes back to the pool.
+        try:
+            async with asyncio.timeout(_DRAIN_SECONDS):
+                async for _event in events:
+                    pass
+        except (TimeoutError, httpx.HTTPError):
+            pass
+
     async def _iter_sse_events(self, resp: httpx.Response):
         event_name = ""
         data_lines: list[str] = []
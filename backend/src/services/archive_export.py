@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import io
+import time
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from ..storage.file_manager import FileManager
+
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_RECORDS_NAME = "records.ndjson"
+
+# Already-compressed formats are stored as-is in the zip.
+_STORED_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+
+
+class _ZipStreamSink(io.RawIOBase):
+    """Write-only, unseekable buffer that ``zipfile`` appends to and the generator drains."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def drain(self) -> Iterator[bytes]:
+        if self._buffer:
+            yield bytes(self._buffer)
+            self._buffer.clear()
+
+
+def iter_export_ndjson(records: BinaryIO) -> Iterator[bytes]:
+    records.seek(0)
+    while chunk := records.read(EXPORT_CHUNK_BYTES):
+        yield chunk
+
+
+def _zip_info(arcname: str, size: int, mtime: float) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime(mtime)[:6])
+    info.file_size = size
+    info.compress_type = (
+        zipfile.ZIP_STORED if Path(arcname).suffix.lower() in _STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+    )
+    return info
+
+
+def iter_export_zip(
+    fm: FileManager,
+    records: BinaryIO,
+    notes_blob: BinaryIO,
+    notes: list[tuple[Path, int]],
+    images: list[Path],
+) -> Iterator[bytes]:
+    """Stream ``records.ndjson``, the snapshotted notes and every listed image as a zip, one chunk at a time.
+
+    ``records``, ``notes_blob`` and ``notes`` come from one ``write_export_snapshot``
+    call, so records and notes match; images are read from disk as they are reached.
+    """
+    sink = _ZipStreamSink()
+    exported_at = time.time()
+    with zipfile.ZipFile(sink, "w") as archive:
+        size = records.seek(0, io.SEEK_END)
+        records.seek(0)
+        with archive.open(_zip_info(EXPORT_RECORDS_NAME, size, exported_at), "w") as entry:
+            while chunk := records.read(EXPORT_CHUNK_BYTES):
+                entry.write(chunk)
+                yield from sink.drain()
+
+        notes_blob.seek(0)
+        for path, size in notes:
+            arcname = path.relative_to(fm.base).as_posix()
+            with archive.open(_zip_info(arcname, size, exported_at), "w") as entry:
+                entry.write(notes_blob.read(size))
+            yield from sink.drain()
+
+        for path in images:
+            arcname = path.relative_to(fm.base).as_posix()
+            try:
+                stat = path.stat()
+                source = path.open("rb")
+            except OSError:
+                continue
+            with source, archive.open(_zip_info(arcname, stat.st_size, stat.st_mtime), "w") as entry:
+                while chunk := source.read(EXPORT_CHUNK_BYTES):
+                    entry.write(chunk)
+                    yield from sink.drain()
+    yield from sink.drain()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import httpx
+
+from ..models.settings import AIProfile
+
+logger = logging.getLogger(__name__)
+
+# Idle connections are kept this long; longer than httpx's 5 s so a batch that
+# pauses between tasks for scheduling or rate limits still finds them warm.
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+
+def _fingerprint(profile: AIProfile) -> tuple:
+    """The profile fields a client is built from; a change to any of them rebuilds the client."""
+    return (profile.api_base.strip(), profile.http2, profile.pool_max_connections, profile.pool_max_keepalive)
+
+
+@dataclass
+class _PooledClient:
+    client: httpx.AsyncClient
+    fingerprint: tuple
+    loop: asyncio.AbstractEventLoop
+    users: int = 0
+    retired: bool = False
+
+
+class HTTPClientPool:
+    """One long-lived ``httpx.AsyncClient`` per AI profile, so requests reuse warm connections.
+
+    A client is replaced when its profile's connection settings change; the old one
+    is closed as soon as the requests still streaming through it finish. Used from
+    the event loop only.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, _PooledClient] = {}
+        self._warned_http2 = False
+
+    def _build(self, profile: AIProfile) -> httpx.AsyncClient:
+        http2 = profile.http2
+        if http2 and not HTTP2_AVAILABLE:
+            if not self._warned_http2:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+                self._warned_http2 = True
+            http2 = False
+        limits = httpx.Limits(
+            max_connections=profile.pool_max_connections,
+            max_keepalive_connections=profile.pool_max_keepalive,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        )
+        return httpx.AsyncClient(http2=http2, limits=limits)
+
+    async def _retire(self, entry: _PooledClient) -> None:
+        entry.retired = True
+        if entry.users == 0:
+            await entry.client.aclose()
+
+    @asynccontextmanager
+    async def client(self, profile: AIProfile) -> AsyncIterator[httpx.AsyncClient]:
+        loop = asyncio.get_running_loop()
+        fingerprint = _fingerprint(profile)
+        entry = self._clients.get(profile.id)
+        if entry is None or entry.fingerprint != fingerprint or entry.loop is not loop:
+            stale, entry = entry, _PooledClient(self._build(profile), fingerprint, loop)
+            self._clients[profile.id] = entry
+            # A client left behind by a closed event loop cannot be closed from this one.
+            if stale is not None and stale.loop is loop:
+                await self._retire(stale)
+        entry.users += 1
+        try:
+            yield entry.client
+        finally:
+            entry.users -= 1
+            if entry.retired and entry.users == 0:
+                await entry.client.aclose()
+
+    async def aclose(self) -> None:
+        """Close every client; call on shutdown."""
+        entries = list(self._clients.values())
+        self._clients.clear()
+        for entry in entries:
+            entry.retired = True
+            if entry.loop is asyncio.get_running_loop():
+                await entry.client.aclose()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import codecs
+from collections.abc import Iterable, Iterator
+
+from pydantic import ValidationError
+
+from ..models.problem import ProblemImportProgress, ProblemImportRejectedLine, ProblemInput
+from ..storage.file_manager import FileManager
+
+DEFAULT_IMPORT_CHUNK_SIZE = 500
+MAX_IMPORT_CHUNK_SIZE = 5000
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    parts = []
+    for err in exc.errors(include_url=False, include_input=False):
+        loc = ".".join(str(part) for part in err.get("loc", ()))
+        parts.append(f"{loc}: {err['msg']}" if loc else err["msg"])
+    return "; ".join(parts)
+
+
+def iter_ndjson_import(
+    fm: FileManager,
+    lines: Iterable[bytes],
+    chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+) -> Iterator[ProblemImportProgress]:
+    """Upsert newline-delimited ``ProblemInput`` records ``chunk_size`` at a time.
+
+    Yields one progress entry per committed chunk (rejected lines are reported with
+    their 1-based line number and never stop the import), then a ``done`` summary.
+    """
+    chunk: list[ProblemInput] = []
+    rejected: list[ProblemImportRejectedLine] = []
+    chunk_no = 0
+    first_line = 1
+    line_no = 0
+    total_imported = 0
+    total_updated = 0
+    total_rejected = 0
+
+    def commit() -> ProblemImportProgress:
+        nonlocal chunk, rejected, chunk_no, first_line, total_imported, total_updated, total_rejected
+        chunk_no += 1
+        imported = updated = 0
+        timings = None
+        if chunk:
+            imported, updated, _, timings = fm.bulk_upsert_problems(chunk)
+        progress = ProblemImportProgress(
+            chunk=chunk_no,
+            first_line=first_line,
+            last_line=line_no,
+            imported=imported,
+            updated=updated,
+            rejected=rejected,
+            rejected_count=len(rejected),
+            timings=timings,
+        )
+        total_imported += imported
+        total_updated += updated
+        total_rejected += len(rejected)
+        chunk = []
+        rejected = []
+        first_line = line_no + 1
+        return progress
+
+    for raw in lines:
+        line_no += 1
+        if line_no == 1 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        raw = raw.strip()
+        if raw:
+            try:
+                chunk.append(ProblemInput.model_validate_json(raw))
+            except ValidationError as exc:
+                rejected.append(ProblemImportRejectedLine(line=line_no, error=_format_validation_error(exc)))
+        if len(chunk) + len(rejected) >= chunk_size:
+            yield commit()
+
+    if chunk or rejected:
+        yield commit()
+
+    yield ProblemImportProgress(
+        chunk=chunk_no,
+        first_line=1,
+        last_line=line_no,
+        imported=total_imported,
+        updated=total_updated,
+        rejected_count=total_rejected,
+        done=True,
+    )
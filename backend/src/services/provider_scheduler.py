@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+
+from ..models.settings import AIProfile
+
+# Rough cost of one attached image, in tokens.
+_IMAGE_TOKENS = 1500
+
+# Ceiling of an adaptive limit when the profile sets no max_concurrency.
+ADAPTIVE_CEILING = 16
+# Smoothing of the time-to-first-token average, and how far above its baseline it may drift.
+_TTFT_SMOOTHING = 0.2
+_TTFT_TOLERANCE = 2.0
+# Share of the gap to the smoothed TTFT the baseline closes after each round, so it can follow a provider that got slower.
+_BASELINE_DRIFT = 0.05
+_MAX_ERROR_RATE = 0.1
+_DECISION_LOG = 50
+
+# Seconds the current task has spent waiting for a slot or for rate limits.
+_waits: ContextVar[list[float] | None] = ContextVar("provider_waits", default=None)
+
+
+def estimate_tokens(text: str, images: int = 0) -> int:
+    """Cheap token estimate: ~4 ASCII characters per token, one token per other character."""
+    wide = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - wide) // 4 + wide + images * _IMAGE_TOKENS
+
+
+def _record_wait(seconds: float) -> None:
+    waits = _waits.get()
+    if waits is not None:
+        waits.append(seconds)
+
+
+@contextmanager
+def track_waits() -> Iterator[list[float]]:
+    """Collect the slot and rate-limit waits of everything run inside the block."""
+    waits: list[float] = []
+    token = _waits.set(waits)
+    try:
+        yield waits
+    finally:
+        _waits.reset(token)
+
+
+class RequestTiming:
+    """Start and first-token times of one upstream request."""
+
+    __slots__ = ("started", "first_token")
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.first_token: float | None = None
+
+    def mark_first_token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.monotonic()
+
+    @property
+    def ttft(self) -> float | None:
+        return None if self.first_token is None else self.first_token - self.started
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit driven by the outcome of each upstream request.
+
+    Requests are judged in rounds of ``limit`` completions. A round in which the
+    limit was actually reached, at most 10% of requests failed and the smoothed
+    time-to-first-token stayed within twice its baseline raises the limit by one.
+    A 429, a 5xx, a timeout or the smoothed TTFT crossing that bound halves it
+    immediately; requests that started before the last cut cannot cut again, so a
+    burst of failures counts as one congestion event.
+    """
+
+    def __init__(self, initial: int, ceiling: int):
+        self.ceiling = max(1, ceiling)
+        self.limit = min(max(1, initial), self.ceiling)
+        self.ttft_ewma: float | None = None
+        self.ttft_baseline: float | None = None
+        self.decisions: deque[dict] = deque(maxlen=_DECISION_LOG)
+        self._last_decrease = float("-inf")
+        self._reset_round()
+
+    def _reset_round(self) -> None:
+        self._round_total = 0
+        self._round_errors = 0
+        self._round_saturated = False
+
+    def _change(self, limit: int, action: str, reason: str) -> None:
+        self.decisions.append(
+            {"at": datetime.now(UTC), "action": action, "reason": reason, "from_limit": self.limit, "to_limit": limit}
+        )
+        self.limit = limit
+
+    def set_ceiling(self, ceiling: int) -> None:
+        self.ceiling = max(1, ceiling)
+        if self.limit > self.ceiling:
+            self._change(self.ceiling, "decrease", "ceiling lowered")
+
+    def _decrease(self, started: float, reason: str) -> None:
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._change(max(1, self.limit // 2), "decrease", reason)
+        # Judge the new limit on fresh samples only.
+        self.ttft_ewma = None
+        self._reset_round()
+
+    def observe(self, timing: RequestTiming, *, saturated: bool, failed: bool, overload: str | None) -> None:
+        if overload is not None:
+            self._decrease(timing.started, overload)
+            return
+        self._round_total += 1
+        self._round_errors += failed
+        self._round_saturated |= saturated
+        ttft = timing.ttft
+        if ttft is not None:
+            self.ttft_ewma = ttft if self.ttft_ewma is None else self.ttft_ewma + _TTFT_SMOOTHING * (ttft - self.ttft_ewma)
+            self.ttft_baseline = ttft if self.ttft_baseline is None else min(self.ttft_baseline, ttft)
+            if self.ttft_ewma > self.ttft_baseline * _TTFT_TOLERANCE:
+                self._decrease(timing.started, "time to first token rising")
+                return
+        if self._round_total < self.limit:
+            return
+        healthy = self._round_errors <= self._round_total * _MAX_ERROR_RATE
+        if healthy and self._round_saturated and self.limit < self.ceiling:
+            self._change(self.limit + 1, "increase", "healthy round at the limit")
+        if self.ttft_baseline is not None and self.ttft_ewma is not None:
+            self.ttft_baseline += _BASELINE_DRIFT * (self.ttft_ewma - self.ttft_baseline)
+        self._reset_round()
+
+
+class TokenBucket:
+    """Reservation-style token bucket refilled at ``per_minute / 60`` per second.
+
+    Holds at most ``BURST_SECONDS`` worth of budget so a full bucket cannot fire a
+    minute of requests at once. A reservation is granted as soon as the bucket is
+    out of debt and then debits its full amount, so large requests never starve;
+    they only push back the ones after them.
+    """
+
+    BURST_SECONDS = 10
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._rate = per_minute / 60.0
+        self._capacity = max(1.0, self._rate * self.BURST_SECONDS)
+        self._level = self._capacity
+        self._stamp = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self._capacity, self._level + (now - self._stamp) * self._rate)
+        self._stamp = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` and return how many seconds to wait before using it."""
+        self._refill()
+        delay = 0.0 if self._level >= 0 else -self._level / self._rate
+        self._level -= amount
+        return delay
+
+    def charge(self, amount: float) -> None:
+        """Debit usage that is only known afterwards (e.g. output tokens)."""
+        self._refill()
+        self._level -= amount
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._level
+
+
+class _Waiter:
+    __slots__ = ("future", "rank", "flow", "weight", "ticket")
+
+    def __init__(self, future: asyncio.Future[None], rank: int, flow: str, weight: int, ticket: str | None):
+        self.future = future
+        self.rank = rank
+        self.flow = flow
+        self.weight = weight
+        self.ticket = ticket
+
+
+class ProviderLimiter:
+    """Concurrency slots plus request and token budgets for one AI profile.
+
+    Waiters are queued per ``(rank, flow)``. A free slot goes to the lowest rank
+    with anyone waiting; within a rank, flows share slots in proportion to their
+    weights (stride scheduling), and each flow is FIFO. A flow that goes idle
+    rejoins at the rank's current virtual time, so it cannot bank credit. Limits
+    can be changed in place while tasks hold slots; raising the limit wakes
+    waiters immediately, lowering it takes effect as running tasks finish. A limit
+    of 0 for requests or tokens per minute means unlimited.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        *,
+        adaptive_start: int | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.active = 0
+        self.adaptive: AdaptiveLimit | None = None
+        self._queues: dict[tuple[int, str], deque[_Waiter]] = {}
+        self._passes: dict[tuple[int, str], float] = {}
+        self._clock: dict[int, float] = {}
+        self._tickets: dict[str, _Waiter] = {}
+        self._requests: TokenBucket | None = None
+        self._tokens: TokenBucket | None = None
+        self.configure(self.max_concurrency, requests_per_minute, tokens_per_minute, adaptive_start=adaptive_start)
+
+    def configure(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        *,
+        adaptive_start: int | None = None,
+    ) -> None:
+        """Apply limits; with ``adaptive_start`` the concurrency adapts between 1 and ``max_concurrency``."""
+        self.max_concurrency = max(1, max_concurrency)
+        if adaptive_start is None:
+            self.adaptive = None
+        elif self.adaptive is None:
+            self.adaptive = AdaptiveLimit(adaptive_start, self.max_concurrency)
+        else:
+            self.adaptive.set_ceiling(self.max_concurrency)
+        if requests_per_minute != (self._requests.per_minute if self._requests else 0):
+            self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        if tokens_per_minute != (self._tokens.per_minute if self._tokens else 0):
+            self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._wake()
+
+    @property
+    def limit(self) -> int:
+        return self.adaptive.limit if self.adaptive is not None else self.max_concurrency
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for queue in self._queues.values() for waiter in queue if not waiter.future.done())
+
+    async def acquire(self, *, rank: int = 0, flow: str = "", weight: int = 1, ticket: str | None = None) -> float:
+        """Wait for a slot; returns the seconds spent waiting.
+
+        Lower ``rank`` goes first; ``ticket`` names the waiter for ``reprioritize``.
+        """
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return 0.0
+        started = time.monotonic()
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), rank, flow, max(1, weight), ticket)
+        self._enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was handed over just as we were cancelled: pass it on.
+                self.release()
+            raise
+        finally:
+            if ticket is not None and self._tickets.get(ticket) is waiter:
+                del self._tickets[ticket]
+        return time.monotonic() - started
+
+    def _enqueue(self, waiter: _Waiter, front: bool = False) -> None:
+        key = (waiter.rank, waiter.flow)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._passes[key] = max(self._passes.get(key, 0.0), self._clock.get(waiter.rank, 0.0))
+        if front:
+            queue.appendleft(waiter)
+        else:
+            queue.append(waiter)
+        if waiter.ticket is not None:
+            self._tickets[waiter.ticket] = waiter
+
+    def _next_waiter(self) -> _Waiter | None:
+        best: tuple[int, float] | None = None
+        best_key: tuple[int, str] | None = None
+        for key, queue in list(self._queues.items()):
+            while queue and queue[0].future.done():
+                queue.popleft()
+            if not queue:
+                del self._queues[key]
+                continue
+            order = (key[0], self._passes[key])
+            if best is None or order < best:
+                best, best_key = order, key
+        if best_key is None:
+            return None
+        queue = self._queues[best_key]
+        waiter = queue.popleft()
+        if not queue:
+            del self._queues[best_key]
+        self._clock[best_key[0]] = self._passes[best_key]
+        self._passes[best_key] += 1.0 / waiter.weight
+        return waiter
+
+    def reprioritize(self, ticket: str, rank: int, *, front: bool = False) -> bool:
+        """Move a waiting ``ticket`` to ``rank`` (to the head of its flow with ``front``); False if not waiting."""
+        waiter = self._tickets.get(ticket)
+        if waiter is None or waiter.future.done():
+            return False
+        key = (waiter.rank, waiter.flow)
+        queue = self._queues[key]
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[key]
+        waiter.rank = rank
+        self._enqueue(waiter, front=front)
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.active < self.limit:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.active += 1
+            waiter.future.set_result(None)
+
+    def throttle_delay(self, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; returns the seconds to wait first."""
+        delay = 0.0
+        if self._requests is not None:
+            delay = self._requests.reserve(1)
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(tokens))
+        return delay
+
+    def charge(self, tokens: int) -> None:
+        if self._tokens is not None:
+            self._tokens.charge(tokens)
+
+    def observe(self, timing: RequestTiming, *, failed: bool = False, overload: str | None = None) -> None:
+        """Feed the outcome of one upstream request to the adaptive limit, if any."""
+        if self.adaptive is None:
+            return
+        self.adaptive.observe(timing, saturated=self.active >= self.limit, failed=failed, overload=overload)
+        self._wake()
+
+    def stats(self) -> dict:
+        adaptive = self.adaptive
+        return {
+            "limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "adaptive": adaptive is not None,
+            "ttft_ms": None if adaptive is None or adaptive.ttft_ewma is None else round(adaptive.ttft_ewma * 1000),
+            "ttft_baseline_ms": (
+                None if adaptive is None or adaptive.ttft_baseline is None else round(adaptive.ttft_baseline * 1000)
+            ),
+            "decisions": list(adaptive.decisions) if adaptive is not None else [],
+            "active": self.active,
+            "queued": self.queued,
+            "requests_per_minute": self._requests.per_minute if self._requests else 0,
+            "tokens_per_minute": self._tokens.per_minute if self._tokens else 0,
+            "tokens_available": round(self._tokens.available) if self._tokens else None,
+        }
+
+
+class ProviderScheduler:
+    """Per-profile ``ProviderLimiter`` registry shared by ``TaskRunner`` and ``AIClient``.
+
+    ``TaskRunner`` holds a profile's slot for a whole task; ``AIClient`` spends the
+    request and token budgets on every upstream call, retries included, and
+    reports how each call went so adaptive profiles can tune their concurrency.
+    Limiters follow profile edits on the next lookup. Used from the event loop only.
+    """
+
+    def __init__(self, default_concurrency: int = 2):
+        self.default_concurrency = default_concurrency
+        self._limiters: dict[str, ProviderLimiter] = {}
+
+    def limiter(self, profile: AIProfile) -> ProviderLimiter:
+        if profile.adaptive_concurrency:
+            concurrency = profile.max_concurrency or ADAPTIVE_CEILING
+            adaptive_start = min(self.default_concurrency, concurrency)
+        else:
+            concurrency = profile.max_concurrency or self.default_concurrency
+            adaptive_start = None
+        limiter = self._limiters.get(profile.id)
+        if limiter is None:
+            limiter = self._limiters[profile.id] = ProviderLimiter(
+                concurrency, profile.requests_per_minute, profile.tokens_per_minute, adaptive_start=adaptive_start
+            )
+        else:
+            limiter.configure(
+                concurrency, profile.requests_per_minute, profile.tokens_per_minute, adaptive_start=adaptive_start
+            )
+        return limiter
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        profile: AIProfile,
+        *,
+        rank: int = 0,
+        flow: str = "",
+        weight: int = 1,
+        ticket: str | None = None,
+    ) -> AsyncIterator[float]:
+        limiter = self.limiter(profile)
+        waited = await limiter.acquire(rank=rank, flow=flow, weight=weight, ticket=ticket)
+        _record_wait(waited)
+        try:
+            yield waited
+        finally:
+            limiter.release()
+
+    async def throttle(self, profile: AIProfile, tokens: int) -> float:
+        delay = self.limiter(profile).throttle_delay(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            _record_wait(delay)
+        return delay
+
+    def charge(self, profile: AIProfile, tokens: int) -> None:
+        self.limiter(profile).charge(tokens)
+
+    def observe(self, profile: AIProfile, timing: RequestTiming, *, failed: bool = False, overload: str | None = None) -> None:
+        self.limiter(profile).observe(timing, failed=failed, overload=overload)
+
+    def reprioritize(self, ticket: str, rank: int, *, front: bool = False) -> bool:
+        return any(limiter.reprioritize(ticket, rank, front=front) for limiter in self._limiters.values())
+
+    def stats(self) -> dict[str, dict]:
+        return {profile_id: limiter.stats() for profile_id, limiter in self._limiters.items()}
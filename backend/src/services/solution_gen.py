@@ -2,7 +2,7 @@
 
 from ..models.problem import ProblemRecord
 from ..models.settings import AISettings, PromptSettings, WeeklyPromptStyle
-from .ai_client import AIClient
+from .ai_client import AIClient, StreamCallback
 from .prompt_renderer import render_template
 
 
@@ -63,6 +63,8 @@ class SolutionGenerator:
         default_ac_language: str = "",
         prompt_settings: PromptSettings | None = None,
         images_base64: list[str] | None = None,
+        on_event: StreamCallback | None = None,
+        prefix: str = "",
     ) -> str:
         prompt = build_solution_prompt(
             problem,
@@ -70,4 +72,6 @@ class SolutionGenerator:
             default_ac_language=default_ac_language,
             prompt_settings=prompt_settings,
         )
-        return await self.ai_client.generate_solution(prompt, ai_settings, images_base64=images_base64)
+        return await self.ai_client.generate_solution(
+            prompt, ai_settings, images_base64=images_base64, on_event=on_event, prefix=prefix
+        )
@@ -9,6 +9,50 @@ from ..models.settings import AISettings
 from .ai_client import AIClient
 
 
+def _trim_text(text: str, limit: int) -> str:
+    value = str(text or "").strip()
+    if len(value) <= limit:
+        return value
+    return value[:limit] + "\n...<truncated>"
+
+
+def build_tag_prompt(problem: ProblemRecord, solution_markdown: str = "") -> str:
+    payload = {
+        "source": problem.source,
+        "id": problem.id,
+        "title": problem.title,
+        "content": _trim_text(problem.content, 4000),
+        "input_format": _trim_text(problem.input_format, 1200),
+        "output_format": _trim_text(problem.output_format, 1200),
+        "constraints": _trim_text(problem.constraints, 1200),
+        "reflection": _trim_text(problem.reflection, 1200),
+        "my_ac_code": _trim_text(problem.my_ac_code, 2000),
+        "my_ac_language": problem.my_ac_language,
+    }
+    if solution_markdown.strip():
+        payload["solution_markdown"] = _trim_text(solution_markdown, 12000)
+
+    payload_json = json.dumps(payload, ensure_ascii=False, indent=2)
+    return (
+        "你是一名 ACM/ICPC 竞赛教练。请根据题目信息生成算法标签与难度。\n"
+        "输出必须是一个 JSON 对象，且只能包含这两个字段：\n"
+        "{\n"
+        '  "tags": ["中文标签1", "中文标签2"],\n'
+        '  "difficulty": 1700\n'
+        "}\n\n"
+        "要求：\n"
+        "1) tags 必须是中文算法标签；\n"
+        "2) difficulty 必须使用 Codeforces 风格区间 800-3500；\n"
+        "3) difficulty 必须是 100 的倍数；\n"
+        "4) 禁止输出任何 JSON 之外的解释文本。\n\n"
+        "可参考标签（可增减，但必须中文）：动态规划、贪心、图论、数学、二分查找、"
+        "深度优先搜索、广度优先搜索、双指针、排序、字符串、数论、组合数学、"
+        "计算几何、数据结构、线段树、位运算、模拟、构造、暴力枚举。\n\n"
+        "题目信息如下：\n"
+        f"```json\n{payload_json}\n```"
+    )
+
+
 class TagGenerator:
     _TAG_ALIAS = {
         "dp": "动态规划",
@@ -44,47 +88,8 @@ class TagGenerator:
     def __init__(self, ai_client: AIClient):
         self.ai_client = ai_client
 
-    def _trim_text(self, text: str, limit: int) -> str:
-        value = str(text or "").strip()
-        if len(value) <= limit:
-            return value
-        return value[:limit] + "\n...<truncated>"
-
     def build_prompt(self, problem: ProblemRecord, solution_markdown: str = "") -> str:
-        payload = {
-            "source": problem.source,
-            "id": problem.id,
-            "title": problem.title,
-            "content": self._trim_text(problem.content, 4000),
-            "input_format": self._trim_text(problem.input_format, 1200),
-            "output_format": self._trim_text(problem.output_format, 1200),
-            "constraints": self._trim_text(problem.constraints, 1200),
-            "reflection": self._trim_text(problem.reflection, 1200),
-            "my_ac_code": self._trim_text(problem.my_ac_code, 2000),
-            "my_ac_language": problem.my_ac_language,
-        }
-        if solution_markdown.strip():
-            payload["solution_markdown"] = self._trim_text(solution_markdown, 12000)
-
-        payload_json = json.dumps(payload, ensure_ascii=False, indent=2)
-        return (
-            "你是一名 ACM/ICPC 竞赛教练。请根据题目信息生成算法标签与难度。\n"
-            "输出必须是一个 JSON 对象，且只能包含这两个字段：\n"
-            "{\n"
-            '  "tags": ["中文标签1", "中文标签2"],\n'
-            '  "difficulty": 1700\n'
-            "}\n\n"
-            "要求：\n"
-            "1) tags 必须是中文算法标签；\n"
-            "2) difficulty 必须使用 Codeforces 风格区间 800-3500；\n"
-            "3) difficulty 必须是 100 的倍数；\n"
-            "4) 禁止输出任何 JSON 之外的解释文本。\n\n"
-            "可参考标签（可增减，但必须中文）：动态规划、贪心、图论、数学、二分查找、"
-            "深度优先搜索、广度优先搜索、双指针、排序、字符串、数论、组合数学、"
-            "计算几何、数据结构、线段树、位运算、模拟、构造、暴力枚举。\n\n"
-            "题目信息如下：\n"
-            f"```json\n{payload_json}\n```"
-        )
+        return build_tag_prompt(problem, solution_markdown)
 
     def _extract_json_object(self, raw: str) -> dict[str, Any]:
         text = str(raw or "").strip()
@@ -1,139 +1,382 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import os
+from collections.abc import Coroutine, Iterator
+from contextlib import AbstractAsyncContextManager, contextmanager
+from typing import Any
 
 from ..models.problem import SolutionStatus
-from ..models.task import TaskStatus
+from ..models.settings import AISettings
+from ..models.task import SolutionTaskRecord, TaskPriority, TaskStatus, TaskType
 from ..storage.file_manager import FileManager
-from .solution_gen import SolutionGenerator
-from .tag_gen import TagGenerator
+from .ai_client import StreamCallback
+from .provider_scheduler import ProviderScheduler, track_waits
+from .solution_gen import SolutionGenerator, build_solution_prompt
+from .tag_gen import TagGenerator, build_tag_prompt
+from .task_stream import TaskStream, TaskStreamHub
+
+
+_PRIORITY_RANK = {TaskPriority.interactive: 0, TaskPriority.batch: 1, TaskPriority.background: 2}
+# Slot shares between task types queued in the same priority class; tag tasks are
+# short, so they get two slots for every solution slot.
+_TYPE_WEIGHTS = {TaskType.solution: 1, TaskType.ai_tag: 2}
+
+
+_ACTIVE = {TaskStatus.queued, TaskStatus.running}
+
+FlightKey = tuple[TaskType, str, str]
+
+
+def _waited_ms(waits: list[float]) -> int:
+    return round(sum(waits) * 1000)
+
+
+def _prompt_hash(prompt: str, images: list[str] | None = None) -> str:
+    digest = hashlib.sha256(prompt.encode("utf-8"))
+    for image in images or []:
+        digest.update(b"\0" + image.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _flight_key(task: SolutionTaskRecord) -> FlightKey | None:
+    if task.prompt_hash is None:
+        return None
+    return task.task_type, task.problem_key, task.prompt_hash
 
 
 class TaskRunner:
-    def __init__(self, fm: FileManager, solution_generator: SolutionGenerator, tag_generator: TagGenerator):
+    def __init__(
+        self,
+        fm: FileManager,
+        solution_generator: SolutionGenerator,
+        tag_generator: TagGenerator,
+        scheduler: ProviderScheduler | None = None,
+    ):
         self.fm = fm
         self.solution_generator = solution_generator
         self.tag_generator = tag_generator
+        # Default per-profile concurrency for profiles without their own max_concurrency.
         self.max_concurrency = int(os.getenv("TASK_MAX_CONCURRENCY", "2"))
-        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.max_attempts = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+        self.scheduler = scheduler if scheduler is not None else ProviderScheduler()
+        self.scheduler.default_concurrency = self.max_concurrency
+        # The event loop only keeps weak references to tasks; hold them until they finish.
+        self._inflight: set[asyncio.Task[None]] = set()
+        self._handles: dict[str, asyncio.Task[None]] = {}
+        # Single-flight index: (task type, problem key, prompt hash) -> id of the task doing that work.
+        self._flights: dict[FlightKey, str] = {}
+        # Live output of queued and running solution tasks, for GET /tasks/{id}/stream.
+        self.streams = TaskStreamHub()
+
+    def _spawn(self, task: SolutionTaskRecord, coro: Coroutine[Any, Any, None]) -> None:
+        task_id = task.task_id
+        handle = asyncio.create_task(coro)
+        self._inflight.add(handle)
+        self._handles[task_id] = handle
+        key = _flight_key(task)
+        if key is not None:
+            self._flights[key] = task_id
+        if task.task_type == TaskType.solution:
+            self.streams.open(task_id)
+
+        def _forget(done: asyncio.Task[None]) -> None:
+            self._inflight.discard(done)
+            if self._handles.get(task_id) is done:
+                del self._handles[task_id]
+            if key is not None and self._flights.get(key) == task_id:
+                del self._flights[key]
+            record = self.fm.get_task(task_id)
+            self.streams.close(task_id, record.status.value if record is not None else TaskStatus.failed.value)
+            # A run torn down by shutdown is still marked active; keep its partial for the resumed run.
+            if record is None or record.status not in _ACTIVE:
+                self.fm.discard_task_partial(task_id)
+
+        handle.add_done_callback(_forget)
+
+    async def resume(self) -> list[str]:
+        """Re-queue the tasks a previous process left unfinished; call once on startup."""
+        runners = {TaskType.solution: self._run_solution_task, TaskType.ai_tag: self._run_ai_tag_task}
+        task_ids: list[str] = []
+        for task in self.fm.reclaim_orphaned_tasks(self.max_attempts):
+            self._spawn(task, runners[task.task_type](task.task_id))
+            task_ids.append(task.task_id)
+        return task_ids
+
+    @staticmethod
+    def _ai_settings_for(ai_settings: AISettings, task: SolutionTaskRecord) -> AISettings:
+        """``ai_settings`` resolving to the profile ``task`` was enqueued on, or as-is if that profile is gone."""
+        for profile in ai_settings.profiles:
+            if profile.id == task.profile_id or (task.profile_id is None and profile.name == task.provider_name):
+                return ai_settings.model_copy(update={"active_profile_id": profile.id})
+        return ai_settings
+
+    def _slot(self, task: SolutionTaskRecord) -> AbstractAsyncContextManager[float]:
+        profile = self._ai_settings_for(self.fm.get_settings().ai, task).resolve_active_profile()
+        return self.scheduler.slot(
+            profile,
+            rank=_PRIORITY_RANK[task.priority],
+            flow=task.task_type.value,
+            weight=_TYPE_WEIGHTS.get(task.task_type, 1),
+            ticket=task.task_id,
+        )
+
+    def reprioritize(self, task_id: str, priority: TaskPriority, *, bump: bool = False) -> SolutionTaskRecord | None:
+        """Change the class of a queued task; ``bump`` also puts it at the head of its queue.
+
+        Returns ``None`` for an unknown task and raises ``ValueError`` if it is no longer queued.
+        """
+        task = self.fm.get_task(task_id)
+        if task is None:
+            return None
+        if task.status != TaskStatus.queued:
+            raise ValueError(f"task is {task.status.value}, only queued tasks can be reprioritized")
+        updated = self.fm.update_task(task_id, priority=priority)
+        self.scheduler.reprioritize(task_id, _PRIORITY_RANK[priority], front=bump)
+        return updated
+
+    def cancel(self, task_id: str) -> SolutionTaskRecord | None:
+        """Cancel a queued or running solution or tag task.
+
+        The record is marked cancelled first, then its coroutine is cancelled, which
+        drops it from the slot queue or aborts the provider stream and frees the
+        slot. Returns ``None`` for an unknown task and raises ``ValueError`` if it
+        cannot be cancelled.
+        """
+        task = self.fm.get_task(task_id)
+        if task is None:
+            return None
+        if task.task_type not in {TaskType.solution, TaskType.ai_tag}:
+            raise ValueError(f"{task.task_type.value} tasks cannot be cancelled")
+        if task.status not in _ACTIVE:
+            raise ValueError(f"task is {task.status.value}, only queued or running tasks can be cancelled")
+        updated = self.fm.update_task(task_id, status=TaskStatus.cancelled, error_message="cancelled", finished=True)
+        if task.task_type == TaskType.solution:
+            problem = self.fm.get_problem_by_key(task.problem_key)
+            if problem is not None:
+                has_solution = self.fm.read_solution_file(problem.source, problem.id) is not None
+                self.fm.set_problem_solution_state(
+                    task.problem_key, SolutionStatus.done if has_solution else SolutionStatus.none
+                )
+        handle = self._handles.get(task_id)
+        if handle is not None:
+            handle.cancel()
+        return updated
+
+    def cancel_many(self, task_ids: list[str]) -> list[str]:
+        """Cancel ``task_ids`` (every queued and running solution and tag task when empty); returns those cancelled."""
+        if not task_ids:
+            task_ids = [
+                task.task_id
+                for task in self.fm.list_active_tasks()
+                if task.task_type in {TaskType.solution, TaskType.ai_tag}
+            ]
+        cancelled: list[str] = []
+        for task_id in task_ids:
+            try:
+                if self.cancel(task_id) is not None:
+                    cancelled.append(task_id)
+            except ValueError:
+                continue
+        return cancelled
+
+    @contextmanager
+    def _checkpoint(self, task_id: str, stream: TaskStream | None) -> Iterator[StreamCallback]:
+        """Stream callback appending each delta to the task's partial file before fanning it out."""
+        with self.fm.open_task_partial(task_id) as append:
+
+            def _on_event(event: str, data: str) -> None:
+                append(data)
+                if stream is not None:
+                    stream.publish(event, data)
+
+            yield _on_event
 
-    async def enqueue_solution_task(self, problem_key: str) -> str:
+    def _deadline(self, task: SolutionTaskRecord) -> int | None:
+        return self.fm.get_settings().ui.task_deadline_seconds.get(task.task_type) or None
+
+    def _join_flight(self, key: FlightKey, priority: TaskPriority) -> str | None:
+        """Id of the queued or running task already doing ``key``, raised to ``priority`` if that ranks higher."""
+        task_id = self._flights.get(key)
+        if task_id is None:
+            return None
+        task = self.fm.get_task(task_id)
+        if task is None or task.status not in _ACTIVE:
+            return None
+        if task.status == TaskStatus.queued and _PRIORITY_RANK[priority] < _PRIORITY_RANK[task.priority]:
+            self.reprioritize(task_id, priority)
+        return task_id
+
+    async def enqueue_solution_task(self, problem_key: str, priority: TaskPriority = TaskPriority.batch) -> str:
         settings = self.fm.get_settings()
+        prompt_hash: str | None = None
+        problem = self.fm.get_problem_by_key(problem_key)
+        if problem is not None:
+            prompt = build_solution_prompt(
+                problem,
+                settings.prompts.solution_template,
+                default_ac_language=settings.ui.default_ac_language.value,
+                prompt_settings=settings.prompts,
+            )
+            prompt_hash = _prompt_hash(prompt, [img.relative_path for img in problem.solution_images if img.relative_path])
+            existing = self._join_flight((TaskType.solution, problem_key, prompt_hash), priority)
+            if existing is not None:
+                return existing
+
         active_profile = settings.ai.resolve_active_profile()
-        task = self.fm.create_task(problem_key, provider_name=active_profile.name)
+        task = self.fm.create_task(
+            problem_key,
+            provider_name=active_profile.name,
+            profile_id=active_profile.id,
+            priority=priority,
+            prompt_hash=prompt_hash,
+        )
         self.fm.set_problem_solution_state(problem_key, SolutionStatus.queued)
-        asyncio.create_task(self._run_solution_task(task.task_id))
+        self._spawn(task, self._run_solution_task(task.task_id))
         return task.task_id
 
-    async def enqueue_ai_tag_task(self, problem_key: str) -> str:
+    async def enqueue_ai_tag_task(self, problem_key: str, priority: TaskPriority = TaskPriority.interactive) -> str:
         settings = self.fm.get_settings()
+        prompt_hash: str | None = None
+        problem = self.fm.get_problem_by_key(problem_key)
+        if problem is not None:
+            solution_markdown = self.fm.read_solution_file(problem.source, problem.id) or ""
+            prompt_hash = _prompt_hash(build_tag_prompt(problem, solution_markdown))
+            existing = self._join_flight((TaskType.ai_tag, problem_key, prompt_hash), priority)
+            if existing is not None:
+                return existing
+
         active_profile = settings.ai.resolve_active_profile()
-        task = self.fm.create_ai_tag_task(problem_key, provider_name=active_profile.name)
-        asyncio.create_task(self._run_ai_tag_task(task.task_id))
+        task = self.fm.create_ai_tag_task(
+            problem_key,
+            provider_name=active_profile.name,
+            profile_id=active_profile.id,
+            priority=priority,
+            prompt_hash=prompt_hash,
+        )
+        self._spawn(task, self._run_ai_tag_task(task.task_id))
         return task.task_id
 
     async def _run_solution_task(self, task_id: str) -> None:
-        async with self._semaphore:
-            task = self.fm.get_task(task_id)
-            if task is None:
-                return
+        task = self.fm.get_task(task_id)
+        if task is None or task.status != TaskStatus.queued:
+            return
+        deadline = self._deadline(task)
+        with track_waits() as waits:
+            async with self._slot(task):
+                self.fm.update_task(task_id, status=TaskStatus.running, started=True, queue_wait_ms=_waited_ms(waits))
+                self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.running)
 
-            self.fm.update_task(task_id, status=TaskStatus.running, started=True)
-            self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.running)
+                problem = self.fm.get_problem_by_key(task.problem_key)
+                if problem is None:
+                    err = f"problem not found for key={task.problem_key}"
+                    self.fm.update_task(task_id, status=TaskStatus.failed, error_message=err, finished=True)
+                    self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.failed)
+                    return
 
-            problem = self.fm.get_problem_by_key(task.problem_key)
-            if problem is None:
-                err = f"problem not found for key={task.problem_key}"
-                self.fm.update_task(task_id, status=TaskStatus.failed, error_message=err, finished=True)
-                self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.failed)
-                return
+                timeout = asyncio.timeout(deadline)
+                try:
+                    # Load solution images if any
+                    images_base64: list[str] = []
+                    for img_meta in problem.solution_images:
+                        if img_meta.relative_path:
+                            b64 = self.fm.read_solution_image_base64(img_meta.relative_path)
+                            if b64:
+                                images_base64.append(b64)
 
-            try:
-                # Load solution images if any
-                images_base64: list[str] = []
-                for img_meta in problem.solution_images:
-                    if img_meta.relative_path:
-                        b64 = self.fm.read_solution_image_base64(img_meta.relative_path)
-                        if b64:
-                            images_base64.append(b64)
-
-                settings = self.fm.get_settings()
-                content = await self.solution_generator.generate(
-                    problem,
-                    prompt_template=settings.prompts.solution_template,
-                    ai_settings=settings.ai,
-                    default_ac_language=settings.ui.default_ac_language.value,
-                    prompt_settings=settings.prompts,
-                    images_base64=images_base64,
-                )
-                output_path = self.fm.save_solution_file(problem, content)
-                self.fm.update_task(
-                    task_id,
-                    status=TaskStatus.succeeded,
-                    output_path=output_path,
-                    error_message="",
-                    finished=True,
-                )
-                self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.done, mark_needs_solution=False)
-            except Exception as exc:
-                self.fm.update_task(
-                    task_id,
-                    status=TaskStatus.failed,
-                    error_message=str(exc),
-                    finished=True,
-                )
-                self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.failed, mark_needs_solution=True)
+                    settings = self.fm.get_settings()
+                    stream = self.streams.get(task_id)
+                    # Output an interrupted earlier run already received; the model continues it.
+                    prefix = self.fm.read_task_partial(task_id)
+                    if stream is not None and prefix:
+                        stream.publish("delta", prefix)
+                    with self._checkpoint(task_id, stream) as on_event:
+                        async with timeout:
+                            content = await self.solution_generator.generate(
+                                problem,
+                                prompt_template=settings.prompts.solution_template,
+                                ai_settings=self._ai_settings_for(settings.ai, task),
+                                default_ac_language=settings.ui.default_ac_language.value,
+                                prompt_settings=settings.prompts,
+                                images_base64=images_base64,
+                                on_event=on_event,
+                                prefix=prefix,
+                            )
+                    output_path = self.fm.save_solution_file(problem, content)
+                    self.fm.update_task(
+                        task_id,
+                        status=TaskStatus.succeeded,
+                        output_path=output_path,
+                        error_message="",
+                        queue_wait_ms=_waited_ms(waits),
+                        finished=True,
+                    )
+                    self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.done, mark_needs_solution=False)
+                except Exception as exc:
+                    self.fm.update_task(
+                        task_id,
+                        status=TaskStatus.failed,
+                        error_message=f"deadline of {deadline}s exceeded" if timeout.expired() else str(exc),
+                        queue_wait_ms=_waited_ms(waits),
+                        finished=True,
+                    )
+                    self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.failed, mark_needs_solution=True)
 
     async def _run_ai_tag_task(self, task_id: str) -> None:
-        async with self._semaphore:
-            task = self.fm.get_task(task_id)
-            if task is None:
-                return
+        task = self.fm.get_task(task_id)
+        if task is None or task.status != TaskStatus.queued:
+            return
+        deadline = self._deadline(task)
+        with track_waits() as waits:
+            async with self._slot(task):
+                self.fm.update_task(task_id, status=TaskStatus.running, started=True, queue_wait_ms=_waited_ms(waits))
 
-            self.fm.update_task(task_id, status=TaskStatus.running, started=True)
+                problem = self.fm.get_problem_by_key(task.problem_key)
+                if problem is None:
+                    err = f"problem not found for key={task.problem_key}"
+                    self.fm.update_task(task_id, status=TaskStatus.failed, error_message=err, finished=True)
+                    return
 
-            problem = self.fm.get_problem_by_key(task.problem_key)
-            if problem is None:
-                err = f"problem not found for key={task.problem_key}"
-                self.fm.update_task(task_id, status=TaskStatus.failed, error_message=err, finished=True)
-                return
+                timeout = asyncio.timeout(deadline)
+                try:
+                    solution_markdown = self.fm.read_solution_file(problem.source, problem.id) or ""
+                    settings = self.fm.get_settings()
+                    async with timeout:
+                        tags, difficulty = await self.tag_generator.generate(
+                            problem,
+                            self._ai_settings_for(settings.ai, task),
+                            solution_markdown=solution_markdown,
+                        )
 
-            try:
-                solution_markdown = self.fm.read_solution_file(problem.source, problem.id) or ""
-                settings = self.fm.get_settings()
-                tags, difficulty = await self.tag_generator.generate(
-                    problem,
-                    settings.ai,
-                    solution_markdown=solution_markdown,
-                )
+                    updated = self.fm.update_problem_info(
+                        problem.source,
+                        problem.id,
+                        tags=tags,
+                        difficulty=difficulty,
+                        difficulty_set=True,
+                    )
+                    if updated is None:
+                        raise RuntimeError(f"failed to update problem info for key={task.problem_key}")
 
-                updated = self.fm.update_problem_info(
-                    problem.source,
-                    problem.id,
-                    tags=tags,
-                    difficulty=difficulty,
-                    difficulty_set=True,
-                )
-                if updated is None:
-                    raise RuntimeError(f"failed to update problem info for key={task.problem_key}")
-
-                summary_parts = [" / ".join(tags)] if tags else []
-                if difficulty is not None:
-                    summary_parts.append(str(difficulty))
-                summary = " | ".join(summary_parts) if summary_parts else "done"
-
-                self.fm.update_task(
-                    task_id,
-                    status=TaskStatus.succeeded,
-                    output_path=summary,
-                    error_message="",
-                    finished=True,
-                )
-            except Exception as exc:
-                self.fm.update_task(
-                    task_id,
-                    status=TaskStatus.failed,
-                    error_message=str(exc),
-                    finished=True,
-                )
+                    summary_parts = [" / ".join(tags)] if tags else []
+                    if difficulty is not None:
+                        summary_parts.append(str(difficulty))
+                    summary = " | ".join(summary_parts) if summary_parts else "done"
+
+                    self.fm.update_task(
+                        task_id,
+                        status=TaskStatus.succeeded,
+                        output_path=summary,
+                        error_message="",
+                        queue_wait_ms=_waited_ms(waits),
+                        finished=True,
+                    )
+                except Exception as exc:
+                    self.fm.update_task(
+                        task_id,
+                        status=TaskStatus.failed,
+                        error_message=f"deadline of {deadline}s exceeded" if timeout.expired() else str(exc),
+                        queue_wait_ms=_waited_ms(waits),
+                        finished=True,
+                    )
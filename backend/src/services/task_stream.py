@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+
+class TaskStream:
+    """Fans the streamed output of one task out to any number of listeners.
+
+    Keeps the text streamed so far so a listener that joins late first gets it
+    as a single ``delta``. Listeners see ``delta`` events as published and
+    finally ``("end", status)``. Used from the event loop only.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._listeners: set[asyncio.Queue[tuple[str, str]]] = set()
+        self.status: str | None = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def publish(self, event: str, data: str) -> None:
+        if self.status is not None:
+            return
+        if event == "delta":
+            self._parts.append(data)
+        for queue in self._listeners:
+            queue.put_nowait((event, data))
+
+    def close(self, status: str) -> None:
+        if self.status is not None:
+            return
+        self.status = status
+        for queue in self._listeners:
+            queue.put_nowait(("end", status))
+
+    async def subscribe(self) -> AsyncIterator[tuple[str, str]]:
+        # Snapshot and register in one step, so no event falls between the replay and the live feed.
+        prefix = self.text
+        if self.status is not None:
+            if prefix:
+                yield "delta", prefix
+            yield "end", self.status
+            return
+        queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._listeners.add(queue)
+        try:
+            if prefix:
+                yield "delta", prefix
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event == "end":
+                    return
+        finally:
+            self._listeners.discard(queue)
+
+
+class TaskStreamHub:
+    """The ``TaskStream`` of every task that is queued or running."""
+
+    def __init__(self) -> None:
+        self._streams: dict[str, TaskStream] = {}
+
+    def open(self, task_id: str) -> TaskStream:
+        stream = self._streams.get(task_id)
+        if stream is None:
+            stream = self._streams[task_id] = TaskStream()
+        return stream
+
+    def get(self, task_id: str) -> TaskStream | None:
+        return self._streams.get(task_id)
+
+    def close(self, task_id: str, status: str) -> None:
+        stream = self._streams.pop(task_id, None)
+        if stream is not None:
+            stream.close(status)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from datetime import UTC
+
+from ..models.problem import ProblemRecord
+
+FACETS = ("month", "source", "status", "tag", "difficulty")
+UNRATED_BUCKET = "unrated"
+DIFFICULTY_BUCKET_WIDTH = 400
+
+# Set bit offsets of every byte value, for turning a bitmap back into document numbers.
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def difficulty_bucket(difficulty: int | None) -> str:
+    if difficulty is None:
+        return UNRATED_BUCKET
+    low = difficulty // DIFFICULTY_BUCKET_WIDTH * DIFFICULTY_BUCKET_WIDTH
+    return f"{low}-{low + DIFFICULTY_BUCKET_WIDTH - 1}"
+
+
+def _facet_values(record: ProblemRecord) -> tuple[tuple[str, ...], ...]:
+    """Values of ``record`` for each facet, in ``FACETS`` order."""
+    created = record.created_at.astimezone(UTC)
+    tags = dict.fromkeys(tag.strip() for tag in record.tags)
+    tags.pop("", None)
+    return (
+        (f"{created.year:04d}-{created.month:02d}",),
+        (record.source.lower(),),
+        (record.status.value,),
+        tuple(tags),
+        (difficulty_bucket(record.difficulty),),
+    )
+
+
+def _bitmap(docs: Iterable[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for doc in docs:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class FacetSelection:
+    """Read-only view of the keys in a bitmap: counted and tested without listing them.
+
+    Only valid until the index it came from is next written.
+    """
+
+    __slots__ = ("_bytes", "_count", "_doc_of", "_keys")
+
+    def __init__(self, mask: int, doc_of: dict[str, int], keys: list[str | None]):
+        self._bytes = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        self._count = mask.bit_count()
+        self._doc_of = doc_of
+        self._keys = keys
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        doc = self._doc_of.get(key)
+        if doc is None or doc >> 3 >= len(self._bytes):
+            return False
+        return bool(self._bytes[doc >> 3] >> (doc & 7) & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._keys
+        for offset, byte in enumerate(self._bytes):
+            if byte:
+                base = offset * 8
+                for bit in _BYTE_BITS[byte]:
+                    yield keys[base + bit]
+
+
+class ProblemFacetIndex:
+    """Secondary indexes from each facet value to the records carrying it.
+
+    Every record gets a small document number and each facet value a bitmap (a
+    Python int) of the documents carrying it, so filtering is ``&`` and a facet
+    count is ``int.bit_count``; neither touches record bodies. Numbers of deleted
+    records are reused. Kept in step with every write by ``ProblemCache``. Not
+    thread-safe: used under ``FileManager._lock``.
+    """
+
+    def __init__(self) -> None:
+        self._bits: dict[str, dict[str, int]] = {facet: {} for facet in FACETS}
+        self._values_of: dict[str, tuple[tuple[str, ...], ...]] = {}
+        self._doc_of: dict[str, int] = {}
+        self._keys: list[str | None] = []
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._values_of)
+
+    def add_many(self, records: Iterable[ProblemRecord]) -> None:
+        if self._values_of:
+            for record in records:
+                self.update(record)
+            return
+        # Initial load: build each bitmap once instead of growing it bit by bit.
+        docs: dict[str, dict[str, list[int]]] = {facet: {} for facet in FACETS}
+        for record in records:
+            key = record.key()
+            if key in self._doc_of:
+                continue
+            values = _facet_values(record)
+            doc = self._doc_of[key] = len(self._keys)
+            self._keys.append(key)
+            self._values_of[key] = values
+            for facet_docs, facet_values in zip(docs.values(), values):
+                for value in facet_values:
+                    facet_docs.setdefault(value, []).append(doc)
+        size = len(self._keys)
+        for facet, facet_docs in docs.items():
+            self._bits[facet] = {value: _bitmap(value_docs, size) for value, value_docs in facet_docs.items()}
+
+    def update(self, record: ProblemRecord) -> None:
+        key = record.key()
+        values = _facet_values(record)
+        if self._values_of.get(key) == values:
+            return
+        self.remove(key)
+        if self._free:
+            doc = self._free.pop()
+            self._keys[doc] = key
+        else:
+            doc = len(self._keys)
+            self._keys.append(key)
+        self._doc_of[key] = doc
+        self._values_of[key] = values
+        bit = 1 << doc
+        for index, facet_values in zip(self._bits.values(), values):
+            for value in facet_values:
+                index[value] = index.get(value, 0) | bit
+
+    def remove(self, key: str) -> None:
+        values = self._values_of.pop(key, None)
+        if values is None:
+            return
+        doc = self._doc_of.pop(key)
+        self._keys[doc] = None
+        self._free.append(doc)
+        bit = 1 << doc
+        for index, facet_values in zip(self._bits.values(), values):
+            for value in facet_values:
+                remaining = index[value] & ~bit
+                if remaining:
+                    index[value] = remaining
+                else:
+                    del index[value]
+
+    def match(self, filters: dict[str, str]) -> int:
+        """Bitmap of the documents carrying every ``facet -> value`` in ``filters``."""
+        bitmaps = [self._bits[facet].get(value, 0) for facet, value in filters.items()]
+        mask = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            mask &= bitmap
+        return mask
+
+    def mask(self, keys: Iterable[str]) -> int:
+        doc_of = self._doc_of
+        return _bitmap((doc_of[key] for key in keys if key in doc_of), len(self._keys))
+
+    def select(self, mask: int) -> FacetSelection:
+        return FacetSelection(mask, self._doc_of, self._keys)
+
+    def counts(self, mask: int | None = None) -> dict[str, dict[str, int]]:
+        """Per-facet value counts over ``mask`` (every record when ``None``), zero counts omitted."""
+        result: dict[str, dict[str, int]] = {}
+        for facet, index in self._bits.items():
+            if mask is None:
+                result[facet] = {value: bitmap.bit_count() for value, bitmap in index.items()}
+            else:
+                counts = {value: (bitmap & mask).bit_count() for value, bitmap in index.items()}
+                result[facet] = {value: count for value, count in counts.items() if count}
+        return result
@@ -1,25 +1,35 @@
 from __future__ import annotations
 
 import base64
+import gzip
 import json
 import os
 import re
 import shutil
+import sqlite3
 import threading
+import time
 import uuid
+from collections.abc import Callable, Collection, Iterator
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, UTC
 from pathlib import Path
+from typing import BinaryIO
 
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from ..models.problem import (
     ProblemDeleteResponse,
+    ProblemImportTimings,
     ProblemInput,
     ProblemRecord,
+    ProblemSort,
     ProblemStatus,
     ProblemTranslationPayload,
     SolutionImageMeta,
     SolutionStatus,
+    SortOrder,
     TranslationStatus,
 )
 from ..models.settings import (
@@ -29,10 +39,34 @@ from ..models.settings import (
     MarkdownNamingMode,
     PromptSettings,
     SettingsBundle,
+    StorageEngine,
     UiSettings,
 )
 from ..models.solution import ReportStatusResponse
-from ..models.task import SolutionTaskRecord, TaskStatus, TaskType
+from ..models.task import SolutionTaskRecord, TaskPriority, TaskStatus, TaskType
+from .markdown_index import MarkdownIndex
+from .markdown_writer import MarkdownRenderQueue
+from .problem_cache import (
+    DEFAULT_SORT_ORDER,
+    ProblemCache,
+    SortedView,
+    decode_sort_cursor,
+    encode_sort_cursor,
+    sort_position,
+)
+from .record_store import (
+    PROBLEM_COLUMNS,
+    REPORT_COLUMNS,
+    TASK_COLUMNS,
+    GroupCommitWriter,
+    JsonRecordStore,
+    read_json_dict,
+    write_json_dict,
+)
+from .search_index import ProblemSearchIndex, build_snippet, searchable_text
+from .sharded_store import PROBLEM_SHARDS_DIR, ShardedJsonRecordStore
+from .sqlite_store import SQLITE_DB_NAME, SqliteDatabase, migrate_json_to_sqlite, open_sqlite_stores
+from .task_index import ACTIVE_TASK_STATUSES, TASK_ARCHIVE_DIR, TaskIndex
 
 
 def now_utc() -> datetime:
@@ -51,10 +85,29 @@ def problem_key(source: str, problem_id: str) -> str:
     return f"{source}:{problem_id}"
 
 
+def _elapsed_ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 2)
+
+
+_PROBLEM_RECORDS_ADAPTER = TypeAdapter(list[ProblemRecord])
+
+# Output streamed so far by running solution tasks, one file per task.
+TASK_PARTIALS_DIR = "task_partials"
+
+
 class FileManager:
     _ALLOWED_IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
     _MAX_IMAGE_SIZE_BYTES = 5 * 1024 * 1024  # 5MB
     _MAX_IMAGES_PER_PROBLEM = 10
+    # Batches at least this large write their notes on a thread pool.
+    _MARKDOWN_PARALLEL_MIN_FILES = 16
+    _MARKDOWN_WRITE_WORKERS = 8
+    # Finished tasks between retention passes.
+    _TASK_COMPACT_EVERY_FINISHED = 50
+    # Filters matching under 1/this of the listed records sort their matches instead of the full order.
+    _FILTERED_VIEW_RATIO = 8
+    # Archives at least this large build their search index in the background on open.
+    _SEARCH_WARMUP_MIN_PROBLEMS = 2000
     _INVALID_FILENAME_CHARS = '<>:"/\\|?*'
     _SOLUTION_META_RE = re.compile(
         r'<!--\s*ACM_HELPER_SOLUTION\s+source="(?P<source>[^"]+)"\s+id="(?P<id>[^"]+)"\s*-->',
@@ -63,30 +116,242 @@ class FileManager:
 
     def __init__(self, base_dir: Path):
         self._lock = threading.RLock()
+        self._sqlite_db: SqliteDatabase | None = None
+        self._settings_snapshot: tuple[tuple[int, int] | None, SettingsBundle] | None = None
+        self._settings_version = 0
+        self._group_writer = GroupCommitWriter()
+        self._search_warmup: threading.Thread | None = None
+        self._tasks_finished_since_compaction = 0
+        self._markdown_renderer = MarkdownRenderQueue(self._render_problem_markdown_by_key)
         self._set_base_paths(base_dir)
         self._ensure_storage_files()
+        self._open_record_stores()
 
     def _set_base_paths(self, base_dir: Path) -> None:
         self.base = Path(base_dir).expanduser().resolve()
         self.base.mkdir(parents=True, exist_ok=True)
+        # Legacy monolithic problem store; split into ``problem_shards`` on first open.
         self.problems_file = self.base / "problems.json"
+        self.problem_shards_dir = self.base / PROBLEM_SHARDS_DIR
         self.tasks_file = self.base / "tasks.json"
+        self.task_archive_dir = self.base / TASK_ARCHIVE_DIR
+        self.task_partials_dir = self.base / TASK_PARTIALS_DIR
         self.reports_file = self.base / "reports.json"
         self.settings_file = self.base / "settings.json"
+        self._settings_snapshot = None
+        self.sqlite_file = self.base / SQLITE_DB_NAME
+        self._markdown_index = MarkdownIndex(
+            self.base,
+            {
+                "problems": self._extract_problem_identity_from_text,
+                "solutions": self._extract_solution_identity_from_text,
+            },
+        )
 
     def _ensure_storage_files(self) -> None:
-        self._ensure_json_file(self.problems_file, {})
         self._ensure_json_file(self.tasks_file, {})
         self._ensure_json_file(self.reports_file, {})
         self._ensure_json_file(self.settings_file, self._build_default_settings().model_dump(mode="json"))
 
+    def _configured_storage_engine(self) -> StorageEngine:
+        ui_raw = self._read_json(self.settings_file).get("ui")
+        if not isinstance(ui_raw, dict):
+            return StorageEngine.json
+        try:
+            return StorageEngine(str(ui_raw.get("storage_engine") or StorageEngine.json.value))
+        except ValueError:
+            return StorageEngine.json
+
+    def _build_json_record_stores(self) -> tuple[ShardedJsonRecordStore, JsonRecordStore, JsonRecordStore]:
+        problems = ShardedJsonRecordStore(
+            self.problem_shards_dir,
+            PROBLEM_COLUMNS,
+            self._group_writer,
+            legacy_path=self.problems_file,
+        )
+        problems.ensure()
+        return (
+            problems,
+            JsonRecordStore(self.tasks_file, TASK_COLUMNS, self._group_writer),
+            JsonRecordStore(self.reports_file, REPORT_COLUMNS, self._group_writer),
+        )
+
+    def _open_record_stores(self, engine: StorageEngine | None = None) -> None:
+        engine = engine or self._configured_storage_engine()
+        if engine == StorageEngine.sqlite:
+            needs_migration = not self.sqlite_file.exists()
+            self._sqlite_db = SqliteDatabase(self.sqlite_file)
+            if needs_migration:
+                migrate_json_to_sqlite(self.base, self._sqlite_db)
+            stores = open_sqlite_stores(self._sqlite_db)
+        else:
+            stores = self._build_json_record_stores()
+        self._problem_store, self._task_store, self._report_store = stores
+        self._problem_cache = ProblemCache(self._problem_store)
+        self._task_index = TaskIndex(self._task_store)
+        self._storage_engine = engine
+        self.compact_tasks()
+        if len(self._problem_store.key_months()) >= self._SEARCH_WARMUP_MIN_PROBLEMS:
+            self._search_warmup = threading.Thread(
+                target=self._warm_search_index,
+                args=(self._problem_cache,),
+                name="search-index-warmup",
+                daemon=True,
+            )
+            self._search_warmup.start()
+
+    def _warm_search_index(self, cache: ProblemCache) -> None:
+        with self._lock:
+            if cache is not self._problem_cache:
+                return
+            records = cache.begin_search_warmup()
+        index = ProblemSearchIndex()
+        index.add_many(records)
+        with self._lock:
+            cache.finish_search_warmup(index)
+
+    def _await_search_warmup(self) -> None:
+        """Wait for a background index build; must be called without holding ``_lock``."""
+        warmup = self._search_warmup
+        if warmup is not None and warmup is not threading.current_thread():
+            warmup.join()
+
+    def _close_record_stores(self) -> None:
+        for store in (self._problem_store, self._task_store, self._report_store):
+            store.close()
+        if self._sqlite_db is not None:
+            self._sqlite_db.close()
+            self._sqlite_db = None
+
+    def _switch_storage_engine_locked(self, engine: StorageEngine) -> None:
+        if engine == self._storage_engine:
+            return
+        if engine == StorageEngine.sqlite:
+            target_db = SqliteDatabase(self.sqlite_file)
+            targets = open_sqlite_stores(target_db)
+        else:
+            target_db = None
+            targets = self._build_json_record_stores()
+        try:
+            for source, target in zip((self._problem_store, self._task_store, self._report_store), targets):
+                target.replace_all(source.load())
+        except (OSError, sqlite3.Error) as exc:
+            if target_db is not None:
+                target_db.close()
+            raise RuntimeError(f"failed to switch storage engine: {exc}") from exc
+        self._close_record_stores()
+        self._sqlite_db = target_db
+        self._problem_store, self._task_store, self._report_store = targets
+        self._problem_cache = ProblemCache(self._problem_store)
+        self._task_index = TaskIndex(self._task_store)
+        self._storage_engine = engine
+
+    def get_storage_engine(self) -> StorageEngine:
+        return self._storage_engine
+
+    def get_cache_stats(self) -> dict:
+        with self._lock:
+            return {
+                "storage_engine": self._storage_engine.value,
+                "problems": self._problem_cache.stats(),
+                "tasks": self._task_index.stats(),
+                "markdown_index": self._markdown_index.stats(),
+                "markdown_renders": self._markdown_renderer.stats(),
+                "settings_version": self._settings_version,
+            }
+
     def get_storage_base_dir(self) -> str:
         return str(self.base.resolve())
 
     def set_base_dir(self, base_dir: Path) -> None:
         with self._lock:
+            self._markdown_renderer.flush()
+            self._markdown_index.flush()
+            self._close_record_stores()
             self._set_base_paths(base_dir)
             self._ensure_storage_files()
+            self._open_record_stores()
+
+    def flush(self) -> None:
+        """Write out pending markdown renders and everything buffered by the group-commit writer."""
+        with self._lock:
+            self._markdown_renderer.flush()
+            self._markdown_index.flush()
+            self._group_writer.flush_all()
+
+    _EXPORT_TREES = ("problems", "solutions", "solution_images")
+
+    def write_export_snapshot(
+        self, sink: BinaryIO, notes_sink: BinaryIO | None = None
+    ) -> tuple[dict, list[tuple[Path, int]], list[Path]]:
+        """Write all records to ``sink`` as NDJSON and snapshot the note/image files, in one locked pass.
+
+        The first line is a ``meta`` entry with per-kind counts; each following line is
+        ``{"kind": "problem" | "task" | "report", "record": {...}}``. With ``notes_sink``
+        the markdown notes are copied into it back to back while the lock is held, so
+        records and notes come from the same point in time; the returned
+        ``(path, size)`` list gives their order. Images are only listed: they are
+        written once under unique names, but one deleted after the snapshot is missing
+        from the export.
+        """
+        with self._lock:
+            self._markdown_renderer.flush()
+            problems = self._problem_cache.ordered()
+            tasks = self._task_store.load()
+            reports = self._report_store.load()
+            meta = {
+                "kind": "meta",
+                "format_version": 1,
+                "exported_at": now_utc().isoformat(),
+                "storage_engine": self._storage_engine.value,
+                "counts": {"problems": len(problems), "tasks": len(tasks), "reports": len(reports)},
+            }
+
+            def emit(entry: dict) -> None:
+                sink.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+
+            emit(meta)
+            for record in problems:
+                emit({"kind": "problem", "record": record.model_dump(mode="json")})
+            for raw in tasks.values():
+                emit({"kind": "task", "record": raw})
+            for key, raw in reports.items():
+                emit({"kind": "report", "key": key, "record": raw})
+
+            files: list[Path] = []
+            try:
+                months = sorted(child for child in self.base.iterdir() if child.is_dir())
+            except OSError:
+                months = []
+            for month_dir in months:
+                for tree in self._EXPORT_TREES:
+                    directory = month_dir / tree
+                    if directory.is_dir():
+                        files.extend(sorted(path for path in directory.rglob("*") if path.is_file()))
+
+            notes: list[tuple[Path, int]] = []
+            images: list[Path] = []
+            for path in files:
+                if path.suffix.lower() != ".md":
+                    images.append(path)
+                    continue
+                if notes_sink is None:
+                    continue
+                try:
+                    content = path.read_bytes()
+                except OSError:
+                    continue
+                notes_sink.write(content)
+                notes.append((path, len(content)))
+            return meta, notes, images
+
+    def close(self) -> None:
+        # Outside the lock: the render worker may be waiting for it.
+        self._markdown_renderer.close()
+        with self._lock:
+            self._markdown_index.flush()
+            self._close_record_stores()
+            self._group_writer.close()
 
     def _build_renamed_migration_path(self, target_dir: Path, source_name: str) -> Path:
         source_path = Path(source_name)
@@ -130,18 +395,27 @@ class FileManager:
 
             target_base.mkdir(parents=True, exist_ok=True)
 
+            # SQLite keeps the database open; release it so the file can be moved.
+            self._markdown_renderer.flush()
+            self._markdown_index.flush()
+            self._close_record_stores()
             moved_entries = 0
             renamed_entries = 0
-            for entry in sorted(old_base.iterdir(), key=lambda p: p.name):
-                destination = target_base / entry.name
-                if destination.exists():
-                    destination = self._build_renamed_migration_path(target_base, entry.name)
-                    renamed_entries += 1
-                shutil.move(str(entry), str(destination))
-                moved_entries += 1
+            try:
+                for entry in sorted(old_base.iterdir(), key=lambda p: p.name):
+                    destination = target_base / entry.name
+                    if destination.exists():
+                        destination = self._build_renamed_migration_path(target_base, entry.name)
+                        renamed_entries += 1
+                    shutil.move(str(entry), str(destination))
+                    moved_entries += 1
+            except OSError:
+                self._open_record_stores()
+                raise
 
             self._set_base_paths(target_base)
             self._ensure_storage_files()
+            self._open_record_stores()
 
             try:
                 old_base.rmdir()
@@ -161,23 +435,14 @@ class FileManager:
 
     def _iter_problem_markdown_paths(self, source: str, problem_id: str) -> list[Path]:
         legacy_name = f"{source}_{problem_id}.md"
-        matched: list[Path] = []
-        for path in sorted(self.base.glob("*/problems/*.md")):
-            if path.name == legacy_name or self._markdown_matches_problem(path, source, problem_id):
-                matched.append(path)
-        return matched
+        return self._markdown_index.paths("problems", source, problem_id, names=[legacy_name])
 
     def _iter_solution_markdown_paths(self, source: str, problem_id: str) -> list[Path]:
         base_name = f"{source}_{problem_id}"
-        matched: list[Path] = []
-        for path in sorted(self.base.glob("*/solutions/*.md")):
-            if (
-                path.name == f"{base_name}.md"
-                or path.name.startswith(f"{base_name}__dup_")
-                or self._markdown_matches_solution(path, source, problem_id)
-            ):
-                matched.append(path)
-        return matched
+        return self._markdown_index.paths("solutions", source, problem_id, stems=[base_name])
+
+    def rebuild_markdown_index(self) -> dict:
+        return self._markdown_index.rebuild()
 
     def _next_available_solution_md_path(self, record: ProblemRecord, month: str) -> Path:
         solution_dir = self.base / month / "solutions"
@@ -272,34 +537,24 @@ class FileManager:
             return meta_match.group("source"), meta_match.group("id")
         return self._extract_problem_identity_from_text(text)
 
-    def _markdown_matches_problem(self, path: Path, source: str, problem_id: str) -> bool:
-        text = self._read_text_if_exists(path)
-        identity = self._extract_problem_identity_from_text(text)
-        return identity == (source, problem_id)
+    def _path_belongs_to_problem(self, path: Path, source: str, problem_id: str) -> bool:
+        return self._markdown_index.identity_of(path) == (source, problem_id)
 
-    def _markdown_matches_solution(self, path: Path, source: str, problem_id: str) -> bool:
-        text = self._read_text_if_exists(path)
-        identity = self._extract_solution_identity_from_text(text)
-        return identity == (source, problem_id)
-
-    def _path_belongs_to_problem(
+    def _preferred_problem_md_path(
         self,
-        path: Path,
-        source: str,
-        problem_id: str,
-        *,
-        solution: bool = False,
-    ) -> bool:
-        if solution:
-            return self._markdown_matches_solution(path, source, problem_id)
-        return self._markdown_matches_problem(path, source, problem_id)
-
-    def _preferred_problem_md_path(self, record: ProblemRecord, existing_paths: list[Path] | None = None) -> Path:
+        record: ProblemRecord,
+        existing_paths: list[Path] | None = None,
+        claimed: dict[Path, str] | None = None,
+    ) -> Path:
         month = month_from_dt(record.created_at)
         problem_dir = self._problem_dir(month)
         if self._markdown_naming_mode() == MarkdownNamingMode.source_id:
             return problem_dir / self._legacy_problem_md_name(record.source, record.id)
         preferred = problem_dir / f"{self._problem_title_stem(record)}.md"
+        owner = (claimed or {}).get(preferred)
+        if owner is not None:
+            # Claimed earlier in the same batch, possibly not written yet.
+            return preferred if owner == record.key() else problem_dir / f"{self._problem_conflict_stem(record)}.md"
         if preferred.exists():
             if preferred in (existing_paths or []) or self._path_belongs_to_problem(preferred, record.source, record.id):
                 return preferred
@@ -317,12 +572,7 @@ class FileManager:
             return solution_dir / self._legacy_solution_md_name(record.source, record.id)
         preferred = solution_dir / f"{self._problem_title_stem(record)}.md"
         if preferred.exists():
-            if preferred in (existing_paths or []) or self._path_belongs_to_problem(
-                preferred,
-                record.source,
-                record.id,
-                solution=True,
-            ):
+            if preferred in (existing_paths or []) or self._path_belongs_to_problem(preferred, record.source, record.id):
                 return preferred
             return solution_dir / f"{self._solution_conflict_stem(record)}.md"
         return preferred
@@ -409,8 +659,10 @@ class FileManager:
                     path.unlink(missing_ok=True)
                 except OSError:
                     continue
+                self._markdown_index.discard(path)
             for destination, content in zip(destinations, contents):
                 destination.write_text(content, encoding="utf-8")
+                self._markdown_index.record(destination, (record.source, record.id))
 
     def _yaml_escape(self, value: str) -> str:
         text = str(value or "")
@@ -604,38 +856,87 @@ class FileManager:
         return default_language
 
     def _save_problem_markdown(self, record: ProblemRecord) -> str:
-        existing_paths = self._iter_problem_markdown_paths(record.source, record.id)
-        md_path = self._preferred_problem_md_path(record, existing_paths=existing_paths)
-        md_path.write_text(self._build_problem_markdown(record), encoding="utf-8")
-        for path in existing_paths:
-            if path == md_path:
-                continue
-            try:
-                path.unlink(missing_ok=True)
-            except OSError:
-                continue
-        return str(md_path)
+        return str(self._save_problem_markdown_batch([record])[0])
+
+    def _save_problem_markdown_batch(self, records: list[ProblemRecord]) -> list[Path]:
+        """Write notes for ``records``; paths are resolved serially, file writes go to a worker pool."""
+        planned: list[tuple[ProblemRecord, Path, str, bool]] = []
+        stale: list[Path] = []
+        claimed: dict[Path, str] = {}
+        # Create month directories first so the index tracks them and records new files in place.
+        for month in {month_from_dt(record.created_at) for record in records}:
+            self._problem_dir(month)
+        with self._markdown_index.batch():
+            for record in records:
+                self._markdown_renderer.cancel(record.key())
+                existing_paths = self._iter_problem_markdown_paths(record.source, record.id)
+                md_path = self._preferred_problem_md_path(record, existing_paths=existing_paths, claimed=claimed)
+                claimed[md_path] = record.key()
+                content = self._build_problem_markdown(record)
+                planned.append((record, md_path, content, md_path in existing_paths))
+                stale.extend(path for path in existing_paths if path != md_path)
+
+            def write(item: tuple[ProblemRecord, Path, str, bool]) -> bool:
+                _, md_path, content, known = item
+                if known and self._read_text_if_exists(md_path) == content:
+                    return False
+                md_path.write_text(content, encoding="utf-8")
+                return True
+
+            if len(planned) >= self._MARKDOWN_PARALLEL_MIN_FILES:
+                with ThreadPoolExecutor(max_workers=self._MARKDOWN_WRITE_WORKERS, thread_name_prefix="markdown-write") as pool:
+                    written = list(pool.map(write, planned))
+            else:
+                written = [write(item) for item in planned]
+
+            for (record, md_path, _, _), changed in zip(planned, written):
+                if changed:
+                    self._markdown_index.record(md_path, (record.source, record.id))
+            targets = set(claimed)
+            for path in stale:
+                if path in targets:
+                    continue
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    continue
+                self._markdown_index.discard(path)
+        return [md_path for _, md_path, _, _ in planned]
+
+    def _schedule_problem_markdown(self, record: ProblemRecord) -> None:
+        """Render the note in the background; for frequent status transitions."""
+        self._markdown_renderer.schedule(record.key())
+
+    def _render_problem_markdown_by_key(self, key: str) -> None:
+        with self._lock:
+            record = self._problem_cache.get(key)
+            if record is not None:
+                self._save_problem_markdown(record)
 
     def _ensure_json_file(self, path: Path, default_obj: dict) -> None:
         if not path.exists():
-            path.write_text(json.dumps(default_obj, ensure_ascii=False, indent=2), encoding="utf-8")
+            write_json_dict(path, default_obj)
 
     def _read_json(self, path: Path) -> dict:
-        if not path.exists():
-            return {}
-        text = path.read_text(encoding="utf-8").strip()
-        if not text:
-            return {}
-        try:
-            obj = json.loads(text)
-            if isinstance(obj, dict):
-                return obj
-            return {}
-        except json.JSONDecodeError:
-            return {}
+        return read_json_dict(path)
 
     def _write_json(self, path: Path, obj: dict) -> None:
-        path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+        write_json_dict(path, obj)
+
+    def _load_problem_locked(self, key: str) -> ProblemRecord | None:
+        # Cached records are shared with readers; mutate a private copy.
+        record = self._problem_cache.get(key)
+        if record is None:
+            return None
+        return record.model_copy(deep=True)
+
+    def _store_problem_locked(self, record: ProblemRecord) -> None:
+        self._store_problems_locked([record])
+
+    def _store_problems_locked(self, records: list[ProblemRecord]) -> None:
+        self._problem_cache.sync()
+        self._problem_store.put_many({record.key(): record.model_dump(mode="json") for record in records})
+        self._problem_cache.put_many(records)
 
     def _status_to_needs(self, status: ProblemStatus) -> bool:
         return status in {ProblemStatus.unsolved, ProblemStatus.attempted}
@@ -666,36 +967,38 @@ class FileManager:
         )
 
     def upsert_problems(self, items: list[ProblemInput]) -> tuple[int, int, list[ProblemRecord]]:
+        imported, updated, records, _ = self.bulk_upsert_problems(items)
+        return imported, updated, records
+
+    def bulk_upsert_problems(
+        self, items: list[ProblemInput]
+    ) -> tuple[int, int, list[ProblemRecord], ProblemImportTimings]:
+        started = time.perf_counter()
         with self._lock:
-            data = self._read_json(self.problems_file)
+            locked = time.perf_counter()
+            self._problem_cache.sync()
             settings = self.get_settings()
             default_lang = settings.ui.default_ac_language.value
             imported = 0
             updated = 0
-            result: list[ProblemRecord] = []
+            keys: list[str] = []
+            pending: dict[str, dict] = {}
 
             for item in items:
                 key = problem_key(item.source, item.id)
                 now = now_utc()
-                existing_raw = data.get(key)
-                if existing_raw:
-                    try:
-                        existing = ProblemRecord.model_validate(existing_raw)
-                    except ValidationError:
-                        existing = None
+                if key in pending:
+                    # Same problem twice in one batch: merge onto the earlier entry.
+                    existing = ProblemRecord.model_validate(pending[key])
                 else:
-                    existing = None
+                    existing = self._problem_cache.get(key)
 
                 default_needs_solution = self._status_to_needs(item.status)
+                payload = item.model_dump()
 
                 if existing is None:
-                    payload = item.model_dump()
-                    payload["my_ac_language"] = self._normalize_ac_language(
-                        item.my_ac_language,
-                        default_language=default_lang,
-                    )
-                    record = ProblemRecord(
-                        **payload,
+                    payload.update(
+                        my_ac_language=self._normalize_ac_language(item.my_ac_language, default_language=default_lang),
                         needs_solution=default_needs_solution,
                         solution_status=SolutionStatus.none,
                         solved_at=now if item.status == ProblemStatus.solved else None,
@@ -707,37 +1010,16 @@ class FileManager:
                     )
                     imported += 1
                 else:
-                    current_solution_status = existing.solution_status
-                    has_done_solution = current_solution_status == SolutionStatus.done
-                    payload = item.model_dump()
-                    payload.pop("my_ac_code", None)
-                    payload.pop("my_ac_language", None)
-                    payload.pop("reflection", None)
-                    incoming_url = str(payload.pop("url", "") or "").strip()
-                    keep_code = existing.my_ac_code if not item.my_ac_code.strip() else item.my_ac_code
+                    has_done_solution = existing.solution_status == SolutionStatus.done
+                    incoming_url = str(payload.get("url", "") or "").strip()
                     keep_language = existing.my_ac_language if not item.my_ac_language.strip() else item.my_ac_language
-                    keep_language = self._normalize_ac_language(keep_language, default_language=default_lang)
-                    keep_reflection = existing.reflection if not item.reflection.strip() else item.reflection
-                    keep_url = existing.url if not incoming_url else incoming_url
-                    record = ProblemRecord(
-                        **payload,
-                        my_ac_code=keep_code,
-                        my_ac_language=keep_language,
-                        reflection=keep_reflection,
-                        url=keep_url,
-                        # needs_solution is already in payload from model_dump() if it was in 'item',
-                        # but we want to override it logic-wise if we are recalculating.
-                        # However, ProblemImportRequest inherits ProblemUpdateFields which might not have it,
-                        # but ProblemRecord has it.
-                        # Wait, 'item' is ProblemImportRequest. Let's see if it has 'needs_solution'.
-                        # It doesn't seem to be in ProblemImportRequest based on usage context usually.
-                        # BUT, 'existing' is a ProblemRecord, so 'payload' from 'item.model_dump()'
-                        # might NOT have 'needs_solution' if item is just an import request.
-                        # The error says "multiple values for keyword argument 'needs_solution'".
-                        # This implies 'needs_solution' IS in **payload.
-                        # Let's explicitly exclude it from payload to avoid conflict.
+                    payload.update(
+                        my_ac_code=existing.my_ac_code if not item.my_ac_code.strip() else item.my_ac_code,
+                        my_ac_language=self._normalize_ac_language(keep_language, default_language=default_lang),
+                        reflection=existing.reflection if not item.reflection.strip() else item.reflection,
+                        url=existing.url if not incoming_url else incoming_url,
                         needs_solution=default_needs_solution and not has_done_solution,
-                        solution_status=current_solution_status,
+                        solution_status=existing.solution_status,
                         solution_updated_at=existing.solution_updated_at,
                         solved_at=now if item.status == ProblemStatus.solved else existing.solved_at,
                         translated_title=existing.translated_title,
@@ -753,41 +1035,88 @@ class FileManager:
                     )
                     updated += 1
 
-                data[key] = record.model_dump(mode="json")
-                self._save_problem_markdown(record)
-                result.append(record)
+                pending[key] = payload
+                keys.append(key)
+
+            validated = dict(zip(pending, _PROBLEM_RECORDS_ADAPTER.validate_python(list(pending.values()))))
+            merged = time.perf_counter()
+
+            changed = list(validated.values())
+            self._store_problems_locked(changed)
+            stored = time.perf_counter()
 
-            self._write_json(self.problems_file, data)
-            return imported, updated, result
+            self._save_problem_markdown_batch(changed)
+            rendered = time.perf_counter()
+
+        timings = ProblemImportTimings(
+            lock_wait_ms=_elapsed_ms(started, locked),
+            validate_ms=_elapsed_ms(locked, merged),
+            store_ms=_elapsed_ms(merged, stored),
+            markdown_ms=_elapsed_ms(stored, rendered),
+            total_ms=_elapsed_ms(started, rendered),
+        )
+        return imported, updated, [validated[key] for key in keys], timings
 
     def get_problem(self, source: str, problem_id: str) -> ProblemRecord | None:
         return self.get_problem_by_key(problem_key(source, problem_id))
 
     def get_problem_by_key(self, key: str) -> ProblemRecord | None:
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                return ProblemRecord.model_validate(raw)
-            except ValidationError:
-                return None
+            return self._problem_cache.get(key)
 
     def list_problems(self, month: str | None = None) -> list[ProblemRecord]:
         with self._lock:
-            data = self._read_json(self.problems_file)
-            records: list[ProblemRecord] = []
-            for raw in data.values():
-                try:
-                    record = ProblemRecord.model_validate(raw)
-                    if month and month_from_dt(record.created_at) != month:
-                        continue
-                    records.append(record)
-                except ValidationError:
-                    continue
-            records.sort(key=lambda x: x.updated_at, reverse=True)
-            return records
+            return self._problem_cache.ordered(month)
+
+    def project_problems(self, records: list[ProblemRecord], fields: frozenset[str]) -> list[dict]:
+        with self._lock:
+            return [self._problem_cache.project(record, fields) for record in records]
+
+    def _facet_filter_mask(
+        self,
+        *,
+        month: str | None = None,
+        source: str | None = None,
+        status: ProblemStatus | None = None,
+        tag: str | None = None,
+        difficulty: str | None = None,
+    ) -> int | None:
+        """Facet-index bitmap of the records passing every filter, or ``None`` when nothing is filtered."""
+        filters = {
+            "month": month or "",
+            "source": (source or "").strip().lower(),
+            "status": status.value if status is not None else "",
+            "tag": (tag or "").strip(),
+            "difficulty": (difficulty or "").strip(),
+        }
+        filters = {facet: value for facet, value in filters.items() if value}
+        return self._problem_cache.facet_index().match(filters) if filters else None
+
+    def _keyword_problem_keys(self, keyword: str | None, within: Collection[str] | None = None) -> set[str] | None:
+        """Keys whose text contains ``keyword`` (case-insensitive substring), or ``None`` for no keyword; hold ``_lock``.
+
+        The search index only narrows the candidates; each one is still checked with
+        a substring test, so partial words and single CJK characters match.
+        """
+        needle = (keyword or "").strip().casefold()
+        if not needle:
+            return None
+        candidates = self._problem_cache.search_index().substring_candidates(needle)
+        if candidates is None and within is None:
+            return {record.key() for record in self._problem_cache.ordered() if needle in searchable_text(record)}
+        if candidates is None:
+            candidates = within
+        elif within is not None:
+            candidates = {key for key in candidates if key in within}
+        peek = self._problem_cache.peek
+        return {key for key in candidates if (record := peek(key)) is not None and needle in searchable_text(record)}
+
+    def _filter_problem_keys(self, *, keyword: str | None = None, **filters) -> Collection[str] | None:
+        """Keys of the records passing every filter, or ``None`` when nothing is filtered; hold ``_lock``."""
+        mask = self._facet_filter_mask(**filters)
+        keys = self._problem_cache.facet_index().select(mask) if mask is not None else None
+        keyword_keys = self._keyword_problem_keys(keyword, keys)
+        return keys if keyword_keys is None else keyword_keys
 
     def list_problems_filtered(
         self,
@@ -795,38 +1124,121 @@ class FileManager:
         month: str | None = None,
         source: str | None = None,
         status: ProblemStatus | None = None,
+        tag: str | None = None,
+        difficulty: str | None = None,
         keyword: str | None = None,
     ) -> list[ProblemRecord]:
-        records = self.list_problems(month)
-        source_norm = (source or "").strip().lower()
-        keyword_norm = (keyword or "").strip().lower()
+        records, _, _ = self.list_problems_page(
+            month=month, source=source, status=status, tag=tag, difficulty=difficulty, keyword=keyword
+        )
+        return records
 
-        filtered: list[ProblemRecord] = []
-        for record in records:
-            if source_norm and record.source.lower() != source_norm:
-                continue
-            if status is not None and record.status != status:
-                continue
-            if keyword_norm:
-                haystack = "\n".join(
-                    [
-                        record.source,
-                        record.id,
-                        record.title,
-                        record.content,
-                        record.input_format,
-                        record.output_format,
-                        record.constraints,
-                        record.reflection,
-                        " ".join(record.tags),
-                        record.difficulty or "",
-                    ]
-                ).lower()
-                if keyword_norm not in haystack:
+    def list_problems_page(
+        self,
+        *,
+        month: str | None = None,
+        source: str | None = None,
+        status: ProblemStatus | None = None,
+        tag: str | None = None,
+        difficulty: str | None = None,
+        keyword: str | None = None,
+        sort: ProblemSort = ProblemSort.updated_at,
+        order: SortOrder | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[ProblemRecord], int, str | None]:
+        """Return ``(page, total matches, next cursor)``; raises ``ValueError`` for a bad cursor."""
+        order = order or DEFAULT_SORT_ORDER[sort]
+        descending = order == SortOrder.desc
+        after = decode_sort_cursor(cursor, sort, order) if cursor else None
+        if keyword:
+            self._await_search_warmup()
+
+        with self._lock:
+            keys = self._filter_problem_keys(
+                month=month, source=source, status=status, tag=tag, difficulty=difficulty, keyword=keyword
+            )
+            view = self._problem_cache.view(sort, month)
+            if keys is not None and len(keys) * self._FILTERED_VIEW_RATIO < len(view):
+                # Selective filter: sort just the matches instead of walking the whole order.
+                view = SortedView.build(map(self._problem_cache.peek, keys), sort)
+                keys = None
+            total = len(view) if keys is None else len(keys)
+            page: list[ProblemRecord] = []
+            for record in view.iterate(descending, after):
+                if keys is not None and record.key() not in keys:
                     continue
-            filtered.append(record)
+                page.append(record)
+                if limit is not None and len(page) > limit:
+                    break
 
-        return filtered
+        next_cursor = None
+        if limit is not None and len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_sort_cursor(sort, order, sort_position(page[-1], sort))
+        return page, total, next_cursor
+
+    def problem_facets(
+        self,
+        *,
+        month: str | None = None,
+        source: str | None = None,
+        status: ProblemStatus | None = None,
+        tag: str | None = None,
+        difficulty: str | None = None,
+        keyword: str | None = None,
+    ) -> tuple[int, dict[str, dict[str, int]]]:
+        """Return ``(total matches, facet -> value -> count)`` over the records passing the filters."""
+        if keyword:
+            self._await_search_warmup()
+        with self._lock:
+            index = self._problem_cache.facet_index()
+            mask = self._facet_filter_mask(month=month, source=source, status=status, tag=tag, difficulty=difficulty)
+            keyword_keys = self._keyword_problem_keys(keyword, index.select(mask) if mask is not None else None)
+            if keyword_keys is not None:
+                mask = index.mask(keyword_keys)
+            return (len(index) if mask is None else mask.bit_count()), index.counts(mask)
+
+    def search_problems(
+        self,
+        query: str,
+        *,
+        month: str | None = None,
+        source: str | None = None,
+        status: ProblemStatus | None = None,
+        limit: int = 20,
+    ) -> tuple[int, list[tuple[ProblemRecord, float, str, str]]]:
+        """BM25-ranked matches as ``(total, [(record, score, snippet field, snippet html)])``."""
+        self._await_search_warmup()
+        with self._lock:
+            index = self._problem_cache.search_index()
+            keys = self._filter_problem_keys(month=month, source=source, status=status)
+            total, ranked = index.search(query, limit, keys.__contains__ if keys is not None else None)
+            hits = []
+            for key, score in ranked:
+                record = self._problem_cache.peek(key)
+                if record is not None:
+                    hits.append((record, score, *build_snippet(record, query)))
+            return total, hits
+
+    def suggest_problems(
+        self,
+        prefix: str,
+        *,
+        source: str | None = None,
+        status: ProblemStatus | None = None,
+        limit: int = 10,
+    ) -> list[tuple[ProblemRecord, str]]:
+        """Search-as-you-type completions of ids and titles as ``[(record, matched field)]``."""
+        with self._lock:
+            index = self._problem_cache.suggest_index()
+            keys = self._filter_problem_keys(source=source, status=status)
+            suggestions = []
+            for key, field in index.suggest(prefix, limit, keys.__contains__ if keys is not None else None):
+                record = self._problem_cache.peek(key)
+                if record is not None:
+                    suggestions.append((record, field))
+            return suggestions
 
     def list_pending_problems(self, month: str | None = None) -> list[ProblemRecord]:
         problems = self.list_problems(month)
@@ -839,13 +1251,8 @@ class FileManager:
     def patch_problem_status(self, source: str, problem_id: str, status: ProblemStatus) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.status = status
@@ -860,8 +1267,7 @@ class FileManager:
                 record.solved_at = None
 
             record.updated_at = now_utc()
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
+            self._store_problem_locked(record)
             self._save_problem_markdown(record)
             return record
 
@@ -873,13 +1279,8 @@ class FileManager:
         mark_needs_solution: bool | None = None,
     ) -> ProblemRecord | None:
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.solution_status = solution_status
@@ -895,9 +1296,8 @@ class FileManager:
 
             record.solution_updated_at = now_utc()
             record.updated_at = now_utc()
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
-            self._save_problem_markdown(record)
+            self._store_problem_locked(record)
+            self._schedule_problem_markdown(record)
             return record
 
     def update_problem_ac_code(
@@ -911,13 +1311,8 @@ class FileManager:
     ) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.my_ac_code = code
@@ -931,48 +1326,35 @@ class FileManager:
                     record.solved_at = now_utc()
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
+            self._store_problem_locked(record)
             self._save_problem_markdown(record)
             return record
 
     def update_problem_reflection(self, source: str, problem_id: str, reflection: str) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.reflection = reflection
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
+            self._store_problem_locked(record)
             self._save_problem_markdown(record)
             return record
 
     def update_problem_difficulty(self, source: str, problem_id: str, difficulty: int | None) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.difficulty = difficulty
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
+            self._store_problem_locked(record)
             self._save_problem_markdown(record)
             return record
 
@@ -994,13 +1376,8 @@ class FileManager:
     ) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
             old_title = record.title
 
@@ -1035,8 +1412,7 @@ class FileManager:
 
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
+            self._store_problem_locked(record)
             self._save_problem_markdown(record)
             if title is not None and title != old_title and self._markdown_naming_mode() == MarkdownNamingMode.title:
                 self._rewrite_solution_files_for_problem(record)
@@ -1046,6 +1422,7 @@ class FileManager:
         record = self.get_problem(source, problem_id)
         if record is None:
             return None
+        self._markdown_renderer.flush([record.key()])
         md_paths = self._iter_problem_markdown_paths(source, problem_id)
         if md_paths:
             best = max(md_paths, key=lambda p: p.stat().st_mtime)
@@ -1056,22 +1433,16 @@ class FileManager:
     def mark_problem_translation_running(self, source: str, problem_id: str) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.translation_status = TranslationStatus.running
             record.translation_error = None
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
-            self._save_problem_markdown(record)
+            self._store_problem_locked(record)
+            self._schedule_problem_markdown(record)
             return record
 
     def set_problem_translation(
@@ -1082,13 +1453,8 @@ class FileManager:
     ) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.translated_title = payload.title_zh
@@ -1101,21 +1467,15 @@ class FileManager:
             record.translation_updated_at = now_utc()
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
-            self._save_problem_markdown(record)
+            self._store_problem_locked(record)
+            self._schedule_problem_markdown(record)
             return record
 
     def mark_problem_translation_failed(self, source: str, problem_id: str, error_message: str) -> ProblemRecord | None:
         key = problem_key(source, problem_id)
         with self._lock:
-            data = self._read_json(self.problems_file)
-            raw = data.get(key)
-            if raw is None:
-                return None
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
+            record = self._load_problem_locked(key)
+            if record is None:
                 return None
 
             record.translation_status = TranslationStatus.failed
@@ -1123,9 +1483,8 @@ class FileManager:
             record.translation_updated_at = now_utc()
             record.updated_at = now_utc()
 
-            data[key] = record.model_dump(mode="json")
-            self._write_json(self.problems_file, data)
-            self._save_problem_markdown(record)
+            self._store_problem_locked(record)
+            self._schedule_problem_markdown(record)
             return record
 
     def delete_problem(self, source: str, problem_id: str) -> ProblemDeleteResponse:
@@ -1136,24 +1495,10 @@ class FileManager:
         deleted = False
 
         with self._lock:
-            data = self._read_json(self.problems_file)
-            if key in data:
-                data.pop(key, None)
-                self._write_json(self.problems_file, data)
-                deleted = True
-
-            tasks = self._read_json(self.tasks_file)
-            kept_tasks: dict[str, dict] = {}
-            for task_id, raw in tasks.items():
-                problem_key_raw = ""
-                if isinstance(raw, dict):
-                    problem_key_raw = str(raw.get("problem_key", ""))
-                if problem_key_raw == key:
-                    removed_tasks += 1
-                    continue
-                kept_tasks[task_id] = raw
-            if removed_tasks > 0:
-                self._write_json(self.tasks_file, kept_tasks)
+            self._markdown_renderer.cancel(key)
+            deleted = self._problem_store.delete(key)
+            self._problem_cache.delete(key)
+            removed_tasks = self._task_index.delete_for_problem(key)
 
             md_paths = self._iter_problem_markdown_paths(source, problem_id)
             for path in md_paths:
@@ -1162,6 +1507,7 @@ class FileManager:
                     removed_md += 1
                 except OSError:
                     continue
+                self._markdown_index.discard(path)
 
             solution_paths = self._iter_solution_markdown_paths(source, problem_id)
             for path in solution_paths:
@@ -1170,6 +1516,7 @@ class FileManager:
                     removed_solution += 1
                 except OSError:
                     continue
+                self._markdown_index.discard(path)
 
             # Cleanup solution images
             img_dir = self._solution_images_dir(source, problem_id)
@@ -1209,7 +1556,7 @@ class FileManager:
 
         with self._lock:
             # Check count limit
-            record = self.get_problem(source, problem_id)
+            record = self._load_problem_locked(problem_key(source, problem_id))
             if not record:
                 raise ValueError("Problem not found")
             if len(record.solution_images) >= self._MAX_IMAGES_PER_PROBLEM:
@@ -1257,15 +1604,11 @@ class FileManager:
             record.solution_images.append(meta)
             
             # Direct save logic to avoid upsert_problems overhead/bugs for this simple update
-            data = self._read_json(self.problems_file)
             key = problem_key(source, problem_id)
             # Ensure we are updating the latest version from disk (though we are under lock)
-            if key in data:
-                 # Update the specific field in the dict
-                 # We need to serialize the record correctly.
-                 # Actually, record is already a ProblemRecord object with the new image added.
-                 data[key] = record.model_dump(mode="json")
-                 self._write_json(self.problems_file, data)
+            if self._problem_cache.contains(key):
+                 # record is already a ProblemRecord object with the new image added.
+                 self._store_problem_locked(record)
             else:
                  # Should not happen as we checked existence
                  raise ValueError("Problem record lost during save")
@@ -1280,7 +1623,7 @@ class FileManager:
 
     def delete_solution_image(self, source: str, problem_id: str, image_id: str) -> bool:
         with self._lock:
-            record = self.get_problem(source, problem_id)
+            record = self._load_problem_locked(problem_key(source, problem_id))
             if not record:
                 return False
 
@@ -1307,11 +1650,9 @@ class FileManager:
             record.solution_images.pop(target_idx)
             
             # Direct save
-            data = self._read_json(self.problems_file)
             key = problem_key(source, problem_id)
-            if key in data:
-                 data[key] = record.model_dump(mode="json")
-                 self._write_json(self.problems_file, data)
+            if self._problem_cache.contains(key):
+                 self._store_problem_locked(record)
 
             return True
 
@@ -1337,38 +1678,53 @@ class FileManager:
         except Exception:
             return None
 
-    def create_task(self, key: str, provider_name: str | None = None) -> SolutionTaskRecord:
+    def create_task(
+        self,
+        key: str,
+        provider_name: str | None = None,
+        profile_id: str | None = None,
+        priority: TaskPriority = TaskPriority.batch,
+        prompt_hash: str | None = None,
+    ) -> SolutionTaskRecord:
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
             task_id = uuid.uuid4().hex
             record = SolutionTaskRecord(
                 task_id=task_id,
                 task_type=TaskType.solution,
                 problem_key=key,
                 provider_name=provider_name,
+                profile_id=profile_id,
+                prompt_hash=prompt_hash,
+                priority=priority,
             )
-            tasks[task_id] = record.model_dump(mode="json")
-            self._write_json(self.tasks_file, tasks)
+            self._task_index.put(record)
             return record
 
-    def create_ai_tag_task(self, key: str, provider_name: str | None = None) -> SolutionTaskRecord:
+    def create_ai_tag_task(
+        self,
+        key: str,
+        provider_name: str | None = None,
+        profile_id: str | None = None,
+        priority: TaskPriority = TaskPriority.interactive,
+        prompt_hash: str | None = None,
+    ) -> SolutionTaskRecord:
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
             task_id = uuid.uuid4().hex
             record = SolutionTaskRecord(
                 task_id=task_id,
                 task_type=TaskType.ai_tag,
                 problem_key=key,
                 provider_name=provider_name,
+                profile_id=profile_id,
+                prompt_hash=prompt_hash,
+                priority=priority,
             )
-            tasks[task_id] = record.model_dump(mode="json")
-            self._write_json(self.tasks_file, tasks)
+            self._task_index.put(record)
             return record
 
     def create_report_task(self, report_type: str, report_target: str, provider_name: str | None = None) -> SolutionTaskRecord:
         task_type = TaskType.weekly_report if report_type == "weekly" else TaskType.phased_report
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
             task_id = uuid.uuid4().hex
             record = SolutionTaskRecord(
                 task_id=task_id,
@@ -1378,85 +1734,172 @@ class FileManager:
                 report_target=report_target,
                 provider_name=provider_name,
             )
-            tasks[task_id] = record.model_dump(mode="json")
-            self._write_json(self.tasks_file, tasks)
+            self._task_index.put(record)
             return record
 
     def get_task(self, task_id: str) -> SolutionTaskRecord | None:
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
-            raw = tasks.get(task_id)
-            if raw is None:
-                return None
-            try:
-                return SolutionTaskRecord.model_validate(raw)
-            except ValidationError:
-                return None
+            record = self._task_index.get(task_id)
+            return record.model_copy() if record is not None else None
 
-    def list_tasks(self) -> list[SolutionTaskRecord]:
+    def list_tasks(self, limit: int | None = None) -> list[SolutionTaskRecord]:
+        """Tasks newest first; a ``limit`` of up to ``TaskIndex.RECENT_CAPACITY`` costs O(limit)."""
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
-            records: list[SolutionTaskRecord] = []
-            for raw in tasks.values():
-                try:
-                    records.append(SolutionTaskRecord.model_validate(raw))
-                except ValidationError:
-                    continue
-            records.sort(key=lambda x: x.created_at, reverse=True)
-            return records
+            return [record.model_copy() for record in self._task_index.recent(limit)]
+
+    def list_active_tasks(self) -> list[SolutionTaskRecord]:
+        """Queued and running tasks, oldest first."""
+        with self._lock:
+            return [record.model_copy() for record in self._task_index.active()]
 
     def has_active_solution_tasks(self) -> bool:
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
-            for raw in tasks.values():
-                try:
-                    record = SolutionTaskRecord.model_validate(raw)
-                except ValidationError:
-                    continue
-                if record.status in {TaskStatus.queued, TaskStatus.running}:
-                    return True
-            return False
+            return self._task_index.has_active()
 
     def update_task(
         self,
         task_id: str,
         *,
         status: TaskStatus | None = None,
+        priority: TaskPriority | None = None,
         error_message: str | None = None,
         output_path: str | None = None,
+        queue_wait_ms: int | None = None,
         started: bool = False,
         finished: bool = False,
     ) -> SolutionTaskRecord | None:
         with self._lock:
-            tasks = self._read_json(self.tasks_file)
-            raw = tasks.get(task_id)
-            if raw is None:
-                return None
-            try:
-                record = SolutionTaskRecord.model_validate(raw)
-            except ValidationError:
+            current = self._task_index.get(task_id)
+            if current is None:
                 return None
+            record = current.model_copy()
 
             if status is not None:
                 record.status = status
+            if priority is not None:
+                record.priority = priority
             if error_message is not None:
                 record.error_message = error_message
             if output_path is not None:
                 record.output_path = output_path
+            if queue_wait_ms is not None:
+                record.queue_wait_ms = queue_wait_ms
             if started:
                 record.started_at = now_utc()
+                record.attempts += 1
             if finished:
                 record.finished_at = now_utc()
 
-            tasks[task_id] = record.model_dump(mode="json")
-            self._write_json(self.tasks_file, tasks)
-            return record
+            self._task_index.put(record)
+            if current.status in ACTIVE_TASK_STATUSES and record.status not in ACTIVE_TASK_STATUSES:
+                self._tasks_finished_since_compaction += 1
+                if self._tasks_finished_since_compaction >= self._TASK_COMPACT_EVERY_FINISHED:
+                    self.compact_tasks()
+            return record.model_copy()
+
+    def reclaim_orphaned_tasks(self, max_attempts: int) -> list[SolutionTaskRecord]:
+        """Put tasks a previous process left queued or running back in the queue, oldest first.
+
+        Only call this before the current process has started any task. Tasks that
+        already used ``max_attempts`` runs fail, as do report tasks: those are
+        generated inside their request and have nothing to resume them.
+        """
+        with self._lock:
+            requeued: list[SolutionTaskRecord] = []
+            for current in self._task_index.active():
+                if current.task_type not in {TaskType.solution, TaskType.ai_tag}:
+                    err = "interrupted by backend restart"
+                    self.update_task(current.task_id, status=TaskStatus.failed, error_message=err, finished=True)
+                    if current.report_type and current.report_target:
+                        self.update_insight_status(current.report_type, current.report_target, "failed", error_message=err)
+                    continue
+                if current.attempts >= max_attempts:
+                    err = f"interrupted by backend restart after {current.attempts} attempts"
+                    self.update_task(current.task_id, status=TaskStatus.failed, error_message=err, finished=True)
+                    self.discard_task_partial(current.task_id)
+                    if current.task_type == TaskType.solution:
+                        self.set_problem_solution_state(current.problem_key, SolutionStatus.failed, mark_needs_solution=True)
+                    continue
+                record = current.model_copy()
+                record.status = TaskStatus.queued
+                record.started_at = None
+                self._task_index.put(record)
+                if record.task_type == TaskType.solution:
+                    self.set_problem_solution_state(record.problem_key, SolutionStatus.queued)
+                requeued.append(record.model_copy())
+            return requeued
+
+    def compact_tasks(self, now: datetime | None = None) -> dict:
+        """Move finished tasks outside the retention policy into ``task_archive/YYYY-MM.jsonl.gz``.
+
+        Archives are appended to before the tasks leave the store, so a crash in
+        between leaves a task in both places rather than in neither.
+        """
+        with self._lock:
+            self._tasks_finished_since_compaction = 0
+            ui = self.get_settings().ui
+            expired = self._task_index.expired(ui.task_retention, ui.task_retention_by_type, now or now_utc())
+            if not expired:
+                return {"archived": 0, "months": []}
+            by_month: dict[str, list[SolutionTaskRecord]] = {}
+            for record in expired:
+                by_month.setdefault(month_from_dt(record.created_at), []).append(record)
+            self.task_archive_dir.mkdir(parents=True, exist_ok=True)
+            for month, records in by_month.items():
+                payload = b"".join(record.model_dump_json().encode("utf-8") + b"\n" for record in records)
+                with (self.task_archive_dir / f"{month}.jsonl.gz").open("ab") as fh:
+                    fh.write(gzip.compress(payload))
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            self._task_index.delete_many([record.task_id for record in expired])
+            return {"archived": len(expired), "months": sorted(by_month)}
+
+    def read_archived_tasks(self, month: str) -> list[SolutionTaskRecord]:
+        path = self.task_archive_dir / f"{month}.jsonl.gz"
+        try:
+            lines = gzip.decompress(path.read_bytes()).splitlines()
+        except (OSError, EOFError, gzip.BadGzipFile):
+            return []
+        records: dict[str, SolutionTaskRecord] = {}
+        for line in lines:
+            try:
+                record = SolutionTaskRecord.model_validate_json(line)
+            except ValidationError:
+                continue
+            records[record.task_id] = record
+        return sorted(records.values(), key=lambda record: record.created_at)
+
+    def read_task_partial(self, task_id: str) -> str:
+        try:
+            with (self.task_partials_dir / f"{task_id}.md").open(encoding="utf-8", newline="") as fh:
+                return fh.read()
+        except FileNotFoundError:
+            return ""
+
+    @contextmanager
+    def open_task_partial(self, task_id: str) -> Iterator[Callable[[str], None]]:
+        """Yield an appender for the partial output of ``task_id``; every chunk is flushed as it is written.
+
+        The file outlives a crash, so a resumed task can continue from it.
+        """
+        self.task_partials_dir.mkdir(parents=True, exist_ok=True)
+        with (self.task_partials_dir / f"{task_id}.md").open("a", encoding="utf-8", newline="") as fh:
+
+            def _append(text: str) -> None:
+                fh.write(text)
+                fh.flush()
+
+            yield _append
+
+    def discard_task_partial(self, task_id: str) -> None:
+        (self.task_partials_dir / f"{task_id}.md").unlink(missing_ok=True)
 
     def save_solution_file(self, problem: ProblemRecord, content: str) -> str:
         month = current_month()
         path = self._next_available_solution_md_path(problem, month)
         final_content = self._build_solution_markdown(problem, content, path)
         path.write_text(final_content, encoding="utf-8")
+        self._markdown_index.record(path, (problem.source, problem.id))
         return str(path)
 
     def list_solution_files(self, month: str | None = None) -> list[str]:
@@ -1487,23 +1930,21 @@ class FileManager:
     ) -> ReportStatusResponse:
         key = f"{insight_type}:{target}"
         with self._lock:
-            reports = self._read_json(self.reports_file)
             now_str = now_utc().isoformat()
-            reports[key] = {
+            payload = {
                 "target": target,
                 "status": status,
                 "updated_at": now_str,
                 "report_path": report_path,
                 "error_message": error_message,
             }
-            self._write_json(self.reports_file, reports)
-            return ReportStatusResponse.model_validate(reports[key])
+            self._report_store.put(key, payload)
+            return ReportStatusResponse.model_validate(payload)
 
     def get_insight_status(self, insight_type: str, target: str) -> ReportStatusResponse:
         key = f"{insight_type}:{target}"
         with self._lock:
-            reports = self._read_json(self.reports_file)
-            raw = reports.get(key)
+            raw = self._report_store.get(key)
             if raw:
                 try:
                     return ReportStatusResponse.model_validate(raw)
@@ -1575,82 +2016,117 @@ class FileManager:
             suffix += 1
         return candidate
 
+    def _settings_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self.settings_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def get_settings(self) -> SettingsBundle:
-        with self._lock:
-            raw = self._read_json(self.settings_file)
-            default = self._build_default_settings()
-            default_profile = default.ai.resolve_active_profile()
-            changed = False
+        """Current settings snapshot, shared between callers; treat it as read-only.
 
-            # Only the new AI profile schema is supported.
-            if "ai" in raw and isinstance(raw["ai"], dict):
-                if not isinstance(raw["ai"].get("profiles"), list):
-                    self._write_json(self.settings_file, default.model_dump(mode="json"))
-                    return default
+        ``settings.json`` is only re-read and re-normalized when its mtime or size
+        changes. The ``update_*`` methods replace the snapshot as a whole.
+        """
+        with self._lock:
+            cached = self._settings_snapshot
+            if cached is not None and cached[0] == self._settings_signature():
+                return cached[1]
+            settings = self._load_settings_locked()
+            self._settings_snapshot = (self._settings_signature(), settings)
+            self._settings_version += 1
+            return settings
 
-            try:
-                settings = SettingsBundle.model_validate(raw)
-            except ValidationError:
+    def get_settings_version(self) -> int:
+        """Incremented every time the settings snapshot is replaced or reloaded."""
+        with self._lock:
+            self.get_settings()
+            return self._settings_version
+
+    def _settings_for_update(self) -> SettingsBundle:
+        return self.get_settings().model_copy(deep=True)
+
+    def _replace_settings_locked(self, settings: SettingsBundle) -> None:
+        self._write_json(self.settings_file, settings.model_dump(mode="json"))
+        self._settings_snapshot = (self._settings_signature(), settings)
+        self._settings_version += 1
+
+    def _load_settings_locked(self) -> SettingsBundle:
+        raw = self._read_json(self.settings_file)
+        default = self._build_default_settings()
+        default_profile = default.ai.resolve_active_profile()
+        changed = False
+
+        # Only the new AI profile schema is supported.
+        if "ai" in raw and isinstance(raw["ai"], dict):
+            if not isinstance(raw["ai"].get("profiles"), list):
                 self._write_json(self.settings_file, default.model_dump(mode="json"))
                 return default
 
-            before_count = len(settings.ai.profiles)
-            active = settings.ai.resolve_active_profile()
-            if len(settings.ai.profiles) != before_count:
-                changed = True
+        try:
+            settings = SettingsBundle.model_validate(raw)
+        except ValidationError:
+            self._write_json(self.settings_file, default.model_dump(mode="json"))
+            return default
 
-            if not active.api_base and default_profile.api_base:
-                active.api_base = default_profile.api_base
+        before_count = len(settings.ai.profiles)
+        active = settings.ai.resolve_active_profile()
+        if len(settings.ai.profiles) != before_count:
+            changed = True
+
+        if not active.api_base and default_profile.api_base:
+            active.api_base = default_profile.api_base
+            changed = True
+        if not active.api_key and default_profile.api_key:
+            active.api_key = default_profile.api_key
+            changed = True
+
+        normalized_storage_base = self.get_storage_base_dir()
+        if settings.ui.storage_base_dir != normalized_storage_base:
+            settings.ui.storage_base_dir = normalized_storage_base
+            changed = True
+
+        seen_ids: set[str] = set()
+        for idx, profile in enumerate(settings.ai.profiles):
+            normalized_id = self._ensure_unique_profile_id(profile.id, seen_ids)
+            if profile.id != normalized_id:
+                profile.id = normalized_id
                 changed = True
-            if not active.api_key and default_profile.api_key:
-                active.api_key = default_profile.api_key
+            seen_ids.add(profile.id)
+
+            normalized_name = profile.name.strip() or f"Provider {idx + 1}"
+            if profile.name != normalized_name:
+                profile.name = normalized_name
                 changed = True
 
-            normalized_storage_base = self.get_storage_base_dir()
-            if settings.ui.storage_base_dir != normalized_storage_base:
-                settings.ui.storage_base_dir = normalized_storage_base
+            normalized_provider = self._normalize_provider_alias(
+                profile.provider.value if isinstance(profile.provider, AIProvider) else str(profile.provider),
+                default_profile.provider,
+            )
+            if profile.provider != normalized_provider:
+                profile.provider = normalized_provider
                 changed = True
 
-            seen_ids: set[str] = set()
-            for idx, profile in enumerate(settings.ai.profiles):
-                normalized_id = self._ensure_unique_profile_id(profile.id, seen_ids)
-                if profile.id != normalized_id:
-                    profile.id = normalized_id
-                    changed = True
-                seen_ids.add(profile.id)
-
-                normalized_name = profile.name.strip() or f"Provider {idx + 1}"
-                if profile.name != normalized_name:
-                    profile.name = normalized_name
-                    changed = True
-
-                normalized_provider = self._normalize_provider_alias(
-                    profile.provider.value if isinstance(profile.provider, AIProvider) else str(profile.provider),
-                    default_profile.provider,
-                )
-                if profile.provider != normalized_provider:
-                    profile.provider = normalized_provider
-                    changed = True
-
-                normalized_model, normalized_options = self._normalize_model_selection(
-                    profile.model,
-                    profile.model_options,
-                    default_profile.model,
-                )
-                if profile.model != normalized_model:
-                    profile.model = normalized_model
-                    changed = True
-                if profile.model_options != normalized_options:
-                    profile.model_options = normalized_options
-                    changed = True
-
-            if settings.ai.active_profile_id not in seen_ids:
-                settings.ai.active_profile_id = settings.ai.profiles[0].id
+            normalized_model, normalized_options = self._normalize_model_selection(
+                profile.model,
+                profile.model_options,
+                default_profile.model,
+            )
+            if profile.model != normalized_model:
+                profile.model = normalized_model
+                changed = True
+            if profile.model_options != normalized_options:
+                profile.model_options = normalized_options
                 changed = True
 
-            if changed:
-                self._write_json(self.settings_file, settings.model_dump(mode="json"))
-            return settings
+        if settings.ai.active_profile_id not in seen_ids:
+            settings.ai.active_profile_id = settings.ai.profiles[0].id
+            changed = True
+
+        if changed:
+            self._write_json(self.settings_file, settings.model_dump(mode="json"))
+        return settings
 
     def get_ai_profile(self, profile_id: str) -> AIProfile | None:
         current = self.get_settings()
@@ -1661,7 +2137,7 @@ class FileManager:
 
     def update_ai_settings(self, ai_settings: AIProfile) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             active = current.ai.resolve_active_profile()
             model, options = self._normalize_model_selection(
                 ai_settings.model,
@@ -1678,6 +2154,13 @@ class FileManager:
                 model_options=options,
                 temperature=ai_settings.temperature,
                 timeout_seconds=ai_settings.timeout_seconds,
+                max_concurrency=ai_settings.max_concurrency,
+                requests_per_minute=ai_settings.requests_per_minute,
+                tokens_per_minute=ai_settings.tokens_per_minute,
+                adaptive_concurrency=ai_settings.adaptive_concurrency,
+                http2=ai_settings.http2,
+                pool_max_connections=ai_settings.pool_max_connections,
+                pool_max_keepalive=ai_settings.pool_max_keepalive,
             )
 
             replaced = False
@@ -1690,12 +2173,12 @@ class FileManager:
                 current.ai.profiles.append(next_profile)
                 current.ai.active_profile_id = next_profile.id
 
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             return current
 
     def add_ai_profile(self, profile: AIProfile, *, set_active: bool = True) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             existing_ids = {item.id for item in current.ai.profiles}
 
             model, options = self._normalize_model_selection(
@@ -1711,12 +2194,12 @@ class FileManager:
             current.ai.profiles.append(profile)
             if set_active:
                 current.ai.active_profile_id = profile.id
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             return current
 
     def update_ai_profile(self, profile_id: str, profile: AIProfile) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             model, options = self._normalize_model_selection(
                 profile.model,
                 profile.model_options,
@@ -1736,24 +2219,31 @@ class FileManager:
                     model_options=options,
                     temperature=profile.temperature,
                     timeout_seconds=profile.timeout_seconds,
+                    max_concurrency=profile.max_concurrency,
+                    requests_per_minute=profile.requests_per_minute,
+                    tokens_per_minute=profile.tokens_per_minute,
+                    adaptive_concurrency=profile.adaptive_concurrency,
+                    http2=profile.http2,
+                    pool_max_connections=profile.pool_max_connections,
+                    pool_max_keepalive=profile.pool_max_keepalive,
                 )
-                self._write_json(self.settings_file, current.model_dump(mode="json"))
+                self._replace_settings_locked(current)
                 return current
             raise ValueError("profile not found")
 
     def activate_ai_profile(self, profile_id: str) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             exists = any(profile.id == profile_id for profile in current.ai.profiles)
             if not exists:
                 raise ValueError("profile not found")
             current.ai.active_profile_id = profile_id
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             return current
 
     def delete_ai_profile(self, profile_id: str) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             if len(current.ai.profiles) <= 1:
                 raise ValueError("at least one profile must remain")
 
@@ -1764,20 +2254,22 @@ class FileManager:
             current.ai.profiles = next_profiles
             if current.ai.active_profile_id == profile_id:
                 current.ai.active_profile_id = next_profiles[0].id
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             return current
 
     def update_prompt_settings(self, prompt_settings: PromptSettings) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             current.prompts = prompt_settings
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             return current
 
     def update_ui_settings(self, ui_settings: UiSettings) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             naming_mode_changed = current.ui.markdown_naming_mode != ui_settings.markdown_naming_mode
+            if ui_settings.storage_engine != self._storage_engine:
+                self._switch_storage_engine_locked(ui_settings.storage_engine)
             current.ui = UiSettings(
                 default_ac_language=ui_settings.default_ac_language,
                 storage_base_dir=(ui_settings.storage_base_dir or "").strip() or self.get_storage_base_dir(),
@@ -1785,25 +2277,24 @@ class FileManager:
                 autostart_silent=ui_settings.autostart_silent,
                 obsidian_mode_enabled=ui_settings.obsidian_mode_enabled,
                 markdown_naming_mode=ui_settings.markdown_naming_mode,
+                storage_engine=ui_settings.storage_engine,
+                task_retention=ui_settings.task_retention,
+                task_retention_by_type=ui_settings.task_retention_by_type,
+                task_deadline_seconds=ui_settings.task_deadline_seconds,
             )
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             if naming_mode_changed:
                 self._migrate_markdown_naming_mode_locked()
             return current
 
     def _migrate_markdown_naming_mode_locked(self) -> None:
-        data = self._read_json(self.problems_file)
-        for raw in data.values():
-            try:
-                record = ProblemRecord.model_validate(raw)
-            except ValidationError:
-                continue
+        for record in self._problem_cache.ordered():
             self._save_problem_markdown(record)
             self._rewrite_solution_files_for_problem(record)
 
     def remove_model_option(self, model_name: str) -> SettingsBundle:
         with self._lock:
-            current = self.get_settings()
+            current = self._settings_for_update()
             profile = current.ai.resolve_active_profile()
             options = [m for m in profile.model_options if m != model_name]
             if not options:
@@ -1815,5 +2306,5 @@ class FileManager:
                 options,
                 "gpt-4o-mini",
             )
-            self._write_json(self.settings_file, current.model_dump(mode="json"))
+            self._replace_settings_locked(current)
             return current
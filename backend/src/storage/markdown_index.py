@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .record_store import read_json_dict, write_json_dict
+
+MARKDOWN_INDEX_NAME = "markdown_index.json"
+
+IdentityExtractor = Callable[[str], "tuple[str, str] | None"]
+
+_INDEX_VERSION = 1
+_HEAD_BYTES = 4096
+_DUP_MARKER = "__dup_"
+
+
+class MarkdownIndex:
+    """Persistent ``(source, id) -> [paths]`` index over ``*/problems`` and ``*/solutions``.
+
+    Write paths in ``FileManager`` keep the index current via ``record``/``discard``.
+    Files added or removed by other tools (Obsidian, manual copies) are picked up
+    because each lookup compares the cached directory mtimes with the disk and
+    rescans only the directories that changed.
+    """
+
+    KINDS = ("problems", "solutions")
+
+    def __init__(self, base: Path, extractors: dict[str, IdentityExtractor]):
+        self.base = base
+        self.index_file = base / MARKDOWN_INDEX_NAME
+        self._extractors = extractors
+        self._lock = threading.RLock()
+        # "{month}/{kind}" -> {"mtime_ns": int, "files": {name: [source, id] | None}}
+        self._dirs: dict[str, dict] = {}
+        self._by_identity: dict[tuple[str, str, str], set[str]] = {}
+        self._by_stem: dict[tuple[str, str], set[str]] = {}
+        self._dirty = False
+        self._frozen = 0
+        self._load()
+
+    def _load(self) -> None:
+        raw = read_json_dict(self.index_file)
+        if raw.get("version") != _INDEX_VERSION or not isinstance(raw.get("dirs"), dict):
+            return
+        for rel_dir, entry in raw["dirs"].items():
+            if not isinstance(entry, dict) or not isinstance(entry.get("files"), dict):
+                continue
+            self._set_dir(rel_dir, int(entry.get("mtime_ns") or 0), entry["files"])
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": _INDEX_VERSION, "dirs": self._dirs}
+            try:
+                write_json_dict(self.index_file, payload)
+            except OSError:
+                return
+            self._dirty = False
+
+    def _kind_of(self, rel_dir: str) -> str:
+        return rel_dir.rsplit("/", 1)[-1]
+
+    def _stems_of(self, name: str) -> set[str]:
+        """The filename stem plus every prefix before a ``__dup_`` marker."""
+        stem = name[:-3] if name.endswith(".md") else name
+        stems = {stem}
+        idx = stem.find(_DUP_MARKER)
+        while idx > 0:
+            stems.add(stem[:idx])
+            idx = stem.find(_DUP_MARKER, idx + 1)
+        return stems
+
+    def _link(self, rel_dir: str, name: str, identity: list[str] | tuple[str, str] | None) -> None:
+        kind = self._kind_of(rel_dir)
+        rel_path = f"{rel_dir}/{name}"
+        if identity:
+            self._by_identity.setdefault((kind, identity[0], identity[1]), set()).add(rel_path)
+        for stem in self._stems_of(name):
+            self._by_stem.setdefault((kind, stem), set()).add(rel_path)
+
+    def _unlink(self, rel_dir: str, name: str, identity: list[str] | tuple[str, str] | None) -> None:
+        kind = self._kind_of(rel_dir)
+        rel_path = f"{rel_dir}/{name}"
+        if identity:
+            paths = self._by_identity.get((kind, identity[0], identity[1]))
+            if paths is not None:
+                paths.discard(rel_path)
+                if not paths:
+                    self._by_identity.pop((kind, identity[0], identity[1]), None)
+        for stem in self._stems_of(name):
+            paths = self._by_stem.get((kind, stem))
+            if paths is not None:
+                paths.discard(rel_path)
+                if not paths:
+                    self._by_stem.pop((kind, stem), None)
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        entry = self._dirs.pop(rel_dir, None)
+        if entry is None:
+            return
+        for name, identity in entry["files"].items():
+            self._unlink(rel_dir, name, identity)
+
+    def _set_dir(self, rel_dir: str, mtime_ns: int, files: dict[str, list[str] | None]) -> None:
+        self._drop_dir(rel_dir)
+        self._dirs[rel_dir] = {"mtime_ns": mtime_ns, "files": files}
+        for name, identity in files.items():
+            self._link(rel_dir, name, identity)
+
+    def _read_identity(self, path: Path, kind: str) -> list[str] | None:
+        extractor = self._extractors[kind]
+        try:
+            with path.open("rb") as fh:
+                head = fh.read(_HEAD_BYTES)
+                if len(head) < _HEAD_BYTES:
+                    return self._as_entry(extractor(head.decode("utf-8", errors="ignore")))
+                # Drop the partial last line so a value cut at the boundary is never matched.
+                identity = extractor(head[: head.rfind(b"\n") + 1].decode("utf-8", errors="ignore"))
+                if identity is None:
+                    # Identity lines live at the top of notes we write; only legacy or
+                    # hand-written files need the full read.
+                    identity = extractor((head + fh.read()).decode("utf-8", errors="ignore"))
+        except OSError:
+            return None
+        return self._as_entry(identity)
+
+    def _as_entry(self, identity: tuple[str, str] | None) -> list[str] | None:
+        return [identity[0], identity[1]] if identity else None
+
+    def _scan_dirs(self, dirs: list[tuple[str, Path, int]]) -> None:
+        for rel_dir, directory, mtime_ns in dirs:
+            kind = self._kind_of(rel_dir)
+            try:
+                paths = sorted(p for p in directory.iterdir() if p.suffix == ".md" and p.is_file())
+            except OSError:
+                paths = []
+            self._set_dir(rel_dir, mtime_ns, {path.name: self._read_identity(path, kind) for path in paths})
+        self._dirty = True
+
+    def _current_dirs(self) -> dict[str, tuple[Path, int]]:
+        current: dict[str, tuple[Path, int]] = {}
+        try:
+            children = list(self.base.iterdir())
+        except OSError:
+            return current
+        for child in children:
+            for kind in self.KINDS:
+                directory = child / kind
+                try:
+                    stat = directory.stat()
+                except OSError:
+                    continue
+                if directory.is_dir():
+                    current[f"{child.name}/{kind}"] = (directory, stat.st_mtime_ns)
+        return current
+
+    def refresh(self) -> None:
+        with self._lock:
+            if self._frozen:
+                return
+            current = self._current_dirs()
+            for rel_dir in [rel_dir for rel_dir in self._dirs if rel_dir not in current]:
+                self._drop_dir(rel_dir)
+                self._dirty = True
+            stale = [
+                (rel_dir, directory, mtime_ns)
+                for rel_dir, (directory, mtime_ns) in current.items()
+                if self._dirs.get(rel_dir, {}).get("mtime_ns") != mtime_ns
+            ]
+            if stale:
+                self._scan_dirs(stale)
+                self.flush()
+
+    @contextmanager
+    def batch(self) -> Iterator[MarkdownIndex]:
+        """Refresh once, then answer lookups from memory until the block exits."""
+        with self._lock:
+            self.refresh()
+            self._frozen += 1
+            try:
+                yield self
+            finally:
+                self._frozen -= 1
+
+    def rebuild(self) -> dict:
+        started = time.perf_counter()
+        with self._lock:
+            for rel_dir in list(self._dirs):
+                self._drop_dir(rel_dir)
+            current = self._current_dirs()
+            self._scan_dirs([(rel_dir, directory, mtime_ns) for rel_dir, (directory, mtime_ns) in current.items()])
+            self.flush()
+            files = sum(len(entry["files"]) for entry in self._dirs.values())
+            return {
+                "directories": len(self._dirs),
+                "files": files,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+    def _relative(self, path: Path) -> tuple[str, str] | None:
+        try:
+            rel = path.relative_to(self.base)
+        except ValueError:
+            return None
+        parts = rel.parts
+        if len(parts) != 3 or parts[1] not in self.KINDS:
+            return None
+        return f"{parts[0]}/{parts[1]}", parts[2]
+
+    def _touch_dir(self, rel_dir: str) -> None:
+        try:
+            mtime_ns = (self.base / rel_dir).stat().st_mtime_ns
+        except OSError:
+            return
+        entry = self._dirs.setdefault(rel_dir, {"mtime_ns": 0, "files": {}})
+        entry["mtime_ns"] = mtime_ns
+        self._dirty = True
+
+    def record(self, path: Path, identity: tuple[str, str]) -> None:
+        located = self._relative(path)
+        if located is None:
+            return
+        rel_dir, name = located
+        with self._lock:
+            if rel_dir not in self._dirs:
+                # New directory: leave it to the next refresh, which scans it in full.
+                return
+            files = self._dirs[rel_dir]["files"]
+            if name in files:
+                self._unlink(rel_dir, name, files[name])
+            files[name] = [identity[0], identity[1]]
+            self._link(rel_dir, name, files[name])
+            self._touch_dir(rel_dir)
+
+    def discard(self, path: Path) -> None:
+        located = self._relative(path)
+        if located is None:
+            return
+        rel_dir, name = located
+        with self._lock:
+            entry = self._dirs.get(rel_dir)
+            if entry is None or name not in entry["files"]:
+                return
+            self._unlink(rel_dir, name, entry["files"].pop(name))
+            self._touch_dir(rel_dir)
+
+    def identity_of(self, path: Path) -> tuple[str, str] | None:
+        located = self._relative(path)
+        if located is None:
+            return None
+        rel_dir, name = located
+        with self._lock:
+            self.refresh()
+            entry = self._dirs.get(rel_dir)
+            if entry is None or entry["files"].get(name) is None:
+                return None
+            source, problem_id = entry["files"][name]
+            return source, problem_id
+
+    def paths(
+        self,
+        kind: str,
+        source: str,
+        problem_id: str,
+        *,
+        names: Iterable[str] = (),
+        stems: Iterable[str] = (),
+    ) -> list[Path]:
+        """Files whose identity matches, plus legacy files matched by exact name or ``{stem}__dup_*``."""
+        with self._lock:
+            self.refresh()
+            matched = set(self._by_identity.get((kind, source, problem_id), ()))
+            for name in names:
+                stem = name[:-3] if name.endswith(".md") else name
+                matched.update(
+                    rel_path for rel_path in self._by_stem.get((kind, stem), ()) if rel_path.endswith(f"/{name}")
+                )
+            for stem in stems:
+                matched.update(self._by_stem.get((kind, stem), ()))
+            return sorted(self.base / rel_path for rel_path in matched)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "directories": len(self._dirs),
+                "files": sum(len(entry["files"]) for entry in self._dirs.values()),
+                "identities": len(self._by_identity),
+            }
+
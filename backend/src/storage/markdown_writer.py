@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Renders of the same problem requested within this window collapse into one.
+MARKDOWN_RENDER_DEBOUNCE_SECONDS = 0.5
+
+
+class MarkdownRenderQueue:
+    """Debounced background renderer for problem notes.
+
+    ``schedule(key)`` marks a problem note as stale. A daemon thread renders each
+    stale key once its debounce window has passed, calling ``render(key)``, which
+    is expected to read the latest record itself. Scheduling an already pending
+    key does not extend its deadline, so a burst of state changes costs one render
+    and a steady stream still renders every window. ``flush`` renders pending keys
+    in the calling thread; ``close`` drains the queue and stops the worker.
+    """
+
+    def __init__(self, render: Callable[[str], None], window: float = MARKDOWN_RENDER_DEBOUNCE_SECONDS):
+        self._render = render
+        self.window = window
+        self._cond = threading.Condition()
+        self._due: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+        self._closing = False
+        self.scheduled = 0
+        self.rendered = 0
+
+    def schedule(self, key: str) -> None:
+        if self.window <= 0:
+            self._render_keys([key])
+            return
+        with self._cond:
+            self.scheduled += 1
+            self._due.setdefault(key, time.monotonic() + self.window)
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="markdown-render", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, key: str) -> None:
+        with self._cond:
+            self._due.pop(key, None)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._due)
+
+    def _render_keys(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            try:
+                self._render(key)
+                self.rendered += 1
+            except Exception:
+                logger.exception("failed to render markdown for %s", key)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closing:
+                    if self._due:
+                        wait = min(self._due.values()) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._closing:
+                    return
+                now = time.monotonic()
+                ready = [key for key, due in self._due.items() if due <= now]
+                for key in ready:
+                    del self._due[key]
+            self._render_keys(ready)
+
+    def flush(self, keys: Iterable[str] | None = None) -> None:
+        with self._cond:
+            if keys is None:
+                taken = list(self._due)
+                self._due.clear()
+            else:
+                taken = [key for key in keys if self._due.pop(key, None) is not None]
+        self._render_keys(taken)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "pending": len(self._due),
+                "scheduled": self.scheduled,
+                "rendered": self.rendered,
+            }
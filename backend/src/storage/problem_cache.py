@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import bisect
+import heapq
+import json
+from collections.abc import Callable, Iterable, Iterator
+from datetime import UTC, datetime
+from operator import itemgetter
+from typing import Any
+
+from pydantic import ValidationError
+
+from ..models.problem import PROBLEM_SUMMARY_FIELDS, ProblemRecord, ProblemSort, SortOrder
+from .facet_index import ProblemFacetIndex
+from .search_index import ProblemSearchIndex
+from .sharded_store import ShardedJsonRecordStore
+from .sqlite_store import SqliteRecordStore
+from .suggest_index import ProblemSuggestIndex
+
+
+_SORT_VALUES: dict[ProblemSort, Callable[[ProblemRecord], Any]] = {
+    ProblemSort.updated_at: lambda record: record.updated_at,
+    ProblemSort.solved_at: lambda record: record.solved_at,
+    ProblemSort.difficulty: lambda record: record.difficulty,
+    ProblemSort.title: lambda record: record.title.casefold(),
+}
+
+DEFAULT_SORT_ORDER: dict[ProblemSort, SortOrder] = {
+    ProblemSort.updated_at: SortOrder.desc,
+    ProblemSort.solved_at: SortOrder.desc,
+    ProblemSort.difficulty: SortOrder.asc,
+    ProblemSort.title: SortOrder.asc,
+}
+
+# Position of a record in a sort order: (value, key), or (None, key) for records without a value.
+SortPosition = tuple[Any, str]
+
+
+class SortedView:
+    """Records ordered by one sort key, ascending by ``(value, key)``; records without a value kept apart.
+
+    Either direction is iterated lazily from any position, so a page costs a
+    bisect plus the records it yields. Records without a value always come last.
+    """
+
+    __slots__ = ("positions", "records", "null_keys", "null_records")
+
+    def __init__(
+        self,
+        positions: list[SortPosition],
+        records: list[ProblemRecord],
+        null_keys: list[str],
+        null_records: list[ProblemRecord],
+    ):
+        self.positions = positions
+        self.records = records
+        self.null_keys = null_keys
+        self.null_records = null_records
+
+    @classmethod
+    def build(cls, records: Iterable[ProblemRecord], sort: ProblemSort) -> SortedView:
+        value_of = _SORT_VALUES[sort]
+        ranked: list[tuple[SortPosition, ProblemRecord]] = []
+        nulls: list[tuple[str, ProblemRecord]] = []
+        for record in records:
+            value = value_of(record)
+            if value is None:
+                nulls.append((record.key(), record))
+            else:
+                ranked.append(((value, record.key()), record))
+        ranked.sort(key=itemgetter(0))
+        nulls.sort(key=itemgetter(0))
+        return cls(
+            [position for position, _ in ranked],
+            [record for _, record in ranked],
+            [key for key, _ in nulls],
+            [record for _, record in nulls],
+        )
+
+    @classmethod
+    def merge(cls, views: list[SortedView]) -> SortedView:
+        if len(views) == 1:
+            return views[0]
+        ranked = list(heapq.merge(*(zip(view.positions, view.records) for view in views), key=itemgetter(0)))
+        nulls = list(heapq.merge(*(zip(view.null_keys, view.null_records) for view in views), key=itemgetter(0)))
+        return cls(
+            [position for position, _ in ranked],
+            [record for _, record in ranked],
+            [key for key, _ in nulls],
+            [record for _, record in nulls],
+        )
+
+    def __len__(self) -> int:
+        return len(self.records) + len(self.null_records)
+
+    def iterate(self, descending: bool, after: SortPosition | None = None) -> Iterator[ProblemRecord]:
+        records = self.records
+        if after is not None and after[0] is None:
+            yield from self.null_records[bisect.bisect_right(self.null_keys, after[1]):]
+            return
+        if descending:
+            end = len(records) if after is None else bisect.bisect_left(self.positions, after)
+            yield from (records[idx] for idx in range(end - 1, -1, -1))
+        else:
+            start = 0 if after is None else bisect.bisect_right(self.positions, after)
+            yield from (records[idx] for idx in range(start, len(records)))
+        yield from self.null_records
+
+
+def sort_position(record: ProblemRecord, sort: ProblemSort) -> SortPosition:
+    return _SORT_VALUES[sort](record), record.key()
+
+
+def encode_sort_cursor(sort: ProblemSort, order: SortOrder, position: SortPosition) -> str:
+    value, key = position
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort.value, "o": order.value, "v": value, "k": key}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sort_cursor(cursor: str, sort: ProblemSort, order: SortOrder) -> SortPosition:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, dict) or not isinstance(raw.get("k"), str):
+            raise ValueError
+        value = raw.get("v")
+        if value is not None:
+            if sort in (ProblemSort.updated_at, ProblemSort.solved_at):
+                value = datetime.fromisoformat(value)
+            elif sort == ProblemSort.difficulty and not isinstance(value, int):
+                raise ValueError
+            elif sort == ProblemSort.title and not isinstance(value, str):
+                raise ValueError
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if raw.get("s") != sort.value or raw.get("o") != order.value:
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, raw["k"]
+
+
+class _Partition:
+    __slots__ = ("records", "views", "signature", "summaries")
+
+    def __init__(self, records: dict[str, ProblemRecord], signature: Any):
+        self.records = records
+        # Sort orders built on first use and dropped on every write to the partition.
+        self.views: dict[ProblemSort, SortedView] = {}
+        self.signature = signature
+        # key -> JSON-ready summary projection, dropped whenever the record is written.
+        self.summaries: dict[str, dict[str, Any]] = {}
+
+    def view(self, sort: ProblemSort) -> SortedView:
+        view = self.views.get(sort)
+        if view is None:
+            view = self.views[sort] = SortedView.build(self.records.values(), sort)
+        return view
+
+
+class ProblemCache:
+    """Validated ``ProblemRecord`` objects mirrored from the problem store.
+
+    Records are cached per creation month, matching the store's shards: a
+    partition is loaded on first use and reloaded only when its shard's signature
+    (JSON shard version, or SQLite ``data_version``) changes behind our back.
+    Point lookups go through the store's key -> month map, so they touch a single
+    partition. ``FileManager`` writes through the cache on every mutation.
+    Callers must hold ``FileManager._lock``.
+    """
+
+    def __init__(self, store: ShardedJsonRecordStore | SqliteRecordStore):
+        self._store = store
+        self._partitions: dict[str, _Partition] = {}
+        self._key_months: dict[str, str] | None = None
+        self._index_signature: Any = None
+        self._generation = 0
+        self._all_views: dict[ProblemSort, SortedView] = {}
+        self._all_views_generation = 0
+        self._months_memo: tuple[dict[str, str], int, list[str]] | None = None
+        # Built on the first keyword search (or warmed up in the background), then kept in
+        # step with every write and reload.
+        self._search: ProblemSearchIndex | None = None
+        # Keys written while a background warm-up builds an index from a snapshot.
+        self._search_pending: set[str] | None = None
+        # Built on the first suggestion lookup and kept in step the same way.
+        self._suggest: ProblemSuggestIndex | None = None
+        # Built on the first filtered lookup and kept in step the same way.
+        self._facets: ProblemFacetIndex | None = None
+        # Reads (``get`` and ``view``) served from memory vs. ones that had to load a partition.
+        self.hits = 0
+        self.misses = 0
+        self._loads = 0
+
+    def _month_of(self, record: ProblemRecord) -> str:
+        return record.created_at.astimezone(UTC).strftime("%Y-%m")
+
+    def _index(self) -> dict[str, str]:
+        signature = self._store.index_signature()
+        if self._key_months is None or signature != self._index_signature:
+            self._key_months = self._store.key_months()
+            self._index_signature = signature
+        return self._key_months
+
+    def _months(self) -> list[str]:
+        key_months = self._index()
+        memo = self._months_memo
+        if memo is None or memo[0] is not key_months or memo[1] != self._generation:
+            memo = self._months_memo = (key_months, self._generation, sorted(set(key_months.values())))
+        return memo[2]
+
+    def _partition(self, month: str) -> _Partition:
+        signature = self._store.partition_signature(month)
+        partition = self._partitions.get(month)
+        if partition is not None and partition.signature == signature:
+            return partition
+
+        self._loads += 1
+        records: dict[str, ProblemRecord] = {}
+        for key, raw in self._store.load(month=month).items():
+            try:
+                records[key] = ProblemRecord.model_validate(raw)
+            except ValidationError:
+                continue
+        previous = self._partitions.get(month)
+        if previous is not None:
+            for key in previous.records.keys() - records.keys():
+                self._unindex(key)
+        self._reindex(records.values())
+        partition = _Partition(records, signature)
+        self._partitions[month] = partition
+        self._generation += 1
+        return partition
+
+    def sync(self) -> None:
+        """Reload whatever changed externally; call before writing through."""
+        self._index()
+        for month in list(self._partitions):
+            self._partition(month)
+
+    def _count_read(self, loads_before: int) -> None:
+        if self._loads == loads_before:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def get(self, key: str) -> ProblemRecord | None:
+        loads = self._loads
+        month = self._index().get(key)
+        record = self._partition(month).records.get(key) if month is not None else None
+        self._count_read(loads)
+        return record
+
+    def peek(self, key: str) -> ProblemRecord | None:
+        """Like ``get`` but without signature checks; only valid right after ``sync``/``search_index``."""
+        month = self._key_months.get(key) if self._key_months is not None else None
+        partition = self._partitions.get(month) if month is not None else None
+        return partition.records.get(key) if partition is not None else None
+
+    def contains(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def view(self, sort: ProblemSort = ProblemSort.updated_at, month: str | None = None) -> SortedView:
+        """Records in ``sort`` order, optionally limited to one creation month."""
+        loads = self._loads
+        if month:
+            view = self._partition(month).view(sort)
+            self._count_read(loads)
+            return view
+        partitions = [self._partition(m) for m in self._months()]
+        if self._all_views_generation != self._generation:
+            self._all_views = {}
+            self._all_views_generation = self._generation
+        view = self._all_views.get(sort)
+        if view is None:
+            views = [partition.view(sort) for partition in partitions]
+            view = self._all_views[sort] = SortedView.merge(views) if views else SortedView([], [], [], [])
+        self._count_read(loads)
+        return view
+
+    def ordered(self, month: str | None = None) -> list[ProblemRecord]:
+        """Records sorted by ``updated_at`` descending, optionally limited to one creation month."""
+        return list(self.view(ProblemSort.updated_at, month).iterate(descending=True))
+
+    def project(self, record: ProblemRecord, fields: frozenset[str]) -> dict[str, Any]:
+        """JSON-ready projection of ``record``; summary-sized projections are memoized per record.
+
+        The returned dict may be shared with later calls and must not be mutated.
+        """
+        if not fields <= PROBLEM_SUMMARY_FIELDS:
+            return record.model_dump(mode="json", include=set(fields))
+        key = record.key()
+        partition = self._partitions.get(self._month_of(record))
+        cached = partition is not None and partition.records.get(key) is record
+        summary = partition.summaries.get(key) if cached else None
+        if summary is None:
+            summary = record.model_dump(mode="json", include=set(PROBLEM_SUMMARY_FIELDS))
+            if cached:
+                partition.summaries[key] = summary
+        if fields == PROBLEM_SUMMARY_FIELDS:
+            return summary
+        return {name: value for name, value in summary.items() if name in fields}
+
+    def _reindex(self, records: Iterable[ProblemRecord]) -> None:
+        """Bring the derived indexes in step with freshly cached ``records``."""
+        records = list(records)
+        if self._search_pending is not None:
+            self._search_pending.update(record.key() for record in records)
+        if self._search is not None:
+            self._search.add_many(records)
+        if self._suggest is not None:
+            self._suggest.add_many(records)
+        if self._facets is not None:
+            self._facets.add_many(records)
+
+    def _unindex(self, key: str) -> None:
+        if self._search_pending is not None:
+            self._search_pending.add(key)
+        if self._search is not None:
+            self._search.remove(key)
+        if self._suggest is not None:
+            self._suggest.remove(key)
+        if self._facets is not None:
+            self._facets.remove(key)
+
+    def search_index(self) -> ProblemSearchIndex:
+        if self._search is None:
+            index = ProblemSearchIndex()
+            for month in self._months():
+                index.add_many(self._partition(month).records.values())
+            self._search = index
+        else:
+            # Picks up shards changed behind our back; reloads re-index their records.
+            for month in self._months():
+                self._partition(month)
+        return self._search
+
+    def suggest_index(self) -> ProblemSuggestIndex:
+        if self._suggest is None:
+            index = ProblemSuggestIndex()
+            index.add_many(record for month in self._months() for record in self._partition(month).records.values())
+            self._suggest = index
+        else:
+            for month in self._months():
+                self._partition(month)
+        return self._suggest
+
+    def facet_index(self) -> ProblemFacetIndex:
+        if self._facets is None:
+            index = ProblemFacetIndex()
+            index.add_many(record for month in self._months() for record in self._partition(month).records.values())
+            self._facets = index
+        else:
+            for month in self._months():
+                self._partition(month)
+        return self._facets
+
+    def has_search_index(self) -> bool:
+        return self._search is not None
+
+    def begin_search_warmup(self) -> list[ProblemRecord]:
+        """Snapshot every record for an index built outside the lock; see ``finish_search_warmup``."""
+        self._search_pending = set()
+        return [record for month in self._months() for record in self._partition(month).records.values()]
+
+    def finish_search_warmup(self, index: ProblemSearchIndex) -> None:
+        if self._search_pending is None or self._search is not None:
+            # Invalidated meanwhile, or an index was built synchronously.
+            self._search_pending = None
+            return
+        # Reload shards changed behind our back while their keys are still being collected.
+        for month in self._months():
+            self._partition(month)
+        pending = self._search_pending
+        self._search_pending = None
+        for key in pending:
+            record = self.peek(key)
+            if record is None:
+                index.remove(key)
+            else:
+                index.update(record)
+        self._search = index
+
+    def month_of(self, key: str) -> str | None:
+        return self._index().get(key)
+
+    def put_many(self, records: Iterable[ProblemRecord]) -> None:
+        key_months = self._key_months
+        touched: set[str] = set()
+        cached: list[ProblemRecord] = []
+        for record in records:
+            key = record.key()
+            month = self._month_of(record)
+            previous = key_months.get(key) if key_months is not None else None
+            if previous is not None and previous != month and previous in self._partitions:
+                self._partitions[previous].records.pop(key, None)
+                self._partitions[previous].summaries.pop(key, None)
+                self._partitions[previous].views = {}
+                touched.add(previous)
+            if key_months is not None:
+                key_months[key] = month
+            partition = self._partitions.get(month)
+            if partition is None:
+                # The store already holds the write; loading the shard picks it up.
+                self._partition(month)
+                continue
+            partition.records[key] = record
+            partition.summaries.pop(key, None)
+            partition.views = {}
+            touched.add(month)
+            cached.append(record)
+        self._reindex(cached)
+        self._after_write(touched)
+
+    def put(self, record: ProblemRecord) -> None:
+        self.put_many([record])
+
+    def delete(self, key: str) -> None:
+        if self._key_months is None:
+            return
+        month = self._key_months.pop(key, None)
+        self._unindex(key)
+        partition = self._partitions.get(month) if month else None
+        if partition is not None:
+            partition.records.pop(key, None)
+            partition.summaries.pop(key, None)
+            partition.views = {}
+        self._after_write({month} if partition is not None else set())
+
+    def _after_write(self, months: set[str]) -> None:
+        for month in months:
+            self._partitions[month].signature = self._store.partition_signature(month)
+        if self._key_months is not None:
+            self._index_signature = self._store.index_signature()
+        self._generation += 1
+
+    def invalidate(self) -> None:
+        self._partitions = {}
+        self._key_months = None
+        self._index_signature = None
+        self._all_views = {}
+        self._search = None
+        self._search_pending = None
+        self._suggest = None
+        self._facets = None
+        self._generation += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": sum(len(partition.records) for partition in self._partitions.values()),
+            "partitions": len(self._partitions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "search_documents": len(self._search) if self._search is not None else 0,
+            "suggest_documents": len(self._suggest) if self._suggest is not None else 0,
+            "facet_documents": len(self._facets) if self._facets is not None else 0,
+        }
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+ColumnExtractor = Callable[[dict], Any]
+
+logger = logging.getLogger(__name__)
+
+# Mutations landing within this window are merged into a single file rewrite.
+GROUP_COMMIT_WINDOW_SECONDS = 0.05
+
+
+def read_json_dict(path: Path) -> dict:
+    """Parse a JSON object file; a missing or empty file reads as ``{}``.
+
+    A file that does not parse, or whose top level is not an object, is moved
+    aside by ``quarantine_corrupt_file`` before ``{}`` is returned, so the next
+    write starts a fresh file instead of overwriting the damaged one.
+    """
+    if not path.exists():
+        return {}
+    try:
+        text = path.read_text(encoding="utf-8").strip()
+        if not text:
+            return {}
+        obj = json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        quarantine_corrupt_file(path, str(exc))
+        return {}
+    if not isinstance(obj, dict):
+        quarantine_corrupt_file(path, f"top level is {type(obj).__name__}, expected object")
+        return {}
+    return obj
+
+
+def quarantine_corrupt_file(path: Path, reason: str) -> Path:
+    """Rename ``path`` to ``{name}.corrupt-{timestamp}`` and log it.
+
+    Raises ``OSError`` when the file cannot be moved: callers must not go on to
+    write an empty collection over data that is still in place.
+    """
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+    target = path.with_name(f"{path.name}.corrupt-{stamp}")
+    os.replace(path, target)
+    _fsync_dir(path.parent)
+    logger.error("moved unreadable %s aside to %s: %s", path, target.name, reason)
+    return target
+
+
+def _fsync_dir(directory: Path) -> None:
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _dump_json(obj: dict) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_json_dict(path: Path, obj: dict) -> None:
+    _atomic_write_bytes(path, _dump_json(obj))
+
+
+def _atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Replace ``path`` via temp file, fsync and rename: a crash leaves the old or the new file, never a torn one."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+class GroupCommitWriter:
+    """Background writer that coalesces JSON store flushes.
+
+    ``schedule`` marks a store as dirty; a daemon thread waits ``window`` seconds
+    to collect further mutations and then rewrites each dirty file once. A window
+    of ``0`` flushes synchronously. ``flush_all`` and ``close`` drain pending work.
+    """
+
+    def __init__(self, window: float = GROUP_COMMIT_WINDOW_SECONDS):
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending: dict[int, JsonRecordStore] = {}
+        self._thread: threading.Thread | None = None
+        self._closing = False
+
+    def schedule(self, store: JsonRecordStore) -> None:
+        if self.window <= 0:
+            store.flush()
+            return
+        with self._cond:
+            self._pending[id(store)] = store
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="json-group-commit", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _take_pending(self) -> list[JsonRecordStore]:
+        with self._cond:
+            stores = list(self._pending.values())
+            self._pending.clear()
+            return stores
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing and not self._pending:
+                    return
+                # Collect mutations for one window; ``close`` cuts the wait short.
+                deadline = time.monotonic() + self.window
+                while not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            for store in self._take_pending():
+                try:
+                    store.flush()
+                except OSError as exc:
+                    # The store stays dirty; the next mutation, flush_all or close retries.
+                    logger.warning("failed to flush %s: %s", store.path, exc)
+
+    def flush_all(self) -> None:
+        for store in self._take_pending():
+            store.flush()
+
+    def close(self) -> None:
+        self.flush_all()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+
+def _month_of(raw: dict) -> str:
+    text = str(raw.get("created_at") or "").strip()
+    if not text:
+        return ""
+    try:
+        return datetime.fromisoformat(text).astimezone(UTC).strftime("%Y-%m")
+    except ValueError:
+        return ""
+
+
+def _text(field: str) -> ColumnExtractor:
+    return lambda raw: str(raw.get(field) or "")
+
+
+# Columns are derived from the stored payload. The SQLite engine persists them as
+# indexed columns; the JSON engine evaluates them on the fly when filtering.
+PROBLEM_COLUMNS: dict[str, ColumnExtractor] = {
+    "source": _text("source"),
+    "problem_id": _text("id"),
+    "month": _month_of,
+    "status": _text("status"),
+    "needs_solution": lambda raw: 1 if raw.get("needs_solution") else 0,
+    "solution_status": _text("solution_status"),
+    "updated_at": _text("updated_at"),
+}
+
+TASK_COLUMNS: dict[str, ColumnExtractor] = {
+    "problem_key": _text("problem_key"),
+    "task_type": _text("task_type"),
+    "status": _text("status"),
+    "created_at": _text("created_at"),
+}
+
+REPORT_COLUMNS: dict[str, ColumnExtractor] = {}
+
+
+def filter_values(value: Any) -> tuple:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+def matches_filters(raw: Any, columns: Mapping[str, ColumnExtractor], filters: Mapping[str, Any]) -> bool:
+    if not filters:
+        return True
+    if not isinstance(raw, dict):
+        return False
+    for name, expected in filters.items():
+        extractor = columns.get(name)
+        if extractor is None:
+            raise ValueError(f"unknown filter column: {name}")
+        if extractor(raw) not in filter_values(expected):
+            return False
+    return True
+
+
+class JsonRecordStore:
+    """A whole collection kept in a single JSON object file keyed by record key.
+
+    The parsed file is kept in memory and only re-read when its mtime or size
+    changes, so a mutation costs one write instead of a read-modify-write. With a
+    ``GroupCommitWriter`` the write happens in the background and the in-memory
+    copy stays authoritative until it is flushed.
+    """
+
+    engine = "json"
+
+    def __init__(
+        self,
+        path: Path,
+        columns: Mapping[str, ColumnExtractor] | None = None,
+        writer: GroupCommitWriter | None = None,
+    ):
+        self.path = path
+        self.columns = dict(columns or {})
+        self._writer = writer
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._snapshot: dict | None = None
+        self._disk_signature: tuple[int, int] | None = None
+        self._version = 0
+        self._dirty = False
+
+    def ensure(self) -> None:
+        if not self.path.exists():
+            write_json_dict(self.path, {})
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def signature(self) -> int:
+        """Version that changes whenever the data does, through us or through the file."""
+        with self._lock:
+            self._data()
+            return self._version
+
+    def _data(self) -> dict:
+        with self._lock:
+            if self._snapshot is not None and self._dirty:
+                return self._snapshot
+            disk_signature = self._stat()
+            if self._snapshot is None or disk_signature != self._disk_signature:
+                self._snapshot = read_json_dict(self.path)
+                self._disk_signature = disk_signature
+                self._version += 1
+            return self._snapshot
+
+    def _write(self, data: dict) -> None:
+        with self._lock:
+            self._snapshot = data
+            self._version += 1
+            self._dirty = True
+        self._commit()
+
+    def _commit(self) -> None:
+        # Never called with ``_lock`` held: flush takes ``_flush_lock`` before ``_lock``.
+        if self._writer is None:
+            self.flush()
+        else:
+            self._writer.schedule(self)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty or self._snapshot is None:
+                    return
+                payload = _dump_json(self._snapshot)
+                version = self._version
+            # Disk I/O happens outside the data lock so mutations are not blocked by fsync.
+            _atomic_write_bytes(self.path, payload)
+            with self._lock:
+                self._disk_signature = self._stat()
+                if self._version == version:
+                    self._dirty = False
+
+    def load(self, **filters: Any) -> dict[str, dict]:
+        with self._lock:
+            data = self._data()
+            if not filters:
+                return dict(data)
+            return {key: raw for key, raw in data.items() if matches_filters(raw, self.columns, filters)}
+
+    def count(self, **filters: Any) -> int:
+        return len(self.load(**filters))
+
+    def get(self, key: str) -> dict | None:
+        return self._data().get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, dict]:
+        with self._lock:
+            data = self._data()
+            return {key: data[key] for key in keys if key in data}
+
+    def put(self, key: str, raw: dict) -> None:
+        self.put_many({key: raw})
+
+    def put_many(self, items: Mapping[str, dict]) -> None:
+        if not items:
+            return
+        with self._lock:
+            data = self._data()
+            data.update(items)
+            self._version += 1
+            self._dirty = True
+        self._commit()
+
+    def delete(self, key: str) -> bool:
+        return self.delete_many([key]) > 0
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        with self._lock:
+            data = self._data()
+            removed = 0
+            for key in keys:
+                if data.pop(key, None) is not None:
+                    removed += 1
+            if removed:
+                self._version += 1
+                self._dirty = True
+        if removed:
+            self._commit()
+        return removed
+
+    def delete_where(self, **filters: Any) -> int:
+        return self.delete_many(list(self.load(**filters)))
+
+    def replace_all(self, items: Mapping[str, dict]) -> None:
+        self._write(dict(items))
+
+    def close(self) -> None:
+        self.flush()
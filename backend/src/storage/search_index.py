@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import html
+import math
+import re
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterable
+
+from ..models.problem import ProblemRecord
+
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(f"[{CJK_RANGES}]+|[^\\W_{CJK_RANGES}]+")
+_CJK_RUN_RE = re.compile(f"[{CJK_RANGES}]+")
+_WORD_RE = re.compile(f"[^\\W_{CJK_RANGES}]+")
+_CJK_BIGRAM_RE = re.compile(f"(?=([{CJK_RANGES}]{{2}}))")
+_CJK_SINGLE_RE = re.compile(f"(?<![{CJK_RANGES}])[{CJK_RANGES}](?![{CJK_RANGES}])")
+
+# A term in the title, tags or id counts like this many occurrences in the statement.
+_TITLE_WEIGHT = 3
+_TITLE_FIELDS = ("title", "translated_title", "tags", "id")
+_BODY_FIELDS = (
+    "source",
+    "difficulty",
+    "content",
+    "translated_content",
+    "input_format",
+    "translated_input_format",
+    "output_format",
+    "translated_output_format",
+    "constraints",
+    "translated_constraints",
+    "reflection",
+)
+# Fields searched for a snippet, best first.
+_SNIPPET_FIELDS = (
+    "translated_content",
+    "content",
+    "reflection",
+    "translated_input_format",
+    "input_format",
+    "translated_output_format",
+    "output_format",
+    "translated_constraints",
+    "constraints",
+    "translated_title",
+    "title",
+)
+_SNIPPET_BEFORE = 40
+_SNIPPET_LENGTH = 160
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+# Compact the postings once this share of indexed documents is stale.
+_COMPACT_STALE_RATIO = 0.5
+_COMPACT_MIN_STALE = 256
+
+
+def tokenize(text: str) -> list[str]:
+    """Casefolded words; CJK runs become overlapping bigrams (a lone character stays a unigram)."""
+    text = text.casefold()
+    return _WORD_RE.findall(text) + _CJK_BIGRAM_RE.findall(text) + _CJK_SINGLE_RE.findall(text)
+
+
+def _whole_tokens(needle: str) -> list[str]:
+    """Tokens that any text containing ``needle`` as a substring must also produce.
+
+    CJK bigrams always qualify. A word, or a lone CJK character, qualifies only when
+    ``needle`` bounds it on both sides; at either end it may be part of a longer run.
+    """
+    tokens = _CJK_BIGRAM_RE.findall(needle)
+    last = len(needle)
+    for pattern in (_WORD_RE, _CJK_SINGLE_RE):
+        tokens.extend(m.group() for m in pattern.finditer(needle) if 0 < m.start() and m.end() < last)
+    return tokens
+
+
+def _field_text(record: ProblemRecord, field: str) -> str:
+    value = getattr(record, field)
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(value)
+    return str(value)
+
+
+def searchable_text(record: ProblemRecord) -> str:
+    """Casefolded text of every indexed field, for substring matching."""
+    return "\n".join(_field_text(record, field) for field in _TITLE_FIELDS + _BODY_FIELDS).casefold()
+
+
+class ProblemSearchIndex:
+    """Incrementally maintained inverted index over problem text, ranked with BM25.
+
+    Each indexed version of a record gets a fresh document number, so postings are
+    append-only ``array`` pairs sorted by document number; re-indexing or deleting
+    a record just marks its old number stale, and stale numbers are compacted away
+    once they make up half of the index. Document frequencies include stale
+    postings until then, which only nudges ``idf``. Not thread-safe: the owning
+    ``ProblemCache`` is used under ``FileManager._lock``.
+    """
+
+    def __init__(self) -> None:
+        self._doc_of: dict[str, int] = {}
+        self._keys: list[str | None] = []
+        self._lengths = array("I")
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._total_length = 0
+        self._stale: set[int] = set()
+        self._norms: tuple[int, int, list[float]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def add_many(self, records: Iterable[ProblemRecord]) -> None:
+        for record in records:
+            self.update(record)
+
+    def update(self, record: ProblemRecord) -> None:
+        key = record.key()
+        self.remove(key)
+        counts = Counter(tokenize("\n".join(_field_text(record, field) for field in _BODY_FIELDS)))
+        for token in tokenize("\n".join(_field_text(record, field) for field in _TITLE_FIELDS)):
+            counts[token] += _TITLE_WEIGHT
+        doc = len(self._keys)
+        self._keys.append(key)
+        length = sum(counts.values())
+        self._lengths.append(length)
+        self._total_length += length
+        self._doc_of[key] = doc
+        postings = self._postings
+        for token, tf in counts.items():
+            entry = postings.get(token)
+            if entry is None:
+                entry = postings[token] = (array("I"), array("I"))
+            entry[0].append(doc)
+            entry[1].append(tf)
+
+    def remove(self, key: str) -> None:
+        doc = self._doc_of.pop(key, None)
+        if doc is None:
+            return
+        self._keys[doc] = None
+        self._total_length -= self._lengths[doc]
+        self._stale.add(doc)
+        if len(self._stale) >= _COMPACT_MIN_STALE and len(self._stale) >= len(self._keys) * _COMPACT_STALE_RATIO:
+            self._compact()
+
+    def _compact(self) -> None:
+        renumber: dict[int, int] = {}
+        keys: list[str | None] = []
+        lengths = array("I")
+        for doc, key in enumerate(self._keys):
+            if key is None:
+                continue
+            renumber[doc] = len(keys)
+            self._doc_of[key] = len(keys)
+            keys.append(key)
+            lengths.append(self._lengths[doc])
+        postings: dict[str, tuple[array, array]] = {}
+        for token, (docs, tfs) in self._postings.items():
+            kept_docs = array("I")
+            kept_tfs = array("I")
+            for doc, tf in zip(docs, tfs):
+                new_doc = renumber.get(doc)
+                if new_doc is not None:
+                    kept_docs.append(new_doc)
+                    kept_tfs.append(tf)
+            if kept_docs:
+                postings[token] = (kept_docs, kept_tfs)
+        self._keys = keys
+        self._lengths = lengths
+        self._postings = postings
+        self._stale = set()
+        self._norms = None
+
+    def _query_terms(self, query: str) -> list[str]:
+        return list(dict.fromkeys(tokenize(query)))
+
+    def _length_norms(self) -> list[float]:
+        """Per-document BM25 length normalisation, recomputed when the corpus size changes."""
+        n_docs = len(self._doc_of)
+        norms = self._norms
+        if norms is None or norms[0] != self._total_length or norms[1] != len(self._keys):
+            avg_length = max(self._total_length / max(n_docs, 1), 1.0)
+            factor = _BM25_K1 * _BM25_B / avg_length
+            base = _BM25_K1 * (1 - _BM25_B)
+            norms = self._norms = (self._total_length, len(self._keys), [base + factor * length for length in self._lengths])
+        return norms[2]
+
+    def _candidates(self, terms: list[str]) -> tuple[set[int], list[tuple[array, array]]]:
+        """Live documents containing every term, and the terms' postings rarest first."""
+        if not terms or not self._doc_of:
+            return set(), []
+        entries = []
+        for term in terms:
+            entry = self._postings.get(term)
+            if entry is None:
+                return set(), []
+            entries.append(entry)
+        entries.sort(key=lambda entry: len(entry[0]))
+        candidates = set(entries[0][0])
+        for docs, _ in entries[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(docs)
+        candidates -= self._stale
+        return candidates, entries
+
+    def _score(self, candidates: set[int], entries: list[tuple[array, array]]) -> dict[int, float]:
+        """BM25 scores for ``candidates``."""
+        n_docs = len(self._doc_of)
+        norms = self._length_norms()
+        scores = dict.fromkeys(candidates, 0.0)
+        for docs, tfs in entries:
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (_BM25_K1 + 1)
+            if len(candidates) * 16 < df:
+                # Few candidates: probe the (doc-number sorted) postings instead of scanning them.
+                for doc in candidates:
+                    tf = tfs[bisect.bisect_left(docs, doc)]
+                    scores[doc] += idf * tf / (tf + norms[doc])
+            else:
+                tf_of = dict(zip(docs, tfs))
+                for doc in candidates:
+                    tf = tf_of[doc]
+                    scores[doc] += idf * tf / (tf + norms[doc])
+        return scores
+
+    def substring_candidates(self, needle: str) -> set[str] | None:
+        """Keys of records that may contain the casefolded ``needle``, or ``None`` if the index cannot narrow it.
+
+        The result is a superset: callers still test ``needle in searchable_text(record)``.
+        """
+        terms = list(dict.fromkeys(_whole_tokens(needle)))
+        if not terms:
+            return None
+        keys = self._keys
+        candidates, _ = self._candidates(terms)
+        return {keys[doc] for doc in candidates}
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        accept: Callable[[str], bool] | None = None,
+    ) -> tuple[int, list[tuple[str, float]]]:
+        """Return ``(total matches, best `limit` (key, score) pairs)`` among keys passing ``accept``."""
+        keys = self._keys
+        candidates, entries = self._candidates(self._query_terms(query))
+        if accept is not None:
+            candidates = {doc for doc in candidates if accept(keys[doc])}
+        scores = self._score(candidates, entries)
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), [(keys[doc], round(score, 4)) for doc, score in ranked]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "documents": len(self._doc_of),
+            "terms": len(self._postings),
+            "stale_documents": len(self._stale),
+        }
+
+
+def _highlight_pattern(query: str) -> re.Pattern[str] | None:
+    parts: set[str] = set()
+    for match in _TOKEN_RE.finditer(query.casefold()):
+        run = match.group()
+        parts.add(run)
+        if _CJK_RUN_RE.fullmatch(run) is not None and len(run) > 2:
+            parts.update(run[idx : idx + 2] for idx in range(len(run) - 1))
+    if not parts:
+        return None
+    return re.compile("|".join(re.escape(part) for part in sorted(parts, key=len, reverse=True)), re.IGNORECASE)
+
+
+def build_snippet(record: ProblemRecord, query: str) -> tuple[str, str]:
+    """Return ``(field, html)``: an HTML-escaped excerpt around the first hit with hits in ``<mark>``."""
+    pattern = _highlight_pattern(query)
+    if pattern is None:
+        return "", ""
+    for field in _SNIPPET_FIELDS:
+        text = _field_text(record, field)
+        first = pattern.search(text)
+        if first is None:
+            continue
+        start = max(0, first.start() - _SNIPPET_BEFORE)
+        end = min(len(text), start + _SNIPPET_LENGTH)
+        excerpt = " ".join(text[start:end].split())
+        pieces: list[str] = []
+        cursor = 0
+        for hit in pattern.finditer(excerpt):
+            pieces.append(html.escape(excerpt[cursor : hit.start()]))
+            pieces.append(f"<mark>{html.escape(hit.group())}</mark>")
+            cursor = hit.end()
+        pieces.append(html.escape(excerpt[cursor:]))
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        return field, prefix + "".join(pieces) + suffix
+    return "", ""
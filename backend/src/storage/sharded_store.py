@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from .record_store import (
+    ColumnExtractor,
+    GroupCommitWriter,
+    JsonRecordStore,
+    _month_of,
+    filter_values,
+    read_json_dict,
+)
+
+PROBLEM_SHARDS_DIR = "problem_shards"
+_MANIFEST_NAME = "manifest.json"
+_UNDATED_SHARD = "undated"
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedJsonRecordStore:
+    """Records split into one JSON file per creation month (``{YYYY-MM}.json``).
+
+    ``manifest.json`` maps every key to its shard, so point lookups and
+    month-scoped queries open a single shard, and a write rewrites only the shard
+    it touches (plus the manifest when keys are added or removed). The manifest
+    is derived data: the shards are the source of truth, and on open a missing or
+    stale manifest is rebuilt from them. On first use a legacy monolithic
+    ``problems.json`` is split into shards.
+    """
+
+    engine = "json"
+
+    def __init__(
+        self,
+        directory: Path,
+        columns: Mapping[str, ColumnExtractor] | None = None,
+        writer: GroupCommitWriter | None = None,
+        *,
+        legacy_path: Path | None = None,
+    ):
+        self.directory = directory
+        self.columns = dict(columns or {})
+        self._writer = writer
+        self._legacy_path = legacy_path
+        self._manifest = JsonRecordStore(directory / _MANIFEST_NAME, writer=writer)
+        self._shards: dict[str, JsonRecordStore] = {}
+        self._months: tuple[int, list[str]] | None = None
+
+    def ensure(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        shard_names = [path.stem for path in self.directory.glob("*.json") if path.name != _MANIFEST_NAME]
+        if shard_names:
+            # The group-commit writer flushes each shard and the manifest on its own,
+            # so a crash can leave either one ahead of the other.
+            keys = self._scan_shards(shard_names)
+            if not self._manifest.path.exists() or keys != self._manifest.load():
+                if self._manifest.path.exists():
+                    logger.warning("problem shard manifest is out of date, rebuilding it from %d shards", len(shard_names))
+                self._manifest.replace_all(keys)
+                self.flush()
+        elif self._manifest.path.exists():
+            return
+        elif self._legacy_path is not None and self._legacy_path.exists():
+            self.replace_all(read_json_dict(self._legacy_path))
+            self.flush()
+        else:
+            self._manifest.ensure()
+
+    def _scan_shards(self, shard_names: list[str]) -> dict[str, str]:
+        """Map every key to the shard holding it, dropping stale copies left by an interrupted move."""
+        keys: dict[str, str] = {}
+        for month in sorted(shard_names):
+            for key, raw in self._shard(month).load().items():
+                # A key in two shards was moved; the copy in the shard its month names is the new one.
+                if key not in keys or self._shard_name(raw) == month:
+                    keys[key] = month
+        for month in shard_names:
+            shard = self._shard(month)
+            stale = [key for key in shard.load() if keys[key] != month]
+            if stale:
+                shard.delete_many(stale)
+        return keys
+
+    def rebuild_manifest(self) -> int:
+        shard_names = [path.stem for path in self.directory.glob("*.json") if path.name != _MANIFEST_NAME]
+        keys = self._scan_shards(shard_names)
+        self._manifest.replace_all(keys)
+        return len(keys)
+
+    def _shard(self, month: str) -> JsonRecordStore:
+        shard = self._shards.get(month)
+        if shard is None:
+            shard = JsonRecordStore(self.directory / f"{month}.json", self.columns, self._writer)
+            self._shards[month] = shard
+        return shard
+
+    def _shard_name(self, raw: dict) -> str:
+        return _month_of(raw) or _UNDATED_SHARD
+
+    def shard_of(self, key: str) -> str | None:
+        return self._manifest.get(key)
+
+    def key_months(self) -> dict[str, str]:
+        return self._manifest.load()
+
+    def months(self) -> list[str]:
+        signature = self._manifest.signature()
+        if self._months is None or self._months[0] != signature:
+            self._months = (signature, sorted(set(self._manifest.load().values())))
+        return list(self._months[1])
+
+    def index_signature(self) -> int:
+        return self._manifest.signature()
+
+    def partition_signature(self, month: str) -> int:
+        return self._shard(month).signature()
+
+    def signature(self) -> tuple[int, ...]:
+        return (self.index_signature(), *(self.partition_signature(month) for month in self.months()))
+
+    def _group_keys(self, keys: Iterable[str]) -> dict[str, list[str]]:
+        grouped: dict[str, list[str]] = {}
+        for key in keys:
+            month = self.shard_of(key)
+            if month is not None:
+                grouped.setdefault(month, []).append(key)
+        return grouped
+
+    def load(self, **filters: Any) -> dict[str, dict]:
+        months = filter_values(filters.pop("month")) if "month" in filters else self.months()
+        result: dict[str, dict] = {}
+        for month in months:
+            result.update(self._shard(str(month)).load(**filters))
+        return result
+
+    def count(self, **filters: Any) -> int:
+        return len(self.load(**filters))
+
+    def get(self, key: str) -> dict | None:
+        month = self.shard_of(key)
+        if month is None:
+            return None
+        return self._shard(month).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, dict]:
+        result: dict[str, dict] = {}
+        for month, month_keys in self._group_keys(keys).items():
+            result.update(self._shard(month).get_many(month_keys))
+        return result
+
+    def put(self, key: str, raw: dict) -> None:
+        self.put_many({key: raw})
+
+    def put_many(self, items: Mapping[str, dict]) -> None:
+        by_shard: dict[str, dict[str, dict]] = {}
+        moved: dict[str, str] = {}
+        for key, raw in items.items():
+            if not isinstance(raw, dict):
+                continue
+            month = self._shard_name(raw)
+            by_shard.setdefault(month, {})[key] = raw
+            previous = self.shard_of(key)
+            if previous != month:
+                moved[key] = month
+                if previous is not None:
+                    self._shard(previous).delete(key)
+        for month, shard_items in by_shard.items():
+            self._shard(month).put_many(shard_items)
+        if moved:
+            self._manifest.put_many(moved)
+
+    def delete(self, key: str) -> bool:
+        return self.delete_many([key]) > 0
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        removed = 0
+        for month, month_keys in self._group_keys(keys).items():
+            removed += self._shard(month).delete_many(month_keys)
+            self._manifest.delete_many(month_keys)
+        return removed
+
+    def delete_where(self, **filters: Any) -> int:
+        return self.delete_many(list(self.load(**filters)))
+
+    def replace_all(self, items: Mapping[str, dict]) -> None:
+        by_shard: dict[str, dict[str, dict]] = {}
+        for key, raw in items.items():
+            if isinstance(raw, dict):
+                by_shard.setdefault(self._shard_name(raw), {})[key] = raw
+        for month in set(self.months()) - set(by_shard):
+            self._shard(month).replace_all({})
+        for month, shard_items in by_shard.items():
+            self._shard(month).replace_all(shard_items)
+        self._manifest.replace_all({key: month for month, shard_items in by_shard.items() for key in shard_items})
+
+    def flush(self) -> None:
+        # Shards before the manifest. Flushes through the group-commit writer do not
+        # keep this order; ``ensure`` repairs whatever a crash leaves behind.
+        for shard in list(self._shards.values()):
+            shard.flush()
+        self._manifest.flush()
+
+    def close(self) -> None:
+        self.flush()
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .record_store import (
+    PROBLEM_COLUMNS,
+    REPORT_COLUMNS,
+    TASK_COLUMNS,
+    ColumnExtractor,
+    JsonRecordStore,
+    filter_values,
+)
+from .sharded_store import PROBLEM_SHARDS_DIR, ShardedJsonRecordStore
+
+SQLITE_DB_NAME = "acm_helper.sqlite3"
+
+_SCHEMA_VERSION = 1
+_MAX_SQL_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL DEFAULT '',
+    problem_id TEXT NOT NULL DEFAULT '',
+    month TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    needs_solution INTEGER NOT NULL DEFAULT 0,
+    solution_status TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_problems_month ON problems(month);
+CREATE INDEX IF NOT EXISTS idx_problems_source ON problems(source);
+CREATE INDEX IF NOT EXISTS idx_problems_status ON problems(status);
+CREATE INDEX IF NOT EXISTS idx_problems_needs_solution ON problems(needs_solution, solution_status);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    key TEXT PRIMARY KEY,
+    problem_key TEXT NOT NULL DEFAULT '',
+    task_type TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_problem_key ON tasks(problem_key);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+
+CREATE TABLE IF NOT EXISTS reports (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
+
+
+class SqliteDatabase:
+    """A single WAL-mode SQLite file holding the problem, task and report tables."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def data_version(self) -> int:
+        # Only changes when another connection commits, i.e. when the file was
+        # modified outside this process.
+        rows = self.query("PRAGMA data_version")
+        return int(rows[0][0]) if rows else 0
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+
+
+class SqliteRecordStore:
+    """One row per record; filterable columns are denormalized out of the JSON payload."""
+
+    engine = "sqlite"
+
+    def __init__(self, db: SqliteDatabase, table: str, columns: Mapping[str, ColumnExtractor]):
+        self.db = db
+        self.table = table
+        self.columns = dict(columns)
+        names = ["key", *self.columns, "payload"]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        self._upsert_sql = (
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)}) "
+            f"ON CONFLICT(key) DO UPDATE SET {updates}"
+        )
+
+    def ensure(self) -> None:
+        return None
+
+    def signature(self) -> int:
+        return self.db.data_version()
+
+    def index_signature(self) -> int:
+        return self.db.data_version()
+
+    def partition_signature(self, month: str) -> int:
+        # data_version is database-wide; any external commit invalidates every partition.
+        return self.db.data_version()
+
+    def key_months(self) -> dict[str, str]:
+        if "month" not in self.columns:
+            raise ValueError(f"{self.table} has no month column")
+        return {key: month for key, month in self.db.query(f"SELECT key, month FROM {self.table}")}
+
+    def _where(self, filters: Mapping[str, Any]) -> tuple[str, list[Any]]:
+        if not filters:
+            return "", []
+        clauses: list[str] = []
+        params: list[Any] = []
+        for name, expected in filters.items():
+            if name not in self.columns:
+                raise ValueError(f"unknown filter column: {name}")
+            values = filter_values(expected)
+            clauses.append(f"{name} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _row(self, key: str, raw: dict) -> tuple:
+        return (
+            key,
+            *(extractor(raw) for extractor in self.columns.values()),
+            json.dumps(raw, ensure_ascii=False),
+        )
+
+    def load(self, **filters: Any) -> dict[str, dict]:
+        where, params = self._where(filters)
+        rows = self.db.query(f"SELECT key, payload FROM {self.table}{where} ORDER BY rowid", params)
+        result: dict[str, dict] = {}
+        for key, payload in rows:
+            try:
+                result[key] = json.loads(payload)
+            except json.JSONDecodeError:
+                continue
+        return result
+
+    def count(self, **filters: Any) -> int:
+        where, params = self._where(filters)
+        rows = self.db.query(f"SELECT COUNT(*) FROM {self.table}{where}", params)
+        return int(rows[0][0]) if rows else 0
+
+    def get(self, key: str) -> dict | None:
+        rows = self.db.query(f"SELECT payload FROM {self.table} WHERE key = ?", (key,))
+        if not rows:
+            return None
+        try:
+            return json.loads(rows[0][0])
+        except json.JSONDecodeError:
+            return None
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, dict]:
+        unique = list(dict.fromkeys(keys))
+        result: dict[str, dict] = {}
+        for start in range(0, len(unique), _MAX_SQL_PARAMS):
+            chunk = unique[start : start + _MAX_SQL_PARAMS]
+            rows = self.db.query(
+                f"SELECT key, payload FROM {self.table} WHERE key IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            for key, payload in rows:
+                try:
+                    result[key] = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+        return result
+
+    def put(self, key: str, raw: dict) -> None:
+        self.put_many({key: raw})
+
+    def put_many(self, items: Mapping[str, dict]) -> None:
+        rows = [self._row(key, raw) for key, raw in items.items() if isinstance(raw, dict)]
+        if not rows:
+            return
+        with self.db.transaction() as conn:
+            conn.executemany(self._upsert_sql, rows)
+
+    def delete(self, key: str) -> bool:
+        return self.delete_many([key]) > 0
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        params = [(key,) for key in keys]
+        if not params:
+            return 0
+        with self.db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", params)
+            return conn.total_changes - before
+
+    def delete_where(self, **filters: Any) -> int:
+        where, params = self._where(filters)
+        with self.db.transaction() as conn:
+            return conn.execute(f"DELETE FROM {self.table}{where}", params).rowcount
+
+    def replace_all(self, items: Mapping[str, dict]) -> None:
+        rows = [self._row(key, raw) for key, raw in items.items() if isinstance(raw, dict)]
+        with self.db.transaction() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.executemany(self._upsert_sql, rows)
+
+    def close(self) -> None:
+        return None
+
+
+def open_sqlite_stores(db: SqliteDatabase) -> tuple[SqliteRecordStore, SqliteRecordStore, SqliteRecordStore]:
+    return (
+        SqliteRecordStore(db, "problems", PROBLEM_COLUMNS),
+        SqliteRecordStore(db, "tasks", TASK_COLUMNS),
+        SqliteRecordStore(db, "reports", REPORT_COLUMNS),
+    )
+
+
+def migrate_json_to_sqlite(base_dir: Path, db: SqliteDatabase | None = None) -> dict[str, int]:
+    """Copy the problem shards, ``tasks.json`` and ``reports.json`` into the SQLite database.
+
+    Existing rows in the database are replaced. The JSON files are left in place
+    as a backup, so the migration can be re-run or reverted by switching engines.
+    """
+    base = Path(base_dir)
+    owned = db is None
+    database = db or SqliteDatabase(base / SQLITE_DB_NAME)
+    try:
+        problems, tasks, reports = open_sqlite_stores(database)
+        counts: dict[str, int] = {}
+        for name, store, columns in (
+            ("problems", problems, PROBLEM_COLUMNS),
+            ("tasks", tasks, TASK_COLUMNS),
+            ("reports", reports, REPORT_COLUMNS),
+        ):
+            if name == "problems":
+                source = ShardedJsonRecordStore(
+                    base / PROBLEM_SHARDS_DIR,
+                    columns,
+                    legacy_path=base / "problems.json",
+                )
+                source.ensure()
+            else:
+                source = JsonRecordStore(base / f"{name}.json", columns)
+            data = source.load()
+            store.replace_all(data)
+            counts[name] = store.count()
+        return counts
+    finally:
+        if owned:
+            database.close()
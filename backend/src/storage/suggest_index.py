@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import bisect
+import re
+from collections.abc import Callable, Iterable
+
+from ..models.problem import ProblemRecord
+from .search_index import CJK_RANGES
+
+# Later word starts inside a title (after the first character); every CJK character starts a word.
+_WORD_START_RE = re.compile(f"(?<=[\\W_])[^\\W_]|(?<=.)[{CJK_RANGES}]")
+_TITLE_FIELDS = ("title", "translated_title")
+# Batches smaller than 1/this of the index are inserted in place rather than re-sorted.
+_BULK_LOAD_RATIO = 32
+
+
+def normalize_prefix(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+class ProblemSuggestIndex:
+    """Sorted prefix index over ``source:id``, id and (translated) titles for search-as-you-type.
+
+    Entries live in two sorted lists of ``(text, key, field)``: whole values, then
+    titles from each later word start, so ``short`` completes "Single Source
+    Shortest Path" after any title that starts with it. A lookup is a bisect plus a
+    scan over the matches it returns; inserts and deletes are a bisect and a list
+    shift each. Not thread-safe: the owning ``ProblemCache`` is used under
+    ``FileManager._lock``.
+    """
+
+    def __init__(self) -> None:
+        self._tiers: tuple[list[tuple[str, str, str]], list[tuple[str, str, str]]] = ([], [])
+        self._entries_of: dict[str, list[tuple[int, tuple[str, str, str]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries_of)
+
+    @staticmethod
+    def _entries(record: ProblemRecord) -> list[tuple[int, tuple[str, str, str]]]:
+        key = record.key()
+        entries = [
+            (0, (normalize_prefix(key), key, "id")),
+            (0, (normalize_prefix(record.id), key, "id")),
+        ]
+        for field in _TITLE_FIELDS:
+            text = normalize_prefix(getattr(record, field))
+            if not text:
+                continue
+            entries.append((0, (text, key, field)))
+            entries.extend((1, (text[match.start() :], key, field)) for match in _WORD_START_RE.finditer(text))
+        return list(dict.fromkeys(entries))
+
+    def add_many(self, records: Iterable[ProblemRecord]) -> None:
+        """Bulk load; appends and re-sorts once instead of inserting entry by entry."""
+        records = list(records)
+        if len(records) * _BULK_LOAD_RATIO < len(self._entries_of):
+            for record in records:
+                self.update(record)
+            return
+        for record in records:
+            self.remove(record.key())
+        for record in records:
+            entries = self._entries(record)
+            self._entries_of[record.key()] = entries
+            for tier, entry in entries:
+                self._tiers[tier].append(entry)
+        for entries in self._tiers:
+            entries.sort()
+
+    def update(self, record: ProblemRecord) -> None:
+        key = record.key()
+        entries = self._entries(record)
+        if self._entries_of.get(key) == entries:
+            return
+        self.remove(key)
+        self._entries_of[key] = entries
+        for tier, entry in entries:
+            bisect.insort(self._tiers[tier], entry)
+
+    def remove(self, key: str) -> None:
+        for tier, entry in self._entries_of.pop(key, ()):
+            entries = self._tiers[tier]
+            idx = bisect.bisect_left(entries, entry)
+            if idx < len(entries) and entries[idx] == entry:
+                del entries[idx]
+
+    def suggest(
+        self,
+        prefix: str,
+        limit: int,
+        accept: Callable[[str], bool] | None = None,
+    ) -> list[tuple[str, str]]:
+        """Up to ``limit`` distinct ``(key, matched field)`` pairs, whole-value matches first, each tier in text order."""
+        prefix = normalize_prefix(prefix)
+        if not prefix or limit <= 0:
+            return []
+        found: dict[str, str] = {}
+        for entries in self._tiers:
+            idx = bisect.bisect_left(entries, (prefix,))
+            while idx < len(entries):
+                text, key, field = entries[idx]
+                if not text.startswith(prefix):
+                    break
+                idx += 1
+                if key in found or (accept is not None and not accept(key)):
+                    continue
+                found[key] = field
+                if len(found) >= limit:
+                    return list(found.items())
+        return list(found.items())
+
+    def stats(self) -> dict[str, int]:
+        return {"documents": len(self._entries_of), "entries": sum(len(entries) for entries in self._tiers)}
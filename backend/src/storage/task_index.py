@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+from pydantic import ValidationError
+
+from ..models.settings import TaskRetentionPolicy
+from ..models.task import SolutionTaskRecord, TaskStatus, TaskType
+from .record_store import JsonRecordStore
+from .sqlite_store import SqliteRecordStore
+
+ACTIVE_TASK_STATUSES = frozenset({TaskStatus.queued, TaskStatus.running})
+# Finished tasks past their retention go to ``<base>/task_archive/YYYY-MM.jsonl.gz``.
+TASK_ARCHIVE_DIR = "task_archive"
+
+
+class TaskIndex:
+    """Validated task records mirrored from the task store, with the views the API polls.
+
+    Keeps queued/running tasks in their own map and the newest task ids in a
+    bounded ring, so active-task and recent-task queries cost O(k) instead of a
+    validate-and-sort of the whole store. Reloads when the store's signature
+    changes behind our back. Returned records are shared and must not be mutated.
+    Callers must hold ``FileManager._lock``.
+    """
+
+    RECENT_CAPACITY = 256
+
+    def __init__(self, store: JsonRecordStore | SqliteRecordStore):
+        self._store = store
+        self._signature: Any = None
+        self._records: dict[str, SolutionTaskRecord] = {}
+        self._active: dict[str, SolutionTaskRecord] = {}
+        self._recent: deque[str] = deque(maxlen=self.RECENT_CAPACITY)
+
+    def _sync(self) -> None:
+        signature = self._store.signature()
+        if signature == self._signature:
+            return
+        records: dict[str, SolutionTaskRecord] = {}
+        for task_id, raw in self._store.load().items():
+            try:
+                records[task_id] = SolutionTaskRecord.model_validate(raw)
+            except ValidationError:
+                continue
+        self._records = records
+        self._active = {task_id: record for task_id, record in records.items() if record.status in ACTIVE_TASK_STATUSES}
+        newest = sorted(records.values(), key=lambda record: record.created_at)[-self.RECENT_CAPACITY :]
+        self._recent = deque((record.task_id for record in newest), maxlen=self.RECENT_CAPACITY)
+        self._signature = signature
+
+    def get(self, task_id: str) -> SolutionTaskRecord | None:
+        self._sync()
+        return self._records.get(task_id)
+
+    def put(self, record: SolutionTaskRecord) -> None:
+        self._sync()
+        self._store.put(record.task_id, record.model_dump(mode="json"))
+        is_new = record.task_id not in self._records
+        self._records[record.task_id] = record
+        if record.status in ACTIVE_TASK_STATUSES:
+            self._active[record.task_id] = record
+        else:
+            self._active.pop(record.task_id, None)
+        if is_new:
+            newest = self._records.get(self._recent[-1]) if self._recent else None
+            if newest is None or record.created_at >= newest.created_at:
+                self._recent.append(record.task_id)
+            else:
+                # Out of order (imported or clock skew): rebuild the ring on next read.
+                self._signature = None
+                return
+        self._signature = self._store.signature()
+
+    def delete_many(self, task_ids: list[str]) -> int:
+        self._sync()
+        removed = self._store.delete_many(task_ids)
+        for task_id in task_ids:
+            self._records.pop(task_id, None)
+            self._active.pop(task_id, None)
+        self._signature = self._store.signature()
+        return removed
+
+    def delete_for_problem(self, problem_key: str) -> int:
+        self._sync()
+        return self.delete_many([task_id for task_id, record in self._records.items() if record.problem_key == problem_key])
+
+    def recent(self, limit: int | None = None) -> list[SolutionTaskRecord]:
+        """Tasks newest first; ``limit`` up to ``RECENT_CAPACITY`` is served from the ring."""
+        self._sync()
+        if limit is not None:
+            found: list[SolutionTaskRecord] = []
+            for task_id in reversed(self._recent):
+                record = self._records.get(task_id)
+                if record is not None:
+                    found.append(record)
+                    if len(found) >= limit:
+                        return found
+            if len(found) >= len(self._records):
+                return found
+        ordered = sorted(self._records.values(), key=lambda record: record.created_at, reverse=True)
+        return ordered if limit is None else ordered[:limit]
+
+    def active(self) -> list[SolutionTaskRecord]:
+        self._sync()
+        return sorted(self._active.values(), key=lambda record: record.created_at)
+
+    def has_active(self) -> bool:
+        self._sync()
+        return bool(self._active)
+
+    def expired(
+        self,
+        default: TaskRetentionPolicy,
+        by_type: dict[TaskType, TaskRetentionPolicy],
+        now: datetime,
+    ) -> list[SolutionTaskRecord]:
+        """Finished tasks outside their type's retention policy, oldest first.
+
+        A finished task is kept while it is among the newest ``keep_last`` finished
+        tasks of its type or younger than ``keep_days``; queued and running tasks
+        always stay.
+        """
+        self._sync()
+        by_kind: dict[TaskType, list[SolutionTaskRecord]] = {}
+        for record in self._records.values():
+            if record.status not in ACTIVE_TASK_STATUSES:
+                by_kind.setdefault(record.task_type, []).append(record)
+        expired: list[SolutionTaskRecord] = []
+        for task_type, records in by_kind.items():
+            policy = by_type.get(task_type, default)
+            cutoff = now - timedelta(days=policy.keep_days)
+            records.sort(key=lambda record: record.created_at, reverse=True)
+            expired.extend(record for record in records[policy.keep_last :] if record.created_at < cutoff)
+        expired.sort(key=lambda record: record.created_at)
+        return expired
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._records), "active": len(self._active), "recent": len(self._recent)}
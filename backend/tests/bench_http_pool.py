@@ -0,0 +1,77 @@
+"""Compare a fresh httpx client per request with the pooled per-profile client.
+
+Runs against the local stub provider from ``test_http_pool``; ``--handshake-ms``
+simulates the connection setup cost of a remote provider.
+
+    python tests/bench_http_pool.py --requests 200 --concurrency 8 --handshake-ms 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.services.ai_client import AIClient
+from test_http_pool import _StubProvider, _settings
+
+
+class _ClientPerRequest(AIClient):
+    """The previous behaviour: open and close a client around every request."""
+
+    async def _generate_via_openai_compatible(
+        self, prompt, profile, images_base64=None, *, timing=None, on_event=None, prefix=""
+    ) -> str:
+        url = self._resolve_openai_compatible_url(profile.api_base)
+        payload = {"model": profile.model, "messages": [{"role": "user", "content": prompt}], "stream": True}
+        async with httpx.AsyncClient(timeout=self._build_timeout(profile.timeout_seconds)) as client:
+            async with client.stream("POST", url, json=payload) as resp:
+                await self._raise_for_status_with_body(resp, "openai-compatible")
+                return await self._collect_openai_stream_text(resp, timing, on_event)
+
+
+async def _measure(client: AIClient, requests: int, concurrency: int, handshake: float) -> tuple[float, int]:
+    stub = _StubProvider(handshake_delay=handshake)
+    async with stub as api_base:
+        settings = _settings(api_base, max_concurrency=concurrency)
+        client.scheduler.default_concurrency = concurrency
+        pending = iter(range(requests))
+
+        async def _worker() -> None:
+            for _ in pending:
+                await client.generate_text("hi", settings)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await client.aclose()
+    return elapsed, stub.connections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    handshake = args.handshake_ms / 1000
+    for name, client in (("client per request", _ClientPerRequest()), ("pooled client", AIClient())):
+        elapsed, connections = asyncio.run(_measure(client, args.requests, args.concurrency, handshake))
+        print(
+            f"{name:>18}: {args.requests} requests in {elapsed:.2f}s "
+            f"({args.requests / elapsed:.0f} req/s, {elapsed / args.requests * 1000:.1f} ms/req), "
+            f"{connections} connections"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import sys
 import unittest
 from pathlib import Path
 
+import httpx
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
@@ -85,6 +88,23 @@ class AIClientStreamingTests(unittest.TestCase):
 
         self.assertIn("bad request", str(ctx.exception))
 
+    def test_openai_stream_reports_each_delta(self) -> None:
+        body = (
+            'data: {"choices":[{"delta":{"content":"Hel"}}]}\n\n'
+            'data: {"choices":[{"delta":{"content":"lo"}}]}\n\n'
+            "data: [DONE]\n\n"
+        )
+        events: list[tuple[str, str]] = []
+
+        content = asyncio.run(
+            self.client._collect_openai_stream_text(
+                httpx.Response(200, content=body.encode()), on_event=lambda event, data: events.append((event, data))
+            )
+        )
+
+        self.assertEqual(content, "Hello")
+        self.assertEqual(events, [("delta", "Hel"), ("delta", "lo")])
+
     def test_build_timeout_uses_idle_read_window(self) -> None:
         profile = AIProfile(timeout_seconds=600)
 
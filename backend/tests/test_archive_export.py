@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemStatus
+from src.services.archive_export import EXPORT_CHUNK_BYTES, iter_export_ndjson, iter_export_zip
+from src.storage.file_manager import FileManager, current_month
+
+
+class ArchiveExportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="Alpha"),
+                ProblemInput(source="codeforces", id="2B", title="Beta"),
+            ]
+        )
+        self.image = self.base / current_month() / "solution_images" / "codeforces_1A" / "deadbeef.png"
+        self.image.parent.mkdir(parents=True)
+        self.image.write_bytes(os.urandom(3 * EXPORT_CHUNK_BYTES + 17))
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_ndjson_is_a_snapshot_of_records(self) -> None:
+        records = io.BytesIO()
+        meta, _, _ = self.fm.write_export_snapshot(records)
+        self.fm.patch_problem_status("codeforces", "1A", ProblemStatus.solved)
+
+        lines = [json.loads(line) for line in b"".join(iter_export_ndjson(records)).splitlines()]
+
+        self.assertEqual(lines[0]["kind"], "meta")
+        self.assertEqual(meta["counts"]["problems"], 2)
+        problems = {entry["record"]["id"]: entry["record"] for entry in lines if entry["kind"] == "problem"}
+        self.assertEqual(sorted(problems), ["1A", "2B"])
+        self.assertNotEqual(problems["1A"]["status"], ProblemStatus.solved.value)
+
+    def test_zip_contains_records_notes_and_images_in_bounded_chunks(self) -> None:
+        records, notes_blob = io.BytesIO(), io.BytesIO()
+        _, notes, images = self.fm.write_export_snapshot(records, notes_blob)
+
+        chunks = list(iter_export_zip(self.fm, records, notes_blob, notes, images))
+
+        self.assertLess(max(len(chunk) for chunk in chunks), 2 * EXPORT_CHUNK_BYTES)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        self.assertIsNone(archive.testzip())
+        month = current_month()
+        self.assertEqual(
+            sorted(archive.namelist()),
+            [
+                f"{month}/problems/Alpha.md",
+                f"{month}/problems/Beta.md",
+                f"{month}/solution_images/codeforces_1A/deadbeef.png",
+                "records.ndjson",
+            ],
+        )
+        self.assertEqual(archive.read(f"{month}/solution_images/codeforces_1A/deadbeef.png"), self.image.read_bytes())
+
+    def test_zip_notes_match_the_records_snapshot(self) -> None:
+        records, notes_blob = io.BytesIO(), io.BytesIO()
+        _, notes, images = self.fm.write_export_snapshot(records, notes_blob)
+        self.fm.patch_problem_status("codeforces", "1A", ProblemStatus.solved)
+        self.fm.flush()
+        note = self.base / current_month() / "problems" / "Alpha.md"
+        note.write_text("rewritten after the snapshot", encoding="utf-8")
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_export_zip(self.fm, records, notes_blob, notes, images))))
+
+        exported = archive.read(f"{current_month()}/problems/Alpha.md").decode("utf-8")
+        self.assertNotIn("rewritten after the snapshot", exported)
+        self.assertNotIn(ProblemStatus.solved.value, exported)
+        problems = [json.loads(line) for line in archive.read("records.ndjson").splitlines()]
+        alpha = next(entry["record"] for entry in problems if entry["kind"] == "problem" and entry["record"]["id"] == "1A")
+        self.assertNotEqual(alpha["status"], ProblemStatus.solved.value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemStatus
+from src.storage.file_manager import FileManager, current_month
+from src.storage.markdown_index import MarkdownIndex
+
+
+class BulkImportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+        self.problem_dir = self.base / current_month() / "problems"
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_large_batch_refreshes_index_once_and_writes_every_note(self) -> None:
+        items = [ProblemInput(source="nowcoder", id=str(idx), title=f"Problem {idx}") for idx in range(40)]
+
+        with mock.patch.object(MarkdownIndex, "_current_dirs", autospec=True, wraps=MarkdownIndex._current_dirs) as scan:
+            imported, updated, records, timings = self.fm.bulk_upsert_problems(items)
+
+        self.assertEqual((imported, updated, len(records)), (40, 0, 40))
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(len(list(self.problem_dir.glob("*.md"))), 40)
+        self.assertGreaterEqual(timings.total_ms, timings.markdown_ms)
+        self.assertEqual(self.fm._iter_problem_markdown_paths("nowcoder", "7"), [self.problem_dir / "Problem_7.md"])
+
+    def test_same_title_in_one_batch_gets_distinct_notes(self) -> None:
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="Theatre Square"),
+                ProblemInput(source="luogu", id="CF1A", title="Theatre Square"),
+            ]
+        )
+
+        names = sorted(path.name for path in self.problem_dir.glob("*.md"))
+        self.assertEqual(names, ["Theatre_Square.md", "Theatre_Square__luogu_CF1A.md"])
+
+    def test_duplicate_key_in_batch_merges_onto_earlier_entry(self) -> None:
+        imported, updated, records = self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="A", my_ac_code="int main(){}"),
+                ProblemInput(source="codeforces", id="1A", title="A", status=ProblemStatus.solved),
+            ]
+        )
+
+        self.assertEqual((imported, updated), (1, 1))
+        stored = self.fm.get_problem("codeforces", "1A")
+        self.assertEqual(stored.my_ac_code, "int main(){}")
+        self.assertEqual(stored.status, ProblemStatus.solved)
+        self.assertEqual([record.key() for record in records], ["codeforces:1A", "codeforces:1A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.settings import AIProfile, AISettings
+from src.services.ai_client import AIClient
+
+
+class _StubProvider:
+    """Minimal keep-alive HTTP/1.1 server answering every request with a one-chunk OpenAI SSE stream.
+
+    ``handshake_delay`` stalls each new connection before its first response, standing
+    in for the TCP and TLS round trips of a remote provider.
+    """
+
+    def __init__(self, handshake_delay: float = 0.0, hold_open: bool = False) -> None:
+        self.handshake_delay = handshake_delay
+        self.hold_open = hold_open
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def __aexit__(self, *exc) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                self.requests += 1
+                chunk = json.dumps({"choices": [{"delta": {"content": "ok"}}]})
+                body = f"data: {chunk}\n\ndata: [DONE]\n\n".encode()
+                if self.hold_open:
+                    # Chunked body whose terminating chunk never comes: the socket stays open after [DONE].
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\ntransfer-encoding: chunked\r\n\r\n"
+                        + f"{len(body):x}\r\n".encode()
+                        + body
+                        + b"\r\n"
+                    )
+                    await writer.drain()
+                    await reader.read()
+                    return
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n"
+                    + f"content-length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _settings(api_base: str, **overrides) -> AISettings:
+    profile = AIProfile(id="stub", api_base=api_base, api_key="k", **overrides)
+    return AISettings(active_profile_id="stub", profiles=[profile])
+
+
+class HTTPClientPoolTests(unittest.TestCase):
+    def test_requests_reuse_one_connection(self) -> None:
+        stub = _StubProvider()
+
+        async def _run() -> list[str]:
+            client = AIClient()
+            async with stub as api_base:
+                settings = _settings(api_base)
+                results = [await client.generate_text("hi", settings) for _ in range(5)]
+                await client.aclose()
+            return results
+
+        self.assertEqual(asyncio.run(_run()), ["ok"] * 5)
+        self.assertEqual((stub.requests, stub.connections), (5, 1))
+
+    def test_profile_change_rebuilds_the_client(self) -> None:
+        stub = _StubProvider()
+
+        async def _run() -> bool:
+            client = AIClient()
+            async with stub as api_base:
+                await client.generate_text("hi", _settings(api_base))
+                async with client.http_pool.client(_settings(api_base).profiles[0]) as before:
+                    pass
+                await client.generate_text("hi", _settings(api_base, pool_max_connections=4))
+                await client.generate_text("hi", _settings(api_base, pool_max_connections=4))
+                await client.aclose()
+            return before.is_closed
+
+        self.assertTrue(asyncio.run(_run()))
+        self.assertEqual((stub.requests, stub.connections), (3, 2))
+
+    def test_client_in_use_is_closed_only_after_its_request(self) -> None:
+        async def _run() -> tuple[bool, bool]:
+            client = AIClient()
+            old = _settings("http://127.0.0.1:1").profiles[0]
+            async with client.http_pool.client(old) as in_use:
+                async with client.http_pool.client(old.model_copy(update={"http2": True})):
+                    pass
+                closed_while_streaming = in_use.is_closed
+            await client.aclose()
+            return closed_while_streaming, in_use.is_closed
+
+        self.assertEqual(asyncio.run(_run()), (False, True))
+
+    def test_stream_held_open_after_done_does_not_delay_the_answer(self) -> None:
+        stub = _StubProvider(hold_open=True)
+
+        async def _run() -> tuple[list[str], float]:
+            client = AIClient()
+            async with stub as api_base:
+                started = time.perf_counter()
+                results = [await client.generate_text("hi", _settings(api_base)) for _ in range(3)]
+                elapsed = time.perf_counter() - started
+                await client.aclose()
+            return results, elapsed
+
+        results, elapsed = asyncio.run(_run())
+
+        self.assertEqual(results, ["ok"] * 3)
+        self.assertLess(elapsed, 0.5)
+        # Each unfinished response gives up its connection instead of returning it to the pool.
+        self.assertEqual((stub.requests, stub.connections), (3, 3))
+
+    def test_http2_without_h2_falls_back_to_http1(self) -> None:
+        stub = _StubProvider()
+
+        async def _run() -> str:
+            client = AIClient()
+            async with stub as api_base:
+                result = await client.generate_text("hi", _settings(api_base, http2=True))
+                await client.aclose()
+            return result
+
+        self.assertEqual(asyncio.run(_run()), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.storage import record_store
+from src.storage.file_manager import FileManager
+from src.storage.record_store import GroupCommitWriter, JsonRecordStore, read_json_dict, write_json_dict
+
+
+class AtomicJsonWriteTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmpdir.name)
+        self.path = self.dir / "problems.json"
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_failed_write_keeps_previous_file_and_cleans_temp(self) -> None:
+        write_json_dict(self.path, {"a": {"title": "old"}})
+
+        with mock.patch.object(record_store.os, "replace", side_effect=OSError("disk gone")):
+            with self.assertRaises(OSError):
+                write_json_dict(self.path, {"a": {"title": "new"}})
+
+        self.assertEqual(read_json_dict(self.path), {"a": {"title": "old"}})
+        self.assertEqual([p.name for p in self.dir.iterdir()], ["problems.json"])
+
+    def test_group_commit_merges_mutations_into_one_write(self) -> None:
+        writer = GroupCommitWriter(window=60)
+        store = JsonRecordStore(self.path, writer=writer)
+        store.ensure()
+
+        with mock.patch.object(record_store, "_atomic_write_bytes", wraps=record_store._atomic_write_bytes) as write:
+            for idx in range(20):
+                store.put(f"k{idx}", {"n": idx})
+            store.delete("k0")
+            self.assertEqual(store.count(), 19)
+            self.assertEqual(read_json_dict(self.path), {})
+
+            writer.flush_all()
+
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(json.loads(self.path.read_text(encoding="utf-8"))), 19)
+        writer.close()
+
+    def test_background_flush_writes_pending_mutations(self) -> None:
+        writer = GroupCommitWriter(window=0.01)
+        store = JsonRecordStore(self.path, writer=writer)
+        store.put("a", {"n": 1})
+
+        writer.close()
+
+        self.assertEqual(read_json_dict(self.path), {"a": {"n": 1}})
+
+
+class FileManagerDurabilityTests(unittest.TestCase):
+    def test_close_flushes_buffered_writes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "data"
+            fm = FileManager(base)
+            fm.upsert_problems([ProblemInput(source="codeforces", id="1A", title="A")])
+            fm.close()
+
+            self.assertIn("codeforces:1A", read_json_dict(fm.problem_shards_dir / "manifest.json"))
+            reopened = FileManager(base)
+            self.assertIsNotNone(reopened.get_problem("codeforces", "1A"))
+            reopened.close()
+
+    def test_corrupt_task_store_is_moved_aside_not_overwritten(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "data"
+            base.mkdir()
+            damaged = '{"t1": {"task_id": "t1", "status": "succ'
+            (base / "tasks.json").write_text(damaged, encoding="utf-8")
+
+            with self.assertLogs(record_store.logger, "ERROR"):
+                fm = FileManager(base)
+                fm.upsert_problems([ProblemInput(source="codeforces", id="1A", title="A")])
+                task = fm.create_task("codeforces:1A")
+            fm.close()
+
+            quarantined = list(base.glob("tasks.json.corrupt-*"))
+            self.assertEqual(len(quarantined), 1)
+            self.assertEqual(quarantined[0].read_text(encoding="utf-8"), damaged)
+            self.assertEqual(list(read_json_dict(base / "tasks.json")), [task.task_id])
+
+    def test_non_object_payload_is_moved_aside(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "reports.json"
+            path.write_text("[1, 2]", encoding="utf-8")
+
+            with self.assertLogs(record_store.logger, "ERROR"):
+                self.assertEqual(read_json_dict(path), {})
+
+            self.assertFalse(path.exists())
+            self.assertEqual([p.read_text(encoding="utf-8") for p in Path(tmp).glob("reports.json.corrupt-*")], ["[1, 2]"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.storage.file_manager import FileManager
+from src.storage.markdown_index import MARKDOWN_INDEX_NAME, MarkdownIndex
+
+
+class MarkdownIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+        _, _, records = self.fm.upsert_problems([ProblemInput(source="codeforces", id="1A", title="Alpha")])
+        self.record = records[0]
+        self.month = self.record.created_at.strftime("%Y-%m")
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_lookups_do_not_read_unchanged_notes(self) -> None:
+        self.fm.save_solution_file(self.record, "first solution")
+
+        with mock.patch.object(MarkdownIndex, "_read_identity", side_effect=AssertionError("unexpected read")):
+            self.assertIsNotNone(self.fm.get_problem_markdown("codeforces", "1A"))
+            self.assertIn("first solution", self.fm.read_solution_file("codeforces", "1A") or "")
+
+    def test_externally_added_note_is_found(self) -> None:
+        solution_dir = self.base / self.month / "solutions"
+        solution_dir.mkdir(parents=True, exist_ok=True)
+        (solution_dir / "Renamed In Obsidian.md").write_text(
+            '<!-- ACM_HELPER_SOLUTION source="codeforces" id="1A" -->\nexternal body\n',
+            encoding="utf-8",
+        )
+
+        self.assertIn("external body", self.fm.read_solution_file("codeforces", "1A") or "")
+
+    def test_externally_removed_note_is_forgotten(self) -> None:
+        path = Path(self.fm.save_solution_file(self.record, "to be removed"))
+        path.unlink()
+
+        self.assertIsNone(self.fm.read_solution_file("codeforces", "1A"))
+
+    def test_index_is_persisted_and_reused_after_restart(self) -> None:
+        self.fm.save_solution_file(self.record, "persisted")
+        self.fm.close()
+        self.assertTrue((self.base / MARKDOWN_INDEX_NAME).exists())
+
+        with mock.patch.object(MarkdownIndex, "_read_identity", side_effect=AssertionError("unexpected read")):
+            self.fm = FileManager(self.base)
+            self.assertIn("persisted", self.fm.read_solution_file("codeforces", "1A") or "")
+
+    def test_rebuild_reports_indexed_files(self) -> None:
+        self.fm.save_solution_file(self.record, "one")
+        self.fm.save_solution_file(self.record, "two")
+        (self.base / MARKDOWN_INDEX_NAME).write_text(json.dumps({"version": 0}), encoding="utf-8")
+
+        result = self.fm.rebuild_markdown_index()
+
+        self.assertEqual(result["files"], 3)
+        self.assertEqual(len(self.fm._iter_solution_markdown_paths("codeforces", "1A")), 2)
+
+    def test_delete_problem_clears_index_entries(self) -> None:
+        self.fm.save_solution_file(self.record, "gone")
+
+        result = self.fm.delete_problem("codeforces", "1A")
+
+        self.assertEqual(result.removed_markdown_files, 1)
+        self.assertEqual(result.removed_solution_files, 1)
+        self.assertEqual(self.fm.get_cache_stats()["markdown_index"]["files"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, SolutionStatus
+from src.storage.file_manager import FileManager, current_month
+from src.storage.markdown_writer import MarkdownRenderQueue
+
+
+class MarkdownRenderQueueTests(unittest.TestCase):
+    def test_repeated_schedules_render_once(self) -> None:
+        rendered: list[str] = []
+        queue = MarkdownRenderQueue(rendered.append, window=60)
+
+        for _ in range(5):
+            queue.schedule("codeforces:1A")
+        queue.schedule("codeforces:2B")
+        queue.cancel("codeforces:2B")
+        queue.close()
+
+        self.assertEqual(rendered, ["codeforces:1A"])
+
+    def test_worker_renders_after_window(self) -> None:
+        done = threading.Event()
+        queue = MarkdownRenderQueue(lambda key: done.set(), window=0.01)
+
+        queue.schedule("codeforces:1A")
+
+        self.assertTrue(done.wait(timeout=2))
+        queue.close()
+        self.assertEqual(queue.stats()["rendered"], 1)
+
+
+class FileManagerMarkdownRenderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+        self.fm._markdown_renderer.window = 60
+        self.fm.upsert_problems([ProblemInput(source="codeforces", id="1A", title="Alpha")])
+        self.md_path = self.base / current_month() / "problems" / "Alpha.md"
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_state_transitions_are_rendered_in_background(self) -> None:
+        before = self.md_path.read_text(encoding="utf-8")
+
+        for status in (SolutionStatus.queued, SolutionStatus.running, SolutionStatus.done):
+            self.fm.set_problem_solution_state("codeforces:1A", status)
+
+        self.assertEqual(self.md_path.read_text(encoding="utf-8"), before)
+        self.assertEqual(self.fm.get_cache_stats()["markdown_renders"]["pending"], 1)
+
+        self.fm.flush()
+
+        self.assertIn("已完成", self.md_path.read_text(encoding="utf-8"))
+        self.assertEqual(self.fm.get_cache_stats()["markdown_renders"]["rendered"], 1)
+
+    def test_reading_markdown_flushes_pending_render(self) -> None:
+        self.fm.set_problem_solution_state("codeforces:1A", SolutionStatus.running)
+
+        content = self.fm.get_problem_markdown("codeforces", "1A") or ""
+
+        self.assertIn("进行中", content)
+
+    def test_unchanged_render_skips_disk_write(self) -> None:
+        record = self.fm.get_problem("codeforces", "1A")
+
+        with mock.patch.object(Path, "write_text", autospec=True, side_effect=Path.write_text) as write:
+            self.fm._save_problem_markdown(record)
+
+        self.assertEqual(write.call_count, 0)
+
+    def test_delete_cancels_pending_render(self) -> None:
+        self.fm.set_problem_solution_state("codeforces:1A", SolutionStatus.queued)
+
+        self.fm.delete_problem("codeforces", "1A")
+        self.fm.flush()
+
+        self.assertFalse(self.md_path.exists())
+
+    def test_close_flushes_pending_renders(self) -> None:
+        self.fm.mark_problem_translation_failed("codeforces", "1A", "boom")
+
+        self.fm.close()
+
+        self.assertIn("boom", self.md_path.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
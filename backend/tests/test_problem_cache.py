@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import PROBLEM_SUMMARY_FIELDS, ProblemInput, ProblemStatus, ProblemView, resolve_problem_fields
+from src.models.settings import StorageEngine
+from src.storage import file_manager
+from src.storage.file_manager import FileManager
+from src.storage.sqlite_store import SqliteDatabase, open_sqlite_stores
+
+
+class ProblemCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="A"),
+                ProblemInput(source="codeforces", id="2B", title="B"),
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_repeated_reads_are_served_from_memory(self) -> None:
+        before = self.fm.get_cache_stats()["problems"]
+
+        for _ in range(5):
+            self.fm.get_problem_by_key("codeforces:1A")
+            self.fm.list_problems()
+            self.fm.list_pending_problems()
+
+        after = self.fm.get_cache_stats()["problems"]
+        self.assertEqual(after["misses"], before["misses"])
+        self.assertEqual(after["hits"] - before["hits"], 15)
+        self.assertEqual(after["entries"], 2)
+
+    def test_counters_track_reads_not_partition_checks(self) -> None:
+        for month in range(1, 7):
+            with mock.patch.object(file_manager, "now_utc", return_value=datetime(2025, month, 1, tzinfo=UTC)):
+                self.fm.upsert_problems([ProblemInput(source="luogu", id=f"P{month}", title="Old")])
+        self.fm.list_problems()
+        before = self.fm.get_cache_stats()["problems"]
+
+        for idx in range(3):
+            self.fm.patch_problem_status("codeforces", "1A", ProblemStatus.solved if idx % 2 else ProblemStatus.unsolved)
+        self.fm.get_problem_by_key("codeforces:2B")
+        self.fm.list_problems()
+
+        after = self.fm.get_cache_stats()["problems"]
+        self.assertEqual(after["partitions"], 7)
+        self.assertEqual((after["hits"] - before["hits"], after["misses"] - before["misses"]), (5, 0))
+
+    def test_writes_go_through_the_cache(self) -> None:
+        misses = self.fm.get_cache_stats()["problems"]["misses"]
+
+        self.fm.patch_problem_status("codeforces", "1A", ProblemStatus.solved)
+
+        record = self.fm.get_problem("codeforces", "1A")
+        self.assertEqual(record.status, ProblemStatus.solved)
+        self.assertEqual(self.fm.get_cache_stats()["problems"]["misses"], misses)
+        self.assertEqual(self.fm.list_problems()[0].key(), "codeforces:1A")
+
+    def test_external_file_change_triggers_reload(self) -> None:
+        self.fm.flush()
+        shard = self.fm.problem_shards_dir / f"{self.fm.list_problems()[0].created_at.strftime('%Y-%m')}.json"
+        data = json.loads(shard.read_text(encoding="utf-8"))
+        data["codeforces:2B"]["title"] = "Edited Outside"
+        shard.write_text(json.dumps(data, ensure_ascii=False, indent=4), encoding="utf-8")
+
+        record = self.fm.get_problem("codeforces", "2B")
+
+        self.assertEqual(record.title, "Edited Outside")
+
+    def test_returned_records_are_not_mutated_by_later_updates(self) -> None:
+        snapshot = self.fm.get_problem("codeforces", "1A")
+
+        self.fm.update_problem_reflection("codeforces", "1A", "new reflection")
+
+        self.assertEqual(snapshot.reflection, "")
+        self.assertEqual(self.fm.get_problem("codeforces", "1A").reflection, "new reflection")
+
+    def test_sqlite_external_commit_triggers_reload(self) -> None:
+        current = self.fm.get_settings().ui
+        self.fm.update_ui_settings(current.model_copy(update={"storage_engine": StorageEngine.sqlite}))
+        self.assertEqual(self.fm.get_problem("codeforces", "1A").title, "A")
+
+        other = SqliteDatabase(self.fm.sqlite_file)
+        try:
+            problems, _, _ = open_sqlite_stores(other)
+            raw = problems.get("codeforces:1A")
+            raw["title"] = "From Another Connection"
+            problems.put("codeforces:1A", raw)
+        finally:
+            other.close()
+
+        self.assertEqual(self.fm.get_problem("codeforces", "1A").title, "From Another Connection")
+
+    def test_summary_projection_omits_heavy_fields_and_tracks_writes(self) -> None:
+        fields = resolve_problem_fields(ProblemView.summary, None)
+        self.assertEqual(fields, PROBLEM_SUMMARY_FIELDS)
+
+        first = self.fm.project_problems(self.fm.list_problems(), fields)
+        self.assertNotIn("content", first[0])
+        self.assertNotIn("my_ac_code", first[0])
+        again = self.fm.project_problems(self.fm.list_problems(), fields)
+        self.assertIs(again[0], first[0])
+
+        self.fm.patch_problem_status("codeforces", "1A", ProblemStatus.solved)
+        by_id = {item["id"]: item for item in self.fm.project_problems(self.fm.list_problems(), fields)}
+        self.assertEqual(by_id["1A"]["status"], "solved")
+
+    def test_fields_projection_is_validated(self) -> None:
+        fields = resolve_problem_fields(None, "title, content")
+        self.assertEqual(fields, frozenset({"source", "id", "title", "content"}))
+        item = self.fm.project_problems([self.fm.get_problem("codeforces", "1A")], fields)[0]
+        self.assertEqual(sorted(item), ["content", "id", "source", "title"])
+
+        with self.assertRaises(ValueError):
+            resolve_problem_fields(None, "title,nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemStatus
+from src.storage.facet_index import difficulty_bucket
+from src.storage.file_manager import FileManager, current_month
+
+
+class ProblemFacetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="Codeforces", id="1A", title="A", tags=["math", "math"], difficulty=1000),
+                ProblemInput(source="codeforces", id="2B", title="B", tags=["dp", "greedy"], difficulty=1500),
+                ProblemInput(source="luogu", id="P1", title="C", tags=["dp"]),
+                ProblemInput(source="atcoder", id="abc1_a", title="D", tags=[], difficulty=1250),
+            ]
+        )
+        self.fm.patch_problem_status("codeforces", "2B", ProblemStatus.solved)
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_difficulty_buckets(self) -> None:
+        self.assertEqual(difficulty_bucket(None), "unrated")
+        self.assertEqual(difficulty_bucket(800), "800-1199")
+        self.assertEqual(difficulty_bucket(1199), "800-1199")
+        self.assertEqual(difficulty_bucket(1200), "1200-1599")
+
+    def test_counts_every_facet(self) -> None:
+        total, facets = self.fm.problem_facets()
+
+        self.assertEqual(total, 4)
+        self.assertEqual(facets["month"], {current_month(): 4})
+        self.assertEqual(facets["source"], {"codeforces": 2, "luogu": 1, "atcoder": 1})
+        self.assertEqual(facets["status"], {"solved": 1, "unsolved": 3})
+        self.assertEqual(facets["tag"], {"math": 1, "dp": 2, "greedy": 1})
+        self.assertEqual(facets["difficulty"], {"800-1199": 1, "1200-1599": 2, "unrated": 1})
+
+    def test_counts_follow_filters_and_writes(self) -> None:
+        total, facets = self.fm.problem_facets(tag="dp")
+        self.assertEqual(total, 2)
+        self.assertEqual(facets["source"], {"codeforces": 1, "luogu": 1})
+
+        self.fm.upsert_problems([ProblemInput(source="luogu", id="P1", title="C", tags=["graphs"], difficulty=2100)])
+        self.fm.delete_problem("Codeforces", "1A")
+
+        total, facets = self.fm.problem_facets(source="LUOGU")
+        self.assertEqual(total, 1)
+        self.assertEqual(facets["tag"], {"graphs": 1})
+        self.assertEqual(facets["difficulty"], {"2000-2399": 1})
+        self.assertNotIn("math", self.fm.problem_facets()[1]["tag"])
+        self.assertEqual(self.fm.problem_facets(keyword="abc", status=ProblemStatus.unsolved)[0], 1)
+
+    def test_list_filters_use_the_indexes(self) -> None:
+        keys = lambda **kwargs: sorted(record.key() for record in self.fm.list_problems_filtered(**kwargs))
+
+        self.assertEqual(keys(source="codeforces"), ["Codeforces:1A", "codeforces:2B"])
+        self.assertEqual(keys(tag="dp", status=ProblemStatus.unsolved), ["luogu:P1"])
+        self.assertEqual(keys(difficulty="1200-1599"), ["atcoder:abc1_a", "codeforces:2B"])
+        self.assertEqual(keys(month="1999-01"), [])
+        self.assertEqual(keys(tag="nope"), [])
+
+        page, total, cursor = self.fm.list_problems_page(difficulty="1200-1599", limit=1)
+        self.assertEqual((len(page), total), (1, 2))
+        rest, _, _ = self.fm.list_problems_page(difficulty="1200-1599", limit=1, cursor=cursor)
+        self.assertNotEqual(page[0].key(), rest[0].key())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.services.problem_import import iter_ndjson_import
+from src.storage.file_manager import FileManager
+
+
+def _line(source: str, problem_id: str, title: str = "T") -> bytes:
+    return (json.dumps({"source": source, "id": problem_id, "title": title}) + "\n").encode("utf-8")
+
+
+class NdjsonImportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_commits_in_chunks_and_reports_rejected_lines(self) -> None:
+        self.fm.upsert_problems([ProblemInput(source="codeforces", id="1", title="Old")])
+        lines = [
+            _line("codeforces", "1", "New"),
+            b"\n",
+            b"{not json}\n",
+            _line("codeforces", "2"),
+            b'{"source": "codeforces", "id": "3"}\n',
+            _line("codeforces", "4"),
+        ]
+
+        progress = list(iter_ndjson_import(self.fm, lines, chunk_size=2))
+
+        self.assertEqual([(p.chunk, p.first_line, p.last_line) for p in progress[:-1]], [(1, 1, 3), (2, 4, 5), (3, 6, 6)])
+        self.assertEqual([(p.imported, p.updated) for p in progress[:-1]], [(0, 1), (1, 0), (1, 0)])
+        self.assertEqual([r.line for p in progress for r in p.rejected], [3, 5])
+        self.assertIn("title", progress[1].rejected[0].error)
+
+        summary = progress[-1]
+        self.assertTrue(summary.done)
+        self.assertEqual((summary.imported, summary.updated, summary.rejected_count), (2, 1, 2))
+        self.assertEqual(self.fm.get_problem("codeforces", "1").title, "New")
+        self.assertIsNotNone(self.fm.get_problem("codeforces", "4"))
+
+    def test_empty_body_yields_only_summary(self) -> None:
+        progress = list(iter_ndjson_import(self.fm, [b"\xef\xbb\xbf\n"]))
+
+        self.assertEqual(len(progress), 1)
+        self.assertTrue(progress[0].done)
+        self.assertEqual(progress[0].chunk, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
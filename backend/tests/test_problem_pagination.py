@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemSort, ProblemStatus, SortOrder
+from src.storage.file_manager import FileManager
+
+
+class ProblemPaginationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems(
+            [
+                ProblemInput(
+                    source="codeforces" if idx % 2 else "atcoder",
+                    id=str(idx),
+                    title=f"Problem {chr(ord('A') + (idx * 7) % 26)}{idx}",
+                    difficulty=None if idx % 5 == 0 else (idx % 4) * 400 + 800,
+                )
+                for idx in range(23)
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def _walk(self, **kwargs) -> list[str]:
+        keys: list[str] = []
+        cursor = None
+        while True:
+            page, _, cursor = self.fm.list_problems_page(limit=4, cursor=cursor, **kwargs)
+            self.assertLessEqual(len(page), 4)
+            keys.extend(record.key() for record in page)
+            if cursor is None:
+                return keys
+
+    def test_pages_cover_every_record_in_sort_order(self) -> None:
+        everything = self.fm.list_problems()
+        for sort in ProblemSort:
+            for order in SortOrder:
+                with self.subTest(sort=sort.value, order=order.value):
+                    full, total, cursor = self.fm.list_problems_page(sort=sort, order=order)
+                    self.assertIsNone(cursor)
+                    self.assertEqual(total, len(everything))
+                    self.assertEqual(self._walk(sort=sort, order=order), [record.key() for record in full])
+
+    def test_missing_values_sort_last_in_both_directions(self) -> None:
+        for order in SortOrder:
+            records, _, _ = self.fm.list_problems_page(sort=ProblemSort.difficulty, order=order)
+            difficulties = [record.difficulty for record in records]
+            self.assertEqual(difficulties[-5:], [None] * 5)
+            ranked = difficulties[:-5]
+            self.assertEqual(ranked, sorted(ranked, reverse=order == SortOrder.desc))
+
+    def test_filters_apply_before_paging(self) -> None:
+        keys = self._walk(source="atcoder", sort=ProblemSort.title)
+        _, total, _ = self.fm.list_problems_page(source="atcoder", limit=1)
+
+        self.assertEqual(len(keys), 12)
+        self.assertEqual(total, 12)
+        self.assertTrue(all(key.startswith("atcoder:") for key in keys))
+
+    def test_cursor_survives_updates_and_rejects_other_orders(self) -> None:
+        first, _, cursor = self.fm.list_problems_page(sort=ProblemSort.title, limit=3)
+        self.fm.patch_problem_status(first[0].source, first[0].id, ProblemStatus.solved)
+
+        second, _, _ = self.fm.list_problems_page(sort=ProblemSort.title, limit=3, cursor=cursor)
+        self.assertTrue(set(r.key() for r in first).isdisjoint(r.key() for r in second))
+
+        with self.assertRaises(ValueError):
+            self.fm.list_problems_page(sort=ProblemSort.difficulty, limit=3, cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.fm.list_problems_page(limit=3, cursor="not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
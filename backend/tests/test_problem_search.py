@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemStatus
+from src.routes.problems import list_problems
+from src.storage.file_manager import FileManager
+from src.storage.search_index import ProblemSearchIndex, tokenize
+
+
+class TokenizeTests(unittest.TestCase):
+    def test_words_are_casefolded_and_cjk_runs_become_bigrams(self) -> None:
+        self.assertEqual(tokenize("Dijkstra 最短路, a_b 图"), ["dijkstra", "a", "b", "最短", "短路", "图"])
+
+
+class ProblemSearchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="luogu", id="P1", title="最短路模板", content="给定带权图，求单源最短路。"),
+                ProblemInput(source="luogu", id="P2", title="区间查询", content="线段树维护区间和，不涉及最短路。"),
+                ProblemInput(
+                    source="codeforces",
+                    id="20C",
+                    title="Dijkstra?",
+                    content="Find the shortest path in a weighted graph. Output <path> or -1.",
+                ),
+                ProblemInput(source="codeforces", id="4A", title="Watermelon", content="Split the weight evenly."),
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def _keys(self, query: str, **kwargs) -> list[str]:
+        _, hits = self.fm.search_problems(query, **kwargs)
+        return [record.key() for record, _, _, _ in hits]
+
+    def test_title_hits_rank_first_and_cjk_terms_match_inside_runs(self) -> None:
+        self.assertEqual(self._keys("最短路"), ["luogu:P1", "luogu:P2"])
+        self.assertEqual(self._keys("SHORTEST path"), ["codeforces:20C"])
+        self.assertEqual(self._keys("shortest watermelon"), [])
+
+    def test_snippets_escape_text_and_mark_hits(self) -> None:
+        _, hits = self.fm.search_problems("path")
+        _, _, field, snippet = hits[0]
+
+        self.assertEqual(field, "content")
+        self.assertIn("<mark>path</mark>", snippet)
+        self.assertIn("&lt;<mark>path</mark>&gt;", snippet)
+
+    def test_filters_and_limit_keep_the_total(self) -> None:
+        total, hits = self.fm.search_problems("最短路", limit=1)
+        self.assertEqual((total, len(hits)), (2, 1))
+        self.assertEqual(self._keys("最短路 weight", source="codeforces"), [])
+        self.assertEqual(sorted(self._keys("the", source="codeforces")), ["codeforces:20C", "codeforces:4A"])
+
+        self.fm.patch_problem_status("codeforces", "4A", ProblemStatus.solved)
+        self.assertEqual(self._keys("the", status=ProblemStatus.solved), ["codeforces:4A"])
+
+    def test_index_follows_updates_and_deletes(self) -> None:
+        self.assertEqual(self._keys("graph"), ["codeforces:20C"])
+        self.fm.upsert_problems([ProblemInput(source="codeforces", id="20C", title="Dijkstra?", content="Tree DP.")])
+        self.fm.delete_problem("luogu", "P1")
+
+        self.assertEqual(self._keys("graph"), [])
+        self.assertEqual(self._keys("tree"), ["codeforces:20C"])
+        self.assertEqual(self._keys("最短路"), ["luogu:P2"])
+
+    def test_keyword_filter_matches_substrings(self) -> None:
+        keys = lambda keyword: sorted(record.key() for record in self.fm.list_problems_filtered(keyword=keyword))
+
+        self.assertEqual(keys("Weighted GRAPH"), ["codeforces:20C"])
+        self.assertEqual(keys("weigh"), ["codeforces:20C", "codeforces:4A"])
+        self.assertEqual(keys("间和，不涉"), ["luogu:P2"])
+        self.assertEqual(keys("<path> or"), ["codeforces:20C"])
+        self.assertEqual(keys("-"), ["codeforces:20C"])
+        self.assertEqual(keys("  !! "), [])
+        self.assertEqual(len(keys("   ")), 4)
+
+    def test_list_endpoint_keyword_matches_single_cjk_characters_and_partial_ids(self) -> None:
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="luogu", id="P3372", title="线段树模板"),
+                ProblemInput(source="codeforces", id="1234A", title="Equalize Prices Again"),
+            ]
+        )
+        keys = lambda keyword: sorted(
+            f"{item.source}:{item.id}" for item in list_problems(keyword=keyword, limit=None, fm=self.fm).items
+        )
+
+        self.assertEqual(keys("树"), ["luogu:P2", "luogu:P3372"])
+        self.assertEqual(keys("1234"), ["codeforces:1234A"])
+        self.assertEqual(self.fm.problem_facets(keyword="树")[0], 2)
+        self.assertEqual(self.fm.problem_facets(keyword="1234", source="codeforces")[0], 1)
+
+    def test_warmup_catches_up_with_writes_made_while_building(self) -> None:
+        cache = self.fm._problem_cache
+        cache.invalidate()
+        records = cache.begin_search_warmup()
+        self.fm.upsert_problems([ProblemInput(source="codeforces", id="9Z", title="Late graph")])
+        self.fm.delete_problem("luogu", "P1")
+        index = ProblemSearchIndex()
+        index.add_many(records)
+        cache.finish_search_warmup(index)
+
+        self.assertTrue(cache.has_search_index())
+        self.assertEqual(sorted(self._keys("graph")), ["codeforces:20C", "codeforces:9Z"])
+        self.assertEqual(self._keys("最短路"), ["luogu:P2"])
+
+    def test_large_archives_warm_the_index_on_open(self) -> None:
+        base = self.fm.base
+        self.fm.close()
+        with mock.patch.object(FileManager, "_SEARCH_WARMUP_MIN_PROBLEMS", 4):
+            self.fm = FileManager(base)
+        self.fm._await_search_warmup()
+
+        self.assertTrue(self.fm._problem_cache.has_search_index())
+        self.assertEqual(self._keys("graph"), ["codeforces:20C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
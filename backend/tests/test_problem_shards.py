@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemStatus
+from src.storage import record_store
+from src.storage.file_manager import FileManager
+from src.storage.record_store import GroupCommitWriter
+from src.storage.sharded_store import ShardedJsonRecordStore
+
+
+def _legacy_record(source: str, problem_id: str, created_at: str) -> dict:
+    return {
+        "source": source,
+        "id": problem_id,
+        "title": f"{source} {problem_id}",
+        "status": "unsolved",
+        "needs_solution": True,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+class ProblemShardTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.base.mkdir(parents=True)
+        legacy = {
+            "codeforces:1A": _legacy_record("codeforces", "1A", "2026-01-05T10:00:00Z"),
+            "codeforces:2B": _legacy_record("codeforces", "2B", "2026-01-20T10:00:00Z"),
+            "luogu:P1001": _legacy_record("luogu", "P1001", "2026-02-03T10:00:00Z"),
+        }
+        (self.base / "problems.json").write_text(json.dumps(legacy), encoding="utf-8")
+        self.fm = FileManager(self.base)
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_legacy_monolith_is_split_by_creation_month(self) -> None:
+        shards = self.fm.problem_shards_dir
+        self.assertEqual(sorted(json.loads((shards / "2026-01.json").read_text(encoding="utf-8"))), ["codeforces:1A", "codeforces:2B"])
+        self.assertEqual(list(json.loads((shards / "2026-02.json").read_text(encoding="utf-8"))), ["luogu:P1001"])
+        manifest = json.loads((shards / "manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(manifest["luogu:P1001"], "2026-02")
+
+    def test_month_query_loads_a_single_shard(self) -> None:
+        fm = FileManager(self.base)
+        try:
+            problems = fm.list_problems("2026-02")
+            self.assertEqual([p.key() for p in problems], ["luogu:P1001"])
+            self.assertEqual(fm.get_cache_stats()["problems"]["partitions"], 1)
+            self.assertEqual(len(fm.list_problems()), 3)
+            self.assertEqual(fm.get_cache_stats()["problems"]["partitions"], 2)
+        finally:
+            fm.close()
+
+    def test_write_rewrites_only_the_affected_shard(self) -> None:
+        with mock.patch.object(record_store, "_atomic_write_bytes", wraps=record_store._atomic_write_bytes) as write:
+            self.fm.patch_problem_status("luogu", "P1001", ProblemStatus.solved)
+            self.fm.flush()
+
+        shards = self.fm.problem_shards_dir
+        written = sorted(call.args[0].name for call in write.call_args_list if call.args[0].parent == shards)
+        self.assertEqual(written, ["2026-02.json"])
+
+    def test_missing_manifest_is_rebuilt_from_shards(self) -> None:
+        self.fm.close()
+        (self.fm.problem_shards_dir / "manifest.json").unlink()
+
+        self.fm = FileManager(self.base)
+
+        record = self.fm.get_problem("codeforces", "2B")
+        self.assertIsNotNone(record)
+        self.assertEqual(self.fm.get_cache_stats()["problems"]["partitions"], 1)
+
+
+class ShardManifestRecoveryTests(unittest.TestCase):
+    """A crash between the group-commit flushes of a shard and of the manifest."""
+
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmpdir.name) / "shards"
+        store = ShardedJsonRecordStore(self.dir)
+        store.ensure()
+        store.put("cf:1", _legacy_record("cf", "1", "2024-01-05T10:00:00Z"))
+        store.close()
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _crash_after_flushing(self, months: list[str], items: dict[str, dict]) -> ShardedJsonRecordStore:
+        writer = GroupCommitWriter(window=10)
+        store = ShardedJsonRecordStore(self.dir, writer=writer)
+        store.ensure()
+        store.put_many(items)
+        for month in months:
+            store._shard(month).flush()
+        writer._take_pending()  # the process dies before the rest is flushed
+        reopened = ShardedJsonRecordStore(self.dir)
+        with self.assertLogs("src.storage.sharded_store", "WARNING"):
+            reopened.ensure()
+        return reopened
+
+    def test_record_flushed_to_its_shard_but_not_the_manifest_is_found(self) -> None:
+        store = self._crash_after_flushing(["2024-01"], {"cf:2": _legacy_record("cf", "2", "2024-01-09T10:00:00Z")})
+
+        self.assertEqual(store.get("cf:2")["id"], "2")
+        self.assertEqual(sorted(store.load()), ["cf:1", "cf:2"])
+
+    def test_record_starting_a_new_month_is_listed(self) -> None:
+        store = self._crash_after_flushing(["2024-03"], {"cf:3": _legacy_record("cf", "3", "2024-03-01T10:00:00Z")})
+
+        self.assertEqual(store.months(), ["2024-01", "2024-03"])
+        self.assertEqual(sorted(store.load()), ["cf:1", "cf:3"])
+
+    def test_interrupted_move_keeps_the_new_copy(self) -> None:
+        moved = _legacy_record("cf", "1", "2024-02-01T10:00:00Z")
+        store = self._crash_after_flushing(["2024-02"], {"cf:1": moved})
+
+        self.assertEqual(store.shard_of("cf:1"), "2024-02")
+        self.assertEqual(store.load(), {"cf:1": moved})
+
+    def test_consistent_manifest_is_left_alone(self) -> None:
+        store = ShardedJsonRecordStore(self.dir)
+        with mock.patch.object(store._manifest, "replace_all") as replace_all:
+            store.ensure()
+
+        replace_all.assert_not_called()
+        self.assertEqual(store.shard_of("cf:1"), "2024-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
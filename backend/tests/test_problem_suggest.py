@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemStatus
+from src.storage.file_manager import FileManager
+from src.storage.suggest_index import ProblemSuggestIndex
+
+
+class ProblemSuggestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="Theatre Square"),
+                ProblemInput(source="codeforces", id="20C", title="Dijkstra?"),
+                ProblemInput(source="luogu", id="P4779", title="【模板】单源最短路径（标准版）"),
+                ProblemInput(source="atcoder", id="abc100_a", title="Single Source Shortest Path"),
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def _suggest(self, prefix: str, **kwargs) -> list[tuple[str, str]]:
+        return [(record.key(), field) for record, field in self.fm.suggest_problems(prefix, **kwargs)]
+
+    def test_completes_ids_and_titles_case_insensitively(self) -> None:
+        self.assertEqual(self._suggest("1a"), [("codeforces:1A", "id")])
+        self.assertEqual(self._suggest("CODEFORCES:"), [("codeforces:1A", "id"), ("codeforces:20C", "id")])
+        self.assertEqual(self._suggest("  theatre   sq"), [("codeforces:1A", "title")])
+
+    def test_whole_value_matches_rank_before_word_starts(self) -> None:
+        self.fm.upsert_problems([ProblemInput(source="luogu", id="P1", title="Shortcut")])
+
+        self.assertEqual(self._suggest("short"), [("luogu:P1", "title"), ("atcoder:abc100_a", "title")])
+        self.assertEqual(self._suggest("最短"), [("luogu:P4779", "title")])
+        self.assertEqual(self._suggest("short", limit=1), [("luogu:P1", "title")])
+
+    def test_filters_and_incremental_updates(self) -> None:
+        self.fm.patch_problem_status("codeforces", "20C", ProblemStatus.solved)
+        self.assertEqual(self._suggest("codeforces", status=ProblemStatus.solved), [("codeforces:20C", "id")])
+
+        self.fm.upsert_problems([ProblemInput(source="codeforces", id="20C", title="Shortest path again")])
+        self.fm.delete_problem("atcoder", "abc100_a")
+
+        self.assertEqual(self._suggest("dijkstra"), [])
+        self.assertEqual(self._suggest("short"), [("codeforces:20C", "title")])
+        self.assertEqual(self._suggest("single"), [])
+
+    def test_index_stays_sorted_across_bulk_and_single_updates(self) -> None:
+        index = ProblemSuggestIndex()
+        records = self.fm.list_problems()
+        index.add_many(records)
+        index.add_many(records[:1])
+        index.remove(records[1].key())
+
+        for tier in index._tiers:
+            self.assertEqual(tier, sorted(tier))
+        self.assertEqual(len(index), len(records) - 1)
+        self.assertEqual(sum(len(tier) for tier in index._tiers), index.stats()["entries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.models.settings import AIProfile, AISettings
+from src.models.task import TaskStatus
+from src.routes.solutions import get_scheduler_status
+from src.services.ai_client import AIClient, ProviderHTTPError
+from src.services.provider_scheduler import AdaptiveLimit, ProviderLimiter, RequestTiming, TokenBucket, estimate_tokens
+from src.services.task_runner import TaskRunner
+from src.storage.file_manager import FileManager
+
+
+class _GatedSolutionGenerator:
+    """Blocks generations on the ``slow`` profile until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release: asyncio.Event | None = None
+        self.finished: list[str] = []
+
+    async def generate(self, problem, *, ai_settings: AISettings, **kwargs) -> str:
+        if ai_settings.resolve_active_profile().id == "slow":
+            assert self.release is not None
+            await self.release.wait()
+        self.finished.append(problem.key())
+        return "# ok\n"
+
+
+class _DummyTagGenerator:
+    async def generate(self, *args, **kwargs):
+        return [], None
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_burst_then_steady_rate(self) -> None:
+        bucket = TokenBucket(60)
+
+        delays = [bucket.reserve(1) for _ in range(12)]
+
+        self.assertEqual(delays[:11], [0.0] * 11)
+        self.assertAlmostEqual(delays[11], 1.0, places=1)
+
+    def test_charged_usage_delays_the_next_reservation(self) -> None:
+        limiter = ProviderLimiter(1, tokens_per_minute=6000)
+
+        self.assertEqual(limiter.throttle_delay(500), 0.0)
+        limiter.charge(1000)
+        self.assertAlmostEqual(limiter.throttle_delay(500), 5.0, places=1)
+
+    def test_estimate_counts_wide_characters_individually(self) -> None:
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens("最短路"), 3)
+        self.assertEqual(estimate_tokens("", images=2), 3000)
+
+
+class ProviderLimiterTests(unittest.TestCase):
+    def test_slots_are_fifo_and_follow_reconfiguration(self) -> None:
+        async def _run() -> list[int]:
+            limiter = ProviderLimiter(1)
+            order: list[int] = []
+            await limiter.acquire()
+
+            async def _worker(idx: int) -> None:
+                await limiter.acquire()
+                order.append(idx)
+
+            workers = [asyncio.create_task(_worker(idx)) for idx in range(3)]
+            await asyncio.sleep(0)
+            self.assertEqual((limiter.active, limiter.queued), (1, 3))
+            limiter.configure(3, 0, 0)
+            await asyncio.sleep(0)
+            self.assertEqual((limiter.active, limiter.queued), (3, 1))
+            limiter.release()
+            await asyncio.gather(*workers)
+            return order
+
+        self.assertEqual(asyncio.run(_run()), [0, 1, 2])
+
+    def test_cancelled_waiter_gives_up_its_place(self) -> None:
+        async def _run() -> int:
+            limiter = ProviderLimiter(1)
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            limiter.release()
+            await limiter.acquire()
+            return limiter.active
+
+        self.assertEqual(asyncio.run(_run()), 1)
+
+
+def _timing(started: float = 0.0, ttft: float | None = 0.5) -> RequestTiming:
+    timing = RequestTiming()
+    timing.started = started
+    timing.first_token = None if ttft is None else started + ttft
+    return timing
+
+
+class AdaptiveLimitTests(unittest.TestCase):
+    def test_grows_by_one_per_saturated_healthy_round_up_to_the_ceiling(self) -> None:
+        limit = AdaptiveLimit(2, ceiling=4)
+
+        for _ in range(10):
+            limit.observe(_timing(), saturated=False, failed=False, overload=None)
+        self.assertEqual(limit.limit, 2)
+
+        for _ in range(2 + 3 + 4):
+            limit.observe(_timing(), saturated=True, failed=False, overload=None)
+        self.assertEqual(limit.limit, 4)
+        self.assertEqual([d["to_limit"] for d in limit.decisions], [3, 4])
+
+    def test_errors_hold_the_limit(self) -> None:
+        limit = AdaptiveLimit(2, ceiling=4)
+
+        limit.observe(_timing(), saturated=True, failed=True, overload=None)
+        limit.observe(_timing(), saturated=True, failed=False, overload=None)
+
+        self.assertEqual(limit.limit, 2)
+
+    def test_overload_halves_once_per_burst(self) -> None:
+        limit = AdaptiveLimit(8, ceiling=8)
+
+        for _ in range(3):
+            limit.observe(_timing(started=0.0), saturated=True, failed=True, overload="HTTP 429")
+
+        self.assertEqual(limit.limit, 4)
+        self.assertEqual(len(limit.decisions), 1)
+        self.assertEqual(limit.decisions[0]["reason"], "HTTP 429")
+
+    def test_rising_time_to_first_token_halves(self) -> None:
+        limit = AdaptiveLimit(8, ceiling=8)
+        limit.observe(_timing(ttft=0.2), saturated=True, failed=False, overload=None)
+
+        limit.observe(_timing(started=1.0, ttft=3.0), saturated=True, failed=False, overload=None)
+
+        self.assertEqual(limit.limit, 4)
+        self.assertEqual(limit.decisions[-1]["reason"], "time to first token rising")
+
+
+class TaskRunnerSchedulingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id=f"abc{idx}", title=f"P{idx}") for idx in range(5)])
+        self.fm.add_ai_profile(AIProfile(id="slow", name="Slow", max_concurrency=1), set_active=True)
+        self.fm.add_ai_profile(AIProfile(id="fast", name="Fast", max_concurrency=2), set_active=False)
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_slow_profile_does_not_block_other_profiles(self) -> None:
+        generator = _GatedSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> tuple[list[str], list[str]]:
+            generator.release = asyncio.Event()
+            slow = [await runner.enqueue_solution_task(f"atcoder:abc{idx}") for idx in range(2)]
+            self.fm.activate_ai_profile("fast")
+            fast = [await runner.enqueue_solution_task(f"atcoder:abc{idx}") for idx in range(2, 5)]
+            while len(generator.finished) < 3:
+                await asyncio.sleep(0.01)
+            self.assertEqual(runner.scheduler.stats()["slow"]["queued"], 1)
+            generator.release.set()
+            await asyncio.gather(*runner._inflight)
+            return slow, fast
+
+        slow, fast = asyncio.run(_run())
+
+        self.assertEqual(generator.finished[:3], ["atcoder:abc2", "atcoder:abc3", "atcoder:abc4"])
+        waiting = self.fm.get_task(slow[1])
+        assert waiting is not None
+        self.assertEqual(waiting.status, TaskStatus.succeeded)
+        self.assertEqual(waiting.profile_id, "slow")
+        self.assertGreater(waiting.queue_wait_ms or 0, 0)
+        first_fast = self.fm.get_task(fast[0])
+        assert first_fast is not None
+        self.assertEqual(first_fast.queue_wait_ms, 0)
+
+
+class AIClientThrottleTests(unittest.TestCase):
+    def test_every_attempt_spends_the_request_budget(self) -> None:
+        client = AIClient()
+        profile = AIProfile(id="p", requests_per_minute=6)
+        settings = AISettings(active_profile_id="p", profiles=[profile])
+        sleeps: list[float] = []
+
+        async def _sleep(delay: float) -> None:
+            sleeps.append(delay)
+
+        async def _generate(prompt, profile, images_base64=None, **kwargs) -> str:
+            return "answer"
+
+        with (
+            mock.patch("src.services.provider_scheduler.asyncio.sleep", _sleep),
+            mock.patch.object(client, "_generate_via_openai_compatible", _generate),
+        ):
+            results = [asyncio.run(client.generate_text("hi", settings)) for _ in range(4)]
+
+        # One request of burst plus one in flight, then one every 10 s.
+        self.assertEqual(results, ["answer"] * 4)
+        self.assertEqual([round(delay) for delay in sleeps], [10, 20])
+
+    def test_rate_limited_responses_shrink_an_adaptive_profile(self) -> None:
+        client = AIClient()
+        profile = AIProfile(id="p", max_concurrency=8, adaptive_concurrency=True)
+        settings = AISettings(active_profile_id="p", profiles=[profile])
+        client.scheduler.default_concurrency = 8
+
+        async def _generate(prompt, profile, images_base64=None, **kwargs) -> str:
+            raise ProviderHTTPError("openai-compatible provider error [429].", 429)
+
+        with mock.patch.object(client, "_generate_via_openai_compatible", _generate):
+            with self.assertRaises(ProviderHTTPError):
+                asyncio.run(client.generate_text("hi", settings))
+
+        stats = client.scheduler.limiter(profile).stats()
+        self.assertTrue(stats["adaptive"])
+        self.assertEqual((stats["limit"], stats["max_concurrency"]), (4, 8))
+
+
+class SchedulerStatusRouteTests(unittest.TestCase):
+    def test_lists_every_profile_with_its_limits(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            fm = FileManager(Path(tmp) / "data")
+            try:
+                fm.add_ai_profile(AIProfile(id="auto", name="Auto", adaptive_concurrency=True), set_active=False)
+                runner = TaskRunner(fm, _GatedSolutionGenerator(), _DummyTagGenerator())
+
+                resp = asyncio.run(get_scheduler_status(fm, runner))
+            finally:
+                fm.close()
+
+        by_id = {state.profile_id: state for state in resp.profiles}
+        self.assertFalse(by_id["default-1"].adaptive)
+        self.assertEqual(by_id["default-1"].limit, runner.max_concurrency)
+        self.assertTrue(by_id["auto"].adaptive)
+        self.assertEqual(by_id["auto"].max_concurrency, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.settings import PromptSettings
+from src.storage.file_manager import FileManager
+
+
+class SettingsCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.get_settings()
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_repeated_reads_do_not_touch_the_file(self) -> None:
+        version = self.fm.get_settings_version()
+
+        with mock.patch.object(FileManager, "_read_json", side_effect=AssertionError("unexpected read")):
+            first = self.fm.get_settings()
+            for _ in range(10):
+                self.assertIs(self.fm.get_settings(), first)
+
+        self.assertEqual(self.fm.get_settings_version(), version)
+
+    def test_update_replaces_snapshot_and_bumps_version(self) -> None:
+        before = self.fm.get_settings()
+        version = self.fm.get_settings_version()
+
+        updated = self.fm.update_prompt_settings(
+            PromptSettings(solution_template="new {{title}}", insight_template=before.prompts.insight_template)
+        )
+
+        self.assertIsNot(updated, before)
+        self.assertNotEqual(before.prompts.solution_template, "new {{title}}")
+        self.assertIs(self.fm.get_settings(), updated)
+        self.assertEqual(self.fm.get_settings_version(), version + 1)
+
+    def test_external_edit_is_reloaded(self) -> None:
+        raw = json.loads(self.fm.settings_file.read_text(encoding="utf-8"))
+        raw["prompts"]["solution_template"] = "edited outside {{title}}"
+        self.fm.settings_file.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+
+        self.assertEqual(self.fm.get_settings().prompts.solution_template, "edited outside {{title}}")
+
+
+if __name__ == "__main__":
+    unittest.main()
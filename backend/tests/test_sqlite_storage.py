@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, ProblemStatus, SolutionStatus
+from src.models.settings import StorageEngine, UiSettings
+from src.models.task import TaskStatus
+from src.storage.file_manager import FileManager
+from src.storage.sqlite_store import SQLITE_DB_NAME, SqliteDatabase, migrate_json_to_sqlite, open_sqlite_stores
+
+
+class SqliteStorageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def _set_engine(self, engine: StorageEngine) -> None:
+        current = self.fm.get_settings().ui
+        self.fm.update_ui_settings(current.model_copy(update={"storage_engine": engine}))
+
+    def test_switching_to_sqlite_migrates_existing_records(self) -> None:
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="A", status=ProblemStatus.solved),
+                ProblemInput(source="luogu", id="P1001", title="B", status=ProblemStatus.attempted),
+            ]
+        )
+        task = self.fm.create_task("luogu:P1001", provider_name="Default")
+        self.fm.update_insight_status("weekly", "2026-W07", "ready", report_path="x.md")
+
+        self._set_engine(StorageEngine.sqlite)
+
+        self.assertEqual(self.fm.get_storage_engine(), StorageEngine.sqlite)
+        self.assertTrue((self.base / SQLITE_DB_NAME).exists())
+        self.assertEqual(len(self.fm.list_problems()), 2)
+        self.assertEqual(self.fm.get_task(task.task_id).problem_key, "luogu:P1001")
+        self.assertEqual(self.fm.get_insight_status("weekly", "2026-W07").status, "ready")
+        self.assertEqual(self.fm.get_settings().ui.storage_engine, StorageEngine.sqlite)
+
+    def test_sqlite_engine_supports_filters_and_mutations(self) -> None:
+        self._set_engine(StorageEngine.sqlite)
+        self.fm.upsert_problems(
+            [
+                ProblemInput(source="codeforces", id="1A", title="A", status=ProblemStatus.solved),
+                ProblemInput(source="codeforces", id="2B", title="B", status=ProblemStatus.unsolved),
+            ]
+        )
+
+        pending = self.fm.list_pending_problems()
+        self.assertEqual([p.key() for p in pending], ["codeforces:2B"])
+
+        self.fm.set_problem_solution_state("codeforces:2B", SolutionStatus.done, mark_needs_solution=False)
+        self.assertEqual(self.fm.list_pending_problems(), [])
+
+        task = self.fm.create_task("codeforces:2B")
+        self.assertTrue(self.fm.has_active_solution_tasks())
+        self.fm.update_task(task.task_id, status=TaskStatus.succeeded, finished=True)
+        self.assertFalse(self.fm.has_active_solution_tasks())
+
+        result = self.fm.delete_problem("codeforces", "2B")
+        self.assertTrue(result.deleted)
+        self.assertEqual(result.removed_tasks, 1)
+        self.assertIsNone(self.fm.get_problem("codeforces", "2B"))
+
+    def test_sqlite_engine_persists_across_restarts(self) -> None:
+        self._set_engine(StorageEngine.sqlite)
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id="abc100_a", title="A")])
+        self.fm.close()
+
+        self.fm = FileManager(self.base)
+        self.assertEqual(self.fm.get_storage_engine(), StorageEngine.sqlite)
+        record = self.fm.get_problem("atcoder", "abc100_a")
+        self.assertIsNotNone(record)
+
+    def test_switching_back_to_json_writes_records_to_json_files(self) -> None:
+        self._set_engine(StorageEngine.sqlite)
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id="abc100_a", title="A")])
+
+        current = self.fm.get_settings().ui
+        self.fm.update_ui_settings(
+            UiSettings(
+                default_ac_language=current.default_ac_language,
+                storage_base_dir=self.fm.get_storage_base_dir(),
+                storage_engine=StorageEngine.json,
+            )
+        )
+
+        self.assertEqual(self.fm.get_storage_engine(), StorageEngine.json)
+        self.fm.flush()
+        self.assertIn("atcoder:abc100_a", (self.fm.problem_shards_dir / "manifest.json").read_text(encoding="utf-8"))
+
+    def test_one_shot_migrator_copies_json_files(self) -> None:
+        self.fm.upsert_problems([ProblemInput(source="codeforces", id="1A", title="A")])
+        self.fm.create_task("codeforces:1A")
+        self.fm.flush()
+
+        counts = migrate_json_to_sqlite(self.base)
+
+        self.assertEqual(counts, {"problems": 1, "tasks": 1, "reports": 0})
+        db = SqliteDatabase(self.base / SQLITE_DB_NAME)
+        try:
+            problems, _, _ = open_sqlite_stores(db)
+            month = self.fm.list_problems()[0].created_at.strftime("%Y-%m")
+            self.assertEqual(list(problems.load(month=month)), ["codeforces:1A"])
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.models.settings import AIProfile, AIProvider, AISettings
+from src.models.task import TaskStatus
+from src.services.ai_client import AIClient
+from src.services.task_runner import TaskRunner
+from src.storage.file_manager import FileManager
+
+
+def _sse_chunk(text: str) -> bytes:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': text}}]})}\n\n".encode()
+
+
+class _DroppedStream(httpx.AsyncByteStream):
+    """Sends ``chunks`` and then fails like a relay that cut the connection."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        raise httpx.ReadError("peer closed connection")
+
+
+class _FlakyProvider:
+    """Drops the first stream after two chunks and answers the next request in full."""
+
+    def __init__(self) -> None:
+        self.bodies: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.bodies.append(json.loads(request.content))
+        headers = {"content-type": "text/event-stream"}
+        if len(self.bodies) == 1:
+            return httpx.Response(200, headers=headers, stream=_DroppedStream([_sse_chunk("## 思路\n"), _sse_chunk("二分")]))
+        return httpx.Response(200, headers=headers, content=_sse_chunk("答案。") + b"data: [DONE]\n\n")
+
+
+def _client_for(provider: _FlakyProvider) -> AIClient:
+    client = AIClient()
+    client.http_pool._build = lambda profile: httpx.AsyncClient(transport=httpx.MockTransport(provider))
+    return client
+
+
+class AIClientContinuationTests(unittest.TestCase):
+    def test_retry_continues_a_dropped_openai_stream(self) -> None:
+        provider = _FlakyProvider()
+        client = _client_for(provider)
+        settings = AISettings(active_profile_id="p", profiles=[AIProfile(id="p", api_base="http://relay", api_key="k")])
+        deltas: list[str] = []
+
+        content = asyncio.run(
+            client.generate_solution("solve", settings, on_event=lambda event, data: deltas.append(data))
+        )
+
+        self.assertEqual(content, "## 思路\n二分答案。")
+        self.assertEqual(deltas, ["## 思路\n", "二分", "答案。"])
+        retry = provider.bodies[1]["messages"]
+        self.assertEqual(retry[-2], {"role": "assistant", "content": "## 思路\n二分"})
+        self.assertEqual(retry[-1]["role"], "user")
+        self.assertIn("cut off", retry[-1]["content"])
+
+    def test_anthropic_continuation_prefills_the_received_text(self) -> None:
+        client = AIClient()
+        profile = AIProfile(id="p", provider=AIProvider.anthropic, api_base="http://relay", api_key="k")
+        settings = AISettings(active_profile_id="p", profiles=[profile])
+        bodies: list[dict] = []
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            bodies.append(json.loads(request.content))
+            event = json.dumps({"type": "content_block_delta", "delta": {"type": "text_delta", "text": "二分答案。"}})
+            body = f"event: content_block_delta\ndata: {event}\n\nevent: message_stop\ndata: {{}}\n\n"
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode())
+
+        client.http_pool._build = lambda profile: httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+
+        content = asyncio.run(client.generate_solution("solve", settings, prefix="## 思路\n"))
+
+        self.assertEqual(content, "## 思路\n二分答案。")
+        self.assertEqual(bodies[0]["messages"][-1], {"role": "assistant", "content": "## 思路"})
+
+
+class _CheckpointedSolutionGenerator:
+    def __init__(self) -> None:
+        self.gate: asyncio.Event | None = None
+        self.prefixes: list[str] = []
+
+    async def generate(self, problem, *, on_event, prefix: str = "", **kwargs) -> str:
+        self.prefixes.append(prefix)
+        on_event("delta", "part one, ")
+        assert self.gate is not None
+        await self.gate.wait()
+        on_event("delta", "part two")
+        return prefix + "part one, part two"
+
+
+class _DummyTagGenerator:
+    async def generate(self, *args, **kwargs):
+        return [], None
+
+
+class TaskCheckpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.data_dir)
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id="abc1", title="P1")])
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_deltas_are_checkpointed_and_the_file_is_dropped_when_done(self) -> None:
+        generator = _CheckpointedSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> tuple[str, str]:
+            generator.gate = asyncio.Event()
+            task_id = await runner.enqueue_solution_task("atcoder:abc1")
+            while not generator.prefixes:
+                await asyncio.sleep(0.01)
+            checkpoint = self.fm.read_task_partial(task_id)
+            generator.gate.set()
+            await asyncio.gather(*runner._inflight)
+            return task_id, checkpoint
+
+        task_id, checkpoint = asyncio.run(_run())
+
+        self.assertEqual(checkpoint, "part one, ")
+        self.assertEqual(self.fm.read_task_partial(task_id), "")
+        self.assertFalse((self.fm.task_partials_dir / f"{task_id}.md").exists())
+
+    def test_shutdown_keeps_the_checkpoint_of_an_unfinished_task(self) -> None:
+        generator = _CheckpointedSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> str:
+            generator.gate = asyncio.Event()
+            task_id = await runner.enqueue_solution_task("atcoder:abc1")
+            while not generator.prefixes:
+                await asyncio.sleep(0.01)
+            return task_id
+
+        task_id = asyncio.run(_run())
+
+        self.assertEqual(self.fm.read_task_partial(task_id), "part one, ")
+
+    def test_resumed_task_continues_from_its_checkpoint(self) -> None:
+        task = self.fm.create_task("atcoder:abc1")
+        self.fm.update_task(task.task_id, status=TaskStatus.running, started=True)
+        with self.fm.open_task_partial(task.task_id) as append:
+            append("# 题解\n")
+        self.fm.close()
+        self.fm = FileManager(self.data_dir)
+        generator = _CheckpointedSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> str:
+            generator.gate = asyncio.Event()
+            await runner.resume()
+            while not generator.prefixes:
+                await asyncio.sleep(0.01)
+            replay = runner.streams.get(task.task_id).text
+            generator.gate.set()
+            await asyncio.gather(*runner._inflight)
+            return replay
+
+        replay = asyncio.run(_run())
+
+        self.assertEqual(generator.prefixes, ["# 题解\n"])
+        self.assertEqual(replay, "# 题解\npart one, ")
+        record = self.fm.get_task(task.task_id)
+        assert record is not None
+        self.assertEqual(record.status, TaskStatus.succeeded)
+        problem = self.fm.get_problem_by_key("atcoder:abc1")
+        assert problem is not None
+        self.assertIn("# 题解\npart one, part two", self.fm.read_solution_file(problem.source, problem.id) or "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, SolutionStatus
+from src.models.settings import AIProfile
+from src.models.task import CancelTasksRequest, TaskStatus
+from src.routes.solutions import cancel_task, cancel_tasks
+from src.services.task_runner import TaskRunner
+from src.storage.file_manager import FileManager
+
+
+class _HangingSolutionGenerator:
+    """Hangs on every problem except those in ``quick``, like a stalled provider stream."""
+
+    def __init__(self, quick: set[str] | None = None) -> None:
+        self.quick = quick or set()
+        self.started: list[str] = []
+        self.aborted: list[str] = []
+
+    async def generate(self, problem, **kwargs) -> str:
+        self.started.append(problem.key())
+        if problem.key() in self.quick:
+            return "# ok\n"
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.aborted.append(problem.key())
+            raise
+        return ""
+
+
+class _DummyTagGenerator:
+    async def generate(self, *args, **kwargs):
+        return [], None
+
+
+class TaskCancellationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id=f"abc{idx}", title=f"P{idx}") for idx in range(3)])
+        self.fm.update_ai_profile("default-1", AIProfile(id="default-1", name="Default", max_concurrency=1))
+        self.keys = [f"atcoder:abc{idx}" for idx in range(3)]
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    async def _wait_started(self, generator: _HangingSolutionGenerator, count: int) -> None:
+        while len(generator.started) < count:
+            await asyncio.sleep(0.01)
+
+    def test_cancelling_frees_the_slot_for_queued_work(self) -> None:
+        generator = _HangingSolutionGenerator(quick={self.keys[2]})
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> list[str]:
+            task_ids = [await runner.enqueue_solution_task(key) for key in self.keys]
+            await self._wait_started(generator, 1)
+            queued = await cancel_task(task_ids[1], runner)
+            self.assertEqual(queued.status, TaskStatus.cancelled)
+            running = await cancel_task(task_ids[0], runner)
+            self.assertEqual(running.status, TaskStatus.cancelled)
+            await asyncio.gather(*runner._inflight, return_exceptions=True)
+            return task_ids
+
+        task_ids = asyncio.run(_run())
+
+        self.assertEqual(generator.started, [self.keys[0], self.keys[2]])
+        self.assertEqual(generator.aborted, [self.keys[0]])
+        statuses = [self.fm.get_task(task_id).status for task_id in task_ids]
+        self.assertEqual(statuses, [TaskStatus.cancelled, TaskStatus.cancelled, TaskStatus.succeeded])
+        problem = self.fm.get_problem_by_key(self.keys[0])
+        assert problem is not None
+        self.assertEqual(problem.solution_status, SolutionStatus.none)
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(cancel_task(task_ids[2], runner))
+        self.assertEqual(ctx.exception.status_code, 409)
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(cancel_task("missing", runner))
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_bulk_cancel_without_ids_cancels_everything_active(self) -> None:
+        generator = _HangingSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> tuple[list[str], list[str]]:
+            task_ids = [await runner.enqueue_solution_task(key) for key in self.keys]
+            await self._wait_started(generator, 1)
+            resp = await cancel_tasks(CancelTasksRequest(), runner)
+            await asyncio.gather(*runner._inflight, return_exceptions=True)
+            return task_ids, resp.task_ids
+
+        task_ids, cancelled = asyncio.run(_run())
+
+        self.assertEqual(sorted(cancelled), sorted(task_ids))
+        self.assertEqual(self.fm.list_active_tasks(), [])
+        self.assertEqual(generator.started, [self.keys[0]])
+
+    def test_deadline_fails_a_hung_task_and_releases_its_slot(self) -> None:
+        generator = _HangingSolutionGenerator(quick={self.keys[1]})
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> list[str]:
+            with mock.patch.object(runner, "_deadline", return_value=0.05):
+                task_ids = [await runner.enqueue_solution_task(key) for key in self.keys[:2]]
+                await asyncio.gather(*runner._inflight)
+            return task_ids
+
+        hung, quick = asyncio.run(_run())
+
+        failed = self.fm.get_task(hung)
+        assert failed is not None
+        self.assertEqual(failed.status, TaskStatus.failed)
+        self.assertEqual(failed.error_message, "deadline of 0.05s exceeded")
+        self.assertEqual(generator.aborted, [self.keys[0]])
+        self.assertEqual(self.fm.get_task(quick).status, TaskStatus.succeeded)
+
+    def test_default_deadlines_come_from_ui_settings(self) -> None:
+        runner = TaskRunner(self.fm, _HangingSolutionGenerator(), _DummyTagGenerator())
+        task = self.fm.create_task(self.keys[0])
+
+        self.assertEqual(runner._deadline(task), 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.models.settings import AIProfile, PromptSettings
+from src.models.task import CreateTaskRequest, TaskPriority, TaskStatus
+from src.routes.problems import enqueue_auto_tag_task
+from src.routes.solutions import create_solution_tasks
+from src.services.task_runner import TaskRunner
+from src.storage.file_manager import FileManager
+
+
+class _GatedSolutionGenerator:
+    def __init__(self) -> None:
+        self.gate: asyncio.Event | None = None
+        self.calls: list[str] = []
+
+    async def generate(self, problem, **kwargs) -> str:
+        self.calls.append(problem.key())
+        assert self.gate is not None
+        await self.gate.wait()
+        return "# ok\n"
+
+
+class _CountingTagGenerator:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def generate(self, problem, *args, **kwargs):
+        self.calls.append(problem.key())
+        await asyncio.sleep(0.01)
+        return ["dp"], 1500
+
+
+class SingleFlightTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.data_dir)
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id=f"abc{idx}", title=f"P{idx}") for idx in range(2)])
+        self.fm.update_ai_profile("default-1", AIProfile(id="default-1", name="Default", max_concurrency=1))
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_duplicate_requests_join_the_in_flight_task(self) -> None:
+        generator = _GatedSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _CountingTagGenerator())
+
+        async def _run() -> tuple[list[str], str, str]:
+            generator.gate = asyncio.Event()
+            first = await create_solution_tasks(
+                CreateTaskRequest(problem_keys=["atcoder:abc0", "atcoder:abc1", "atcoder:abc0"]), self.fm, runner
+            )
+            again = await runner.enqueue_solution_task("atcoder:abc1", TaskPriority.interactive)
+            self.fm.update_prompt_settings(PromptSettings(solution_template="{{title}} only"))
+            changed = await runner.enqueue_solution_task("atcoder:abc0")
+            generator.gate.set()
+            await asyncio.gather(*runner._inflight)
+            return first.task_ids, again, changed
+
+        first, again, changed = asyncio.run(_run())
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(again, first[1])
+        self.assertNotIn(changed, first)
+        self.assertEqual(generator.calls, ["atcoder:abc0", "atcoder:abc1", "atcoder:abc0"])
+        joined = self.fm.get_task(first[1])
+        assert joined is not None
+        self.assertEqual(joined.priority, TaskPriority.interactive)
+        self.assertEqual(len(self.fm.list_tasks()), 3)
+
+    def test_finished_work_runs_again_on_request(self) -> None:
+        tags = _CountingTagGenerator()
+        runner = TaskRunner(self.fm, _GatedSolutionGenerator(), tags)
+
+        async def _run() -> list[str]:
+            task_ids = []
+            for _ in range(2):
+                resp = await enqueue_auto_tag_task("atcoder", "abc0", self.fm, runner)
+                task_ids.extend(resp.task_ids)
+            await asyncio.gather(*runner._inflight)
+            resp = await enqueue_auto_tag_task("atcoder", "abc0", self.fm, runner)
+            await asyncio.gather(*runner._inflight)
+            return task_ids + resp.task_ids
+
+        first, duplicate, rerun = asyncio.run(_run())
+
+        self.assertEqual(first, duplicate)
+        self.assertNotEqual(first, rerun)
+        self.assertEqual(tags.calls, ["atcoder:abc0", "atcoder:abc0"])
+
+    def test_resumed_tasks_are_joined_after_a_restart(self) -> None:
+        generator = _GatedSolutionGenerator()
+
+        async def _enqueue() -> str:
+            runner = TaskRunner(self.fm, generator, _CountingTagGenerator())
+            generator.gate = asyncio.Event()
+            task_id = await runner.enqueue_solution_task("atcoder:abc0")
+            await asyncio.sleep(0.01)
+            for handle in runner._inflight:
+                handle.cancel()
+            await asyncio.gather(*runner._inflight, return_exceptions=True)
+            return task_id
+
+        orphan = asyncio.run(_enqueue())
+        self.fm.close()
+        self.fm = FileManager(self.data_dir)
+        runner = TaskRunner(self.fm, generator, _CountingTagGenerator())
+
+        async def _resume() -> str:
+            generator.gate = asyncio.Event()
+            await runner.resume()
+            joined = await runner.enqueue_solution_task("atcoder:abc0")
+            generator.gate.set()
+            await asyncio.gather(*runner._inflight)
+            return joined
+
+        self.assertEqual(asyncio.run(_resume()), orphan)
+        record = self.fm.get_task(orphan)
+        assert record is not None
+        self.assertEqual(record.status, TaskStatus.succeeded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.models.settings import AIProfile
+from src.models.task import TaskPriority, TaskPriorityUpdateRequest, TaskStatus
+from src.routes.solutions import bump_task, update_task_priority
+from src.services.provider_scheduler import ProviderLimiter
+from src.services.task_runner import TaskRunner
+from src.storage.file_manager import FileManager
+
+
+async def _drain(limiter: ProviderLimiter, requests: list[tuple[str, int, str, int]]) -> list[str]:
+    """Queue ``(name, rank, flow, weight)`` behind a held slot and return the order slots are granted in."""
+    order: list[str] = []
+    await limiter.acquire()
+
+    async def _worker(name: str, rank: int, flow: str, weight: int) -> None:
+        await limiter.acquire(rank=rank, flow=flow, weight=weight, ticket=name)
+        order.append(name)
+        limiter.release()
+
+    workers = [asyncio.create_task(_worker(*request)) for request in requests]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*workers)
+    return order
+
+
+class LimiterOrderingTests(unittest.TestCase):
+    def test_lower_rank_is_served_first(self) -> None:
+        requests = [("b1", 1, "solution", 1), ("b2", 1, "solution", 1), ("i1", 0, "ai_tag", 1), ("g1", 2, "solution", 1)]
+
+        order = asyncio.run(_drain(ProviderLimiter(1), requests))
+
+        self.assertEqual(order, ["i1", "b1", "b2", "g1"])
+
+    def test_task_types_share_a_rank_by_weight(self) -> None:
+        requests = [(f"s{idx}", 1, "solution", 1) for idx in range(4)] + [(f"t{idx}", 1, "ai_tag", 2) for idx in range(4)]
+
+        order = asyncio.run(_drain(ProviderLimiter(1), requests))
+
+        self.assertEqual(order, ["s0", "t0", "t1", "s1", "t2", "t3", "s2", "s3"])
+
+    def test_reprioritize_moves_a_waiter(self) -> None:
+        async def _run() -> list[str]:
+            limiter = ProviderLimiter(1)
+            order: list[str] = []
+            await limiter.acquire()
+
+            async def _worker(name: str) -> None:
+                await limiter.acquire(rank=1, flow="solution", ticket=name)
+                order.append(name)
+                limiter.release()
+
+            workers = [asyncio.create_task(_worker(f"b{idx}")) for idx in range(3)]
+            await asyncio.sleep(0)
+            self.assertTrue(limiter.reprioritize("b2", 0, front=True))
+            self.assertFalse(limiter.reprioritize("missing", 0))
+            limiter.release()
+            await asyncio.gather(*workers)
+            return order
+
+        self.assertEqual(asyncio.run(_run()), ["b2", "b0", "b1"])
+
+
+class _GatedSolutionGenerator:
+    def __init__(self) -> None:
+        self.gate: asyncio.Event | None = None
+        self.started: list[str] = []
+
+    async def generate(self, problem, **kwargs) -> str:
+        self.started.append(problem.key())
+        assert self.gate is not None
+        await self.gate.wait()
+        return "# ok\n"
+
+
+class _DummyTagGenerator:
+    def __init__(self, started: list[str]) -> None:
+        self.started = started
+
+    async def generate(self, problem, *args, **kwargs):
+        self.started.append(f"tag:{problem.key()}")
+        return [], None
+
+
+class TaskRunnerPriorityTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id=f"abc{idx}", title=f"P{idx}") for idx in range(5)])
+        self.fm.update_ai_profile("default-1", AIProfile(id="default-1", name="Default", max_concurrency=1))
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def test_interactive_tag_and_bumped_solution_skip_the_batch(self) -> None:
+        generator = _GatedSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator(generator.started))
+
+        async def _run() -> None:
+            generator.gate = asyncio.Event()
+            batch = [await runner.enqueue_solution_task(f"atcoder:abc{idx}") for idx in range(4)]
+            while not generator.started:
+                await asyncio.sleep(0.01)
+            await runner.enqueue_ai_tag_task("atcoder:abc4")
+            await asyncio.sleep(0.01)
+            bumped = await bump_task(batch[3], runner)
+            self.assertEqual(bumped.priority, TaskPriority.interactive)
+            with self.assertRaises(HTTPException) as ctx:
+                await update_task_priority(batch[0], TaskPriorityUpdateRequest(priority=TaskPriority.background), runner)
+            self.assertEqual(ctx.exception.status_code, 409)
+            generator.gate.set()
+            await asyncio.gather(*runner._inflight)
+
+        asyncio.run(_run())
+
+        self.assertEqual(
+            generator.started,
+            ["atcoder:abc0", "tag:atcoder:abc4", "atcoder:abc3", "atcoder:abc1", "atcoder:abc2"],
+        )
+        self.assertTrue(all(task.status == TaskStatus.succeeded for task in self.fm.list_tasks()))
+
+    def test_unknown_task_is_not_found(self) -> None:
+        runner = TaskRunner(self.fm, _GatedSolutionGenerator(), _DummyTagGenerator([]))
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(bump_task("missing", runner))
+
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
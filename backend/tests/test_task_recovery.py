@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput, SolutionStatus
+from src.models.task import TaskStatus
+from src.services.task_runner import TaskRunner
+from src.storage.file_manager import FileManager
+
+
+class _CountingSolutionGenerator:
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+        self.order: list[str] = []
+
+    async def generate(self, problem, **kwargs) -> str:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.order.append(problem.key())
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return f"# {problem.title}\n"
+
+
+class _DummyTagGenerator:
+    async def generate(self, *args, **kwargs):
+        return ["dp"], 1500
+
+
+class TaskRecoveryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.data_dir)
+        self.fm.upsert_problems(
+            [ProblemInput(source="codeforces", id=f"{idx}A", title=f"Problem {idx}") for idx in range(4)]
+        )
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def _restart(self) -> None:
+        self.fm.close()
+        self.fm = FileManager(self.data_dir)
+
+    def _resume(self, runner: TaskRunner) -> list[str]:
+        async def _run() -> list[str]:
+            task_ids = await runner.resume()
+            while runner._inflight:
+                await asyncio.gather(*runner._inflight)
+            return task_ids
+
+        return asyncio.run(_run())
+
+    def test_orphaned_tasks_resume_in_order_under_the_concurrency_limit(self) -> None:
+        keys = [f"codeforces:{idx}A" for idx in range(4)]
+        tasks = [self.fm.create_task(key) for key in keys]
+        for task in tasks[:2]:
+            self.fm.update_task(task.task_id, status=TaskStatus.running, started=True)
+            self.fm.set_problem_solution_state(task.problem_key, SolutionStatus.running)
+        self._restart()
+
+        generator = _CountingSolutionGenerator()
+        with mock.patch.dict(os.environ, {"TASK_MAX_CONCURRENCY": "2"}):
+            runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+        resumed = self._resume(runner)
+
+        self.assertEqual(resumed, [task.task_id for task in tasks])
+        self.assertEqual(generator.order, keys)
+        self.assertEqual(generator.peak, 2)
+        for task, attempts in zip(tasks, [2, 2, 1, 1]):
+            record = self.fm.get_task(task.task_id)
+            assert record is not None
+            self.assertEqual(record.status, TaskStatus.succeeded)
+            self.assertEqual(record.attempts, attempts)
+        for key in keys:
+            problem = self.fm.get_problem_by_key(key)
+            assert problem is not None
+            self.assertEqual(problem.solution_status, SolutionStatus.done)
+        self.assertEqual(self.fm.list_active_tasks(), [])
+
+    def test_exhausted_and_report_tasks_fail_instead_of_resuming(self) -> None:
+        exhausted = self.fm.create_task("codeforces:0A")
+        for _ in range(3):
+            self.fm.update_task(exhausted.task_id, status=TaskStatus.running, started=True)
+        self.fm.set_problem_solution_state("codeforces:0A", SolutionStatus.running)
+        report = self.fm.create_report_task("weekly", "2026-W07")
+        self.fm.update_task(report.task_id, status=TaskStatus.running, started=True)
+        self.fm.update_insight_status("weekly", "2026-W07", "generating")
+        tag = self.fm.create_ai_tag_task("codeforces:1A")
+        self._restart()
+
+        runner = TaskRunner(self.fm, _CountingSolutionGenerator(), _DummyTagGenerator())
+        self.assertEqual(self._resume(runner), [tag.task_id])
+
+        failed = self.fm.get_task(exhausted.task_id)
+        assert failed is not None
+        self.assertEqual(failed.status, TaskStatus.failed)
+        self.assertIn("3 attempts", failed.error_message or "")
+        problem = self.fm.get_problem_by_key("codeforces:0A")
+        assert problem is not None
+        self.assertEqual(problem.solution_status, SolutionStatus.failed)
+        self.assertTrue(problem.needs_solution)
+
+        report_task = self.fm.get_task(report.task_id)
+        assert report_task is not None
+        self.assertEqual(report_task.status, TaskStatus.failed)
+        self.assertEqual(self.fm.get_insight_status("weekly", "2026-W07").status, "failed")
+
+        tag_task = self.fm.get_task(tag.task_id)
+        assert tag_task is not None
+        self.assertEqual(tag_task.status, TaskStatus.succeeded)
+        self.assertEqual(tag_task.attempts, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
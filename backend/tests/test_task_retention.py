@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.settings import TaskRetentionPolicy
+from src.models.task import TaskStatus, TaskType
+from src.storage.file_manager import FileManager, now_utc
+
+
+class TaskRetentionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmpdir.name) / "data"
+        self.fm = FileManager(self.base)
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    def _set_retention(self, default: TaskRetentionPolicy, **by_type: TaskRetentionPolicy) -> None:
+        ui = self.fm.get_settings().ui.model_copy(
+            update={"task_retention": default, "task_retention_by_type": {TaskType(k): v for k, v in by_type.items()}}
+        )
+        self.fm.update_ui_settings(ui)
+
+    def _finished(self, count: int, create=None) -> list[str]:
+        create = create or (lambda idx: self.fm.create_task(f"codeforces:{idx}"))
+        ids = []
+        for idx in range(count):
+            task = create(idx)
+            self.fm.update_task(task.task_id, status=TaskStatus.succeeded, finished=True)
+            ids.append(task.task_id)
+        return ids
+
+    def test_recent_and_active_views(self) -> None:
+        finished = self._finished(3)
+        running = self.fm.create_task("codeforces:9")
+        self.fm.update_task(running.task_id, status=TaskStatus.running, started=True)
+
+        self.assertEqual([t.task_id for t in self.fm.list_tasks(limit=2)], [running.task_id, finished[-1]])
+        self.assertEqual(len(self.fm.list_tasks()), 4)
+        self.assertEqual([t.task_id for t in self.fm.list_active_tasks()], [running.task_id])
+        self.assertTrue(self.fm.has_active_solution_tasks())
+
+        self.fm.update_task(running.task_id, status=TaskStatus.failed, finished=True)
+        self.assertFalse(self.fm.has_active_solution_tasks())
+        self.assertEqual(self.fm.list_active_tasks(), [])
+
+    def test_compaction_archives_finished_tasks_outside_the_policy(self) -> None:
+        self._set_retention(TaskRetentionPolicy(keep_last=2, keep_days=0), ai_tag=TaskRetentionPolicy(keep_last=0, keep_days=7))
+        solutions = self._finished(4)
+        tags = self._finished(2, lambda idx: self.fm.create_ai_tag_task(f"codeforces:{idx}"))
+        queued = self.fm.create_task("codeforces:queued")
+
+        result = self.fm.compact_tasks(now=now_utc() + timedelta(seconds=1))
+
+        self.assertEqual(result["archived"], 2)
+        kept = {task.task_id for task in self.fm.list_tasks()}
+        self.assertEqual(kept, {*solutions[2:], *tags, queued.task_id})
+        self.assertIsNone(self.fm.get_task(solutions[0]))
+
+        month = result["months"][0]
+        self.assertEqual([task.task_id for task in self.fm.read_archived_tasks(month)], solutions[:2])
+        archive = self.base / "task_archive" / f"{month}.jsonl.gz"
+        lines = gzip.decompress(archive.read_bytes()).splitlines()
+        self.assertEqual([json.loads(line)["task_id"] for line in lines], solutions[:2])
+
+        # Expiry of the ai_tag override; appends a second gzip member to the same file.
+        result = self.fm.compact_tasks(now=now_utc() + timedelta(days=8))
+        self.assertEqual(result["archived"], 2)
+        self.assertEqual(len(self.fm.read_archived_tasks(month)), 4)
+
+    def test_finishing_tasks_triggers_compaction(self) -> None:
+        self._set_retention(TaskRetentionPolicy(keep_last=5, keep_days=0))
+        self._finished(FileManager._TASK_COMPACT_EVERY_FINISHED)
+
+        self.assertEqual(len(self.fm.list_tasks()), 5)
+
+    def test_index_reloads_after_external_changes(self) -> None:
+        task = self.fm.create_task("codeforces:1")
+        self.fm.flush()
+        raw = json.loads(self.fm.tasks_file.read_text(encoding="utf-8"))
+        raw[task.task_id]["status"] = TaskStatus.running.value
+        self.fm.tasks_file.write_text(json.dumps(raw), encoding="utf-8")
+
+        self.assertEqual([t.task_id for t in self.fm.list_active_tasks()], [task.task_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
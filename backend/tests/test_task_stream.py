@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.models.problem import ProblemInput
+from src.models.settings import AIProfile, AISettings
+from src.routes.solutions import stream_task
+from src.services.ai_client import AIClient
+from src.services.task_runner import TaskRunner
+from src.services.task_stream import TaskStream
+from src.storage.file_manager import FileManager
+
+
+async def _collect(events) -> list[tuple[str, str]]:
+    return [item async for item in events]
+
+
+def _parse_sse(body: str) -> list[tuple[str, str]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+class TaskStreamTests(unittest.TestCase):
+    def test_late_listener_replays_the_prefix_then_follows_live(self) -> None:
+        async def _run() -> tuple[list, list, list]:
+            stream = TaskStream()
+            early = asyncio.create_task(_collect(stream.subscribe()))
+            await asyncio.sleep(0)
+            stream.publish("delta", "Hel")
+            stream.publish("delta", "lo")
+            late = asyncio.create_task(_collect(stream.subscribe()))
+            await asyncio.sleep(0)
+            stream.publish("delta", "!")
+            stream.close("succeeded")
+            after = await _collect(stream.subscribe())
+            return await early, await late, after
+
+        early, late, after = asyncio.run(_run())
+
+        self.assertEqual(early, [("delta", "Hel"), ("delta", "lo"), ("delta", "!"), ("end", "succeeded")])
+        self.assertEqual(late, [("delta", "Hello"), ("delta", "!"), ("end", "succeeded")])
+        self.assertEqual(after, [("delta", "Hello!"), ("end", "succeeded")])
+
+
+class AIClientStreamTextTests(unittest.TestCase):
+    def test_yields_deltas_and_the_final_answer(self) -> None:
+        client = AIClient()
+        settings = AISettings(active_profile_id="p", profiles=[AIProfile(id="p")])
+
+        async def _generate(prompt, profile, images_base64=None, *, on_event=None, **kwargs) -> str:
+            on_event("delta", "draft")
+            on_event("delta", " answer")
+            return "draft answer"
+
+        with mock.patch.object(client, "_generate_via_openai_compatible", _generate):
+            events = asyncio.run(_collect(client.stream_text("hi", settings)))
+
+        self.assertEqual(events, [("delta", "draft"), ("delta", " answer"), ("done", "draft answer")])
+
+    def test_provider_errors_are_raised_from_the_iterator(self) -> None:
+        client = AIClient()
+        settings = AISettings(active_profile_id="p", profiles=[AIProfile(id="p")])
+
+        async def _generate(prompt, profile, images_base64=None, **kwargs) -> str:
+            raise RuntimeError("bad key")
+
+        with mock.patch.object(client, "_generate_via_openai_compatible", _generate):
+            with self.assertRaisesRegex(RuntimeError, "bad key"):
+                asyncio.run(_collect(client.stream_text("hi", settings)))
+
+
+class _StreamingSolutionGenerator:
+    def __init__(self) -> None:
+        self.gate: asyncio.Event | None = None
+
+    async def generate(self, problem, *, on_event=None, **kwargs) -> str:
+        assert self.gate is not None and on_event is not None
+        on_event("delta", "# 题解\n")
+        await self.gate.wait()
+        on_event("delta", "done")
+        return "# 题解\ndone"
+
+
+class _DummyTagGenerator:
+    async def generate(self, *args, **kwargs):
+        return [], None
+
+
+class StreamRouteTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.fm = FileManager(Path(self._tmpdir.name) / "data")
+        self.fm.upsert_problems([ProblemInput(source="atcoder", id="abc1", title="P1")])
+
+    def tearDown(self) -> None:
+        self.fm.close()
+        self._tmpdir.cleanup()
+
+    async def _read(self, task_id: str, runner: TaskRunner) -> str:
+        response = await stream_task(task_id, self.fm, runner)
+        self.assertEqual(response.media_type, "text/event-stream")
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    def test_listeners_get_the_live_output_and_the_final_status(self) -> None:
+        generator = _StreamingSolutionGenerator()
+        runner = TaskRunner(self.fm, generator, _DummyTagGenerator())
+
+        async def _run() -> tuple[str, str, str]:
+            generator.gate = asyncio.Event()
+            task_id = await runner.enqueue_solution_task("atcoder:abc1")
+            early = asyncio.create_task(self._read(task_id, runner))
+            while not runner.streams.get(task_id).text:
+                await asyncio.sleep(0.01)
+            late = asyncio.create_task(self._read(task_id, runner))
+            await asyncio.sleep(0.01)
+            generator.gate.set()
+            await asyncio.gather(*runner._inflight)
+            finished = await self._read(task_id, runner)
+            return await early, await late, finished
+
+        early, late, finished = asyncio.run(_run())
+
+        self.assertEqual(_parse_sse(early), [("delta", "# 题解\n"), ("delta", "done"), ("end", "succeeded")])
+        self.assertEqual(_parse_sse(late), [("delta", "# 题解\n"), ("delta", "done"), ("end", "succeeded")])
+        self.assertEqual(_parse_sse(finished), [("end", "succeeded")])
+
+    def test_tag_tasks_do_not_stream(self) -> None:
+        runner = TaskRunner(self.fm, _StreamingSolutionGenerator(), _DummyTagGenerator())
+        task = self.fm.create_ai_tag_task("atcoder:abc1")
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(stream_task(task.task_id, self.fm, runner))
+        self.assertEqual(ctx.exception.status_code, 409)
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(stream_task("missing", self.fm, runner))
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -321,7 +321,8 @@ function readSettingsFormSnapshot() {
     default_ac_language: $('#default-ac-language')?.value || 'cpp',
     storage_base_dir: (storageBaseDirEl?.value || '').trim(),
     obsidian_mode_enabled: !!$('#obsidian-mode-enabled')?.checked,
-    markdown_naming_mode: $('#markdown-naming-mode')?.value || 'title'
+    markdown_naming_mode: $('#markdown-naming-mode')?.value || 'title',
+    storage_engine: $('#storage-engine')?.value || 'json'
   };
 }
 
@@ -356,6 +357,7 @@ function restoreSettingsFromBaseline() {
   setValue('#default-ac-language', settingsFormBaseline.default_ac_language || 'cpp');
   setValue('#storage-base-dir', settingsFormBaseline.storage_base_dir || '');
   setValue('#markdown-naming-mode', settingsFormBaseline.markdown_naming_mode || 'title');
+  setValue('#storage-engine', settingsFormBaseline.storage_engine || 'json');
 
   const obsidianModeEl = $('#obsidian-mode-enabled');
   if (obsidianModeEl) obsidianModeEl.checked = !!settingsFormBaseline.obsidian_mode_enabled;
@@ -1383,6 +1385,12 @@ function renderSettings(settings, preferredProfileId = '') {
     markdownNamingModeEl.value = ['title', 'source_id'].includes(mode) ? mode : 'title';
   }
 
+  const storageEngineEl = $('#storage-engine');
+  if (storageEngineEl) {
+    const engine = String(ui.storage_engine || 'json').trim();
+    storageEngineEl.value = ['json', 'sqlite'].includes(engine) ? engine : 'json';
+  }
+
   // Update Temperature display
   const tempInput = $('#ai-temperature');
   const tempDisplay = $('#temperature-display');
@@ -1696,7 +1704,8 @@ async function saveAllSettings() {
     default_ac_language: $('#default-ac-language').value,
     storage_base_dir: (storageBaseDirEl?.value || '').trim(),
     obsidian_mode_enabled: !!$('#obsidian-mode-enabled')?.checked,
-    markdown_naming_mode: $('#markdown-naming-mode')?.value || 'title'
+    markdown_naming_mode: $('#markdown-naming-mode')?.value || 'title',
+    storage_engine: $('#storage-engine')?.value || 'json'
   };
 
   try {
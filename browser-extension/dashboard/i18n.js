@@ -188,6 +188,10 @@ export const translations = {
         markdown_naming_title: 'By Title',
         markdown_naming_source_id: 'By Source + ID',
         hint_markdown_naming_mode: 'Choose how problem and solution markdown files are named. Changing this also migrates existing files.',
+        label_storage_engine: 'Storage Engine',
+        storage_engine_json: 'JSON Files',
+        storage_engine_sqlite: 'SQLite',
+        hint_storage_engine: 'Where problem, task and report records are kept. SQLite is faster for large archives. Switching copies existing records to the new engine.',
         label_weekly_prompt_style: 'Solution Prompt Style',
         style_custom: 'Custom',
         style_none: 'None',
@@ -463,6 +467,10 @@ export const translations = {
         markdown_naming_title: '按题目标题',
         markdown_naming_source_id: '按来源+题号',
         hint_markdown_naming_mode: '选择题目与题解 Markdown 的命名方式。切换时会同时迁移已有文件。',
+        label_storage_engine: '存储引擎',
+        storage_engine_json: 'JSON 文件',
+        storage_engine_sqlite: 'SQLite',
+        hint_storage_engine: '题目、任务与报告记录的存储方式。题库较大时 SQLite 更快。切换时会将已有记录复制到新引擎。',
         label_weekly_prompt_style: '题解提示词风格',
         style_custom: '自定义',
         style_none: '无',